@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import re
+import sys
+import time
+
+from ua_bundle_checker.assertion.commands import CHARM_REGEX_TEMPLATE
+from ua_bundle_checker.assertion.regex import check_pattern, UnsafeRegexError
+
+# Charm url template used before local paths were matched per segment. Kept
+# so that the timings can be compared.
+PREVIOUS_TEMPLATE = (r'^(cs|ch|local):(~?.+/)?{}[-]?[0-9]*$|'
+                     r'^[\/\.]*{}[-]?[0-9]*$|'
+                     r'^(\.?|~)(/[^/ ]*)+/?{}[-]?[0-9]*$')
+
+
+def time_match(template, charm, sample):
+    """ Return the seconds taken to match sample with the charm regex. """
+    regex = re.compile(template.format(charm, charm, charm))
+    start = time.perf_counter()
+    regex.match(sample)
+    return time.perf_counter() - start
+
+
+def cases(length, nested_length):
+    """ Return a list of (charm name regex, sample charm url). """
+    return [('[a-z0-9]+', "/" + "1" * length + "/-" + "1" * 3 * length + "!"),
+            ('aodh', "/" + "charms/" * (length * 10 // 7) + "xaodh"),
+            ('(a+)+', "/" + "a" * nested_length + "!")]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Time matching charm name regexes against pathological "
+                     "charm urls with the current and previous charm url "
+                     "templates."))
+    parser.add_argument('--length', type=int, default=250,
+                        help=("Length of the first path segment of the "
+                              "quantified charm case (the previous template "
+                              "is cubic in it; 1000 takes about a minute)."))
+    parser.add_argument('--nested-length', type=int, default=20,
+                        help=("Number of repeated characters in the path "
+                              "matched by the nested quantifier case (the "
+                              "previous template is exponential in it; 26 "
+                              "takes about 20s)."))
+    args = parser.parse_args()
+
+    for charm, sample in cases(args.length, args.nested_length):
+        print(f"charm '{charm}' vs {len(sample)} char path:")
+        previous = time_match(PREVIOUS_TEMPLATE, charm, sample)
+        print(f" previous: {previous:.4f}s")
+        try:
+            check_pattern(charm)
+        except UnsafeRegexError as exc:
+            print(f" current:  rejected at load time ({exc})")
+            continue
+
+        print(f" current:  "
+              f"{time_match(CHARM_REGEX_TEMPLATE, charm, sample):.4f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
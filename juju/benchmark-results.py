@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from ua_bundle_checker.assertion.commands import CheckResult
+
+
+def make_results(count, opts, reasons):
+    """
+    Create results the way assertions do i.e. with opt and reason strings
+    built per result so that equal values are distinct objects.
+    """
+    return [CheckResult(CheckResult.FAIL if n % 7 == 0 else CheckResult.PASS,
+                        opt=f"opt-{n % opts}", reason=f"value={n % reasons}")
+            for n in range(count)]
+
+
+def measure_memory(count, opts, reasons):
+    """ Return the bytes allocated per result, excluding the list. """
+    tracemalloc.start()
+    results = make_results(count, opts, reasons)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (current - sys.getsizeof(results)) / count
+
+
+def measure_format(results, func):
+    """ Return the mean seconds taken by func(result). """
+    start = time.perf_counter()
+    for result in results:
+        func(result)
+
+    return (time.perf_counter() - start) / len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Benchmark the memory used by CheckResult and the time "
+                     "taken to format it. Only the CheckResult(rc, opt, "
+                     "reason), str() and unformatted() api is used so the "
+                     "same script can be run against older versions."))
+    parser.add_argument('--results', type=int, default=200000)
+    parser.add_argument('--opts', type=int, default=50,
+                        help="Number of distinct opt values.")
+    parser.add_argument('--reasons', type=int, default=10,
+                        help="Number of distinct reason values.")
+    args = parser.parse_args()
+
+    per_result = measure_memory(args.results, args.opts, args.reasons)
+    results = make_results(args.results, args.opts, args.reasons)
+    print(f"{args.results} results ({args.opts} opts, {args.reasons} "
+          "reasons):")
+    print(f" memory={per_result:.1f} bytes/result")
+    for name, func in (('str()', str),
+                       ('unformatted()', CheckResult.unformatted)):
+        print(f" {name:<13} {measure_format(results, func) * 1e6:.2f}us")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
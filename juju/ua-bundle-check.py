@@ -17,7 +17,10 @@ import os
 import sys
 import argparse
 
+from ua_bundle_checker.analyzer import analyze
+from ua_bundle_checker.bisect import bisect, DEFAULT_CACHE
 from ua_bundle_checker.checker import setup
+from ua_bundle_checker.collector import fleet
 
 
 if __name__ == "__main__":
@@ -37,12 +40,97 @@ if __name__ == "__main__":
     parser.add_argument('--bundle', '-b', type=str,
                         required=False, help="Path to alternate bundle. "
                         "Default is to use $FCE_CONFIG/bundle.yaml")
+    parser.add_argument('--status', type=str, required=False,
+                        help=("Path to the output of 'juju status "
+                              "--format=json' (or - for stdin) to check the "
+                              "live model. If a bundle is also provided the "
+                              "live unit counts, placement, channels and "
+                              "relations from the status are overlaid on it "
+                              "so that config checks still apply."))
     parser.add_argument('--errors-only', action='store_true', default=False,
                         help="Exclude [PASS] info.")
+    parser.add_argument('--summary-only', action='store_true', default=False,
+                        help=("Count results as they are produced and only "
+                              "retain WARN/FAIL results. This keeps memory "
+                              "use constant regardless of the number of "
+                              "passing checks."))
+    parser.add_argument('--max-errors-per-app', type=int, default=None,
+                        help=("Maximum number of WARN/FAIL results retained "
+                              "per application. Requires --summary-only. "
+                              "Default is no limit."))
+    parser.add_argument('--output-dir', type=str, default='',
+                        help=("Directory in which to save the results log. "
+                              "Default is the current directory."))
+    parser.add_argument('--per-run-log', action='store_true', default=False,
+                        help=("Give each run its own uniquely named results "
+                              "log and point a "
+                              "ua-bundle-checks.<type>.latest.log symlink "
+                              "(ua-bundle-checks.<type>.fleet.latest.log with "
+                              "--fleet) at it. This allows multiple runs of the same type "
+                              "to be executed concurrently in the same "
+                              "directory."))
     parser.add_argument('--quiet', '-q', action='store_true', default=False)
     parser.add_argument('--schema', action='store_true', default=False)
+    parser.add_argument('--analyze', action='store_true', default=False,
+                        help=("Analyse the checks for the given --type and "
+                              "report overlapping sections, duplicate "
+                              "assertions, unreachable methods and regex "
+                              "usage. If --bundle is provided it is used as a "
+                              "sample to estimate the cost of each section."))
+    parser.add_argument('--bisect', type=str, default=None,
+                        help=("Find the first revision in a git range "
+                              "<good>..<bad> at which the checks for --type "
+                              "start to fail for the --bundle file. Each "
+                              "revision of the bundle is read from git "
+                              "without a checkout and results are cached per "
+                              "bundle blob."))
+    parser.add_argument('--bisect-section', type=str, default=None,
+                        help="Only consider this checks section.")
+    parser.add_argument('--bisect-opt', type=str, default=None,
+                        help="Only consider assertions for this option.")
+    parser.add_argument('--bisect-method', type=str, default=None,
+                        help="Only consider this assertion method.")
+    parser.add_argument('--bisect-cache', type=str, default=DEFAULT_CACHE,
+                        help=("Path of the --bisect results cache. Set to '' "
+                              "to disable."))
+    parser.add_argument('--fleet', type=str, default=None,
+                        help=("Path to a file (or - for stdin) containing one "
+                              "<controller>:<model> per line. The bundle of "
+                              "each is fetched with 'juju export-bundle' "
+                              "concurrently and checked as soon as it "
+                              "arrives."))
+    parser.add_argument('--fleet-concurrency', type=int, default=8,
+                        help=("Maximum number of bundles fetched at the same "
+                              "time with --fleet."))
+    parser.add_argument('--fleet-timeout', type=int, default=60,
+                        help="Seconds allowed for each fetch with --fleet.")
+    parser.add_argument('--fleet-retries', type=int, default=2,
+                        help=("Number of times a failed fetch is retried "
+                              "with --fleet."))
     parser.add_argument('--checks-path', type=str,
                         default=os.path.join(os.path.dirname(__file__),
                                              'checks'))
-    setup(parser.parse_args())
+    _args = parser.parse_args()
+    if _args.max_errors_per_app is not None and not _args.summary_only:
+        parser.error("--max-errors-per-app requires --summary-only")
+
+    if _args.fleet_concurrency < 1:
+        parser.error("--fleet-concurrency must be at least 1")
+
+    if _args.fleet_timeout <= 0:
+        parser.error("--fleet-timeout must be greater than 0")
+
+    if _args.fleet_retries < 0:
+        parser.error("--fleet-retries must not be negative")
+
+    if _args.analyze:
+        sys.exit(analyze(_args))
+
+    if _args.bisect:
+        sys.exit(bisect(_args))
+
+    if _args.fleet:
+        sys.exit(fleet(_args))
+
+    sys.exit(setup(_args))
 
@@ -0,0 +1,18 @@
+
+from ua_bundle_checker.checker import (
+    BundleCheckerError,
+    check_bundle,
+    ChecksManager,
+    get_bundle,
+    Report,
+    validate_checks,
+)
+
+__all__ = [
+    'BundleCheckerError',
+    'check_bundle',
+    'ChecksManager',
+    'get_bundle',
+    'Report',
+    'validate_checks',
+]
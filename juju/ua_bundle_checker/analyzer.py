@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import time
+
+from dataclasses import dataclass
+
+import yaml
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionAssertChannel,
+    ASSERTIONS,
+    charm_regex,
+)
+from ua_bundle_checker.checker import (
+    ChecksManager,
+    get_bundle,
+    get_bundle_apps,
+    run_checks,
+)
+
+REGEX_METACHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+@dataclass
+class Finding:
+    """ Represents an issue found in a checks definition. """
+    kind: str
+    section: str
+    message: str
+
+    def __str__(self):
+        return f"[{self.kind}] {self.section}: {self.message}"
+
+
+@dataclass
+class SectionCost:
+    """ Estimated cost of evaluating a checks section against a bundle. """
+    section: str
+    applications: int
+    assertions: int
+    seconds: float
+
+    def __str__(self):
+        return (f"{self.section}: applications={self.applications} "
+                f"assertions={self.assertions} "
+                f"time={self.seconds * 1000:.3f}ms")
+
+
+class _DuplicateKeyLoader(yaml.SafeLoader):  # pylint: disable=R0901
+    """ Yaml loader that records duplicate mapping keys. """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.duplicates = []
+
+    def construct_mapping(self, node, deep=False):
+        keys = set()
+        for key_node, _ in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in keys:
+                self.duplicates.append((key, key_node.start_mark.line + 1))
+
+            keys.add(key)
+
+        return super().construct_mapping(node, deep=deep)
+
+
+def find_duplicate_keys(path):
+    """
+    Return a list of (key, line) for keys defined more than once in the same
+    mapping. Yaml silently keeps the last definition so the others are dead.
+    """
+    with open(path, encoding='utf-8') as fd:
+        loader = _DuplicateKeyLoader(fd.read())
+
+    try:
+        loader.get_single_data()
+    finally:
+        loader.dispose()
+
+    return loader.duplicates
+
+
+class ChecksAnalyzer:
+    """
+    Statically analyse a set of checks to find redundant, overlapping or
+    unreachable work.
+    """
+
+    def __init__(self, checks, bundle_apps=None):
+        """
+        @param checks: dict of checks e.g. as returned by ChecksManager.checks
+        @param bundle_apps: optional sample bundle applications used to
+                            estimate cost and find overlaps.
+        """
+        self.checks = checks
+        self.bundle_apps = bundle_apps or {}
+
+    @staticmethod
+    def _is_literal(pattern):
+        return not REGEX_METACHARS.search(pattern)
+
+    def _matching_apps(self, section):
+        regex = charm_regex(section['charm'])
+        return [app for app, conf in self.bundle_apps.items()
+                if regex.match(conf.get('charm', ''))]
+
+    def _charm_overlap(self, label, other):
+        """
+        Return a reason if the charm matcher of either section matches the
+        (literal) charm of the other, otherwise None.
+        """
+        charm = self.checks[label]['charm']
+        other_charm = self.checks[other]['charm']
+        if charm == other_charm:
+            return "same charm"
+
+        for a, b in ((charm, other_charm), (other_charm, charm)):
+            if self._is_literal(b) and charm_regex(a).match(b):
+                return f"charm matcher '{a}' also matches '{b}'"
+
+        return None
+
+    def overlapping_sections(self):
+        findings = []
+        labels = list(self.checks)
+        for i, label in enumerate(labels):
+            for other in labels[i + 1:]:
+                reason = self._charm_overlap(label, other)
+                if reason:
+                    findings.append(Finding('overlap', label,
+                                            "overlaps with section "
+                                            f"'{other}' ({reason})"))
+
+        matched = {}
+        for label, section in self.checks.items():
+            for app in self._matching_apps(section):
+                matched.setdefault(app, []).append(label)
+
+        for app, sections in matched.items():
+            if len(sections) > 1:
+                findings.append(Finding('overlap', sections[0],
+                                        f"application '{app}' in sample "
+                                        "bundle is matched by sections "
+                                        f"{sections}"))
+
+        return findings
+
+    def duplicate_assertions(self):
+        """ Find identical assertions applied by overlapping sections. """
+        findings = []
+        seen = {}
+        for label, section in self.checks.items():
+            for opt, methods in (section.get('assertions') or {}).items():
+                for method, settings in (methods or {}).items():
+                    key = (section['charm'], opt, method,
+                           repr(sorted((settings or {}).items())))
+                    if key in seen:
+                        findings.append(Finding(
+                            'duplicate', label,
+                            f"{opt}.{method} duplicates section "
+                            f"'{seen[key]}'"))
+                    else:
+                        seen[key] = label
+
+        return findings
+
+    @staticmethod
+    def _unreachable_for_opt(label, section, opt, methods):
+        findings = []
+        unknown = [m for m in methods if m not in ASSERTIONS]
+        for method in unknown:
+            findings.append(Finding('unknown', label,
+                                    f"{opt}.{method} is not a known "
+                                    "assertion method"))
+
+        overrides = [m for m in methods
+                     if m not in unknown and ASSERTIONS[m].IS_OVERRIDE]
+        others = [m for m in methods
+                  if m not in unknown and not ASSERTIONS[m].IS_OVERRIDE]
+        for method, settings in methods.items():
+            if (settings or {}).get('skip'):
+                findings.append(Finding('unreachable', label,
+                                        f"{opt}.{method} has skip=True and "
+                                        "never runs"))
+
+        if not others:
+            return findings
+
+        always_passes = None
+        if 'allow_default' in overrides:
+            scopes = {(methods[m] or {}).get('scope') for m in others}
+            if scopes == {'application'}:
+                # application scoped assertions use labels like 'ha' which
+                # are never set as options so allow_default always passes.
+                always_passes = 'allow_default'
+
+        if 'skip_if_charm_exists' in overrides:
+            value = (methods['skip_if_charm_exists'] or {}).get('value')
+            if value and charm_regex(value).match(section['charm']):
+                always_passes = 'skip_if_charm_exists'
+
+        if always_passes:
+            findings.append(Finding('unreachable', label,
+                                    f"{opt}.{always_passes} always passes "
+                                    f"so {others} never run"))
+
+        return findings
+
+    def unreachable_methods(self):
+        findings = []
+        for label, section in self.checks.items():
+            for opt, methods in (section.get('assertions') or {}).items():
+                if methods:
+                    findings += self._unreachable_for_opt(label, section,
+                                                          opt, methods)
+
+        return findings
+
+    def regex_assertions(self):
+        findings = []
+        for label, section in self.checks.items():
+            for opt, methods in (section.get('assertions') or {}).items():
+                for method, settings in (methods or {}).items():
+                    if not (settings or {}).get('regex'):
+                        continue
+
+                    value = str(settings.get('value')).strip()
+                    if self._is_literal(value):
+                        msg = (f"{opt}.{method} uses regex=True with a "
+                               f"literal value '{value}' - drop regex to "
+                               "avoid the regex match")
+                    else:
+                        msg = f"{opt}.{method} uses regex '{value}'"
+
+                    findings.append(Finding('regex', label, msg))
+
+        return findings
+
+    def section_costs(self):
+        """
+        Estimate the cost of each section by running it against the sample
+        bundle.
+        """
+        costs = []
+        if not self.bundle_apps:
+            return costs
+
+        for label, section in self.checks.items():
+            start = time.perf_counter()
+            report = run_checks({label: section}, self.bundle_apps)
+            elapsed = time.perf_counter() - start
+            apps = sum(len(c.applications) for c in report.checkers)
+            costs.append(SectionCost(label, apps, sum(report.summary.values()),
+                                     elapsed))
+
+        return sorted(costs, key=lambda c: c.seconds, reverse=True)
+
+    def analyze(self):
+        return (self.overlapping_sections() + self.duplicate_assertions() +
+                self.unreachable_methods() + self.regex_assertions())
+
+
+def show_analysis(checks_mgr, bundle_apps=None):
+    """ Print an analysis of the checks managed by checks_mgr. """
+    print(f"Analysis of {checks_mgr.path} (type={checks_mgr.type}):")
+    findings = [Finding('duplicate', key, f"key defined more than once "
+                        f"(line {line})")
+                for key, line in find_duplicate_keys(checks_mgr.path)]
+    analyzer = ChecksAnalyzer(checks_mgr.checks, bundle_apps)
+    findings += analyzer.analyze()
+    for finding in findings:
+        print(f" {finding}")
+
+    if not findings:
+        print(" no issues found")
+
+    costs = analyzer.section_costs()
+    if costs:
+        print("\nEstimated cost per section (most expensive first; includes "
+              f"default {AssertionAssertChannel.NAME}):")
+        for cost in costs:
+            print(f" {cost}")
+
+    return findings
+
+
+def analyze(args):
+    """
+    Command line entry point for --analyze.
+
+    @return: exit code
+    """
+    bundle_apps = None
+    if args.bundle:
+        with open(args.bundle, encoding='utf-8') as fd:
+            bundle_apps = get_bundle_apps(get_bundle(fd.read()))
+
+    show_analysis(ChecksManager(args.type, args.checks_path), bundle_apps)
+    return 0
@@ -0,0 +1,19 @@
+
+# Import all assertion modules so that their assertions are registered.
+from ua_bundle_checker.assertion import (
+    commands,
+    consistency,
+    constraints,
+    expr,
+    placement,
+    relations,
+)
+
+__all__ = [
+    'commands',
+    'consistency',
+    'constraints',
+    'expr',
+    'placement',
+    'relations',
+]
@@ -16,8 +16,10 @@
 # Authors:
 #  - edward.hope-morley@canonical.com
 
+import abc
 import os
 import re
+import sys
 
 from functools import cached_property
 
@@ -28,13 +30,17 @@ from ua_bundle_checker.assertion.opts import (
     AssertHAAssertionOpts,
     IsSetAssertionOpts,
 )
+from ua_bundle_checker.assertion.regex import (
+    get_regex,
+    RegexBudgetExceeded,
+)
 
 CSI = "\033["
 RES = f"{CSI}0m"
 # e.g. cs:barbican-vault-123 or ./barbican-vault
 CHARM_REGEX_TEMPLATE = (r'^(cs|ch|local):(~?.+/)?{}[-]?[0-9]*$|'
                         r'^[\/\.]*{}[-]?[0-9]*$|'
-                        r'^(\.?|~)(/[^/ ]*)+/?{}[-]?[0-9]*$')
+                        r'^(\.?|~)/([^ ]*/)?{}[-]?[0-9]*$')
 OST_CHARM_CHANNELS_GUIDE_URL = (
     "https://docs.openstack.org/charm-guide/latest/project/charm-delivery.html"
 )
@@ -55,6 +61,15 @@ SCHEMA_ASSERTION_HEADER = """        {key}:
 ASSERTIONS = {}
 
 
+def charm_regex(regex_str):
+    """
+    Return a cached SafeRegex matching charm urls for the given charm name
+    regex.
+    """
+    return get_regex(CHARM_REGEX_TEMPLATE.format(regex_str, regex_str,
+                                                 regex_str))
+
+
 def register(name):
     """
     Decorator to register an assertion helper.
@@ -69,8 +84,29 @@ def register(name):
     return _register
 
 
+def _red(s):
+    return f"{CSI}31m{s}{RES}"
+
+
+def _grn(s):
+    return f"{CSI}32m{s}{RES}"
+
+
+def _ylw(s):
+    return f"{CSI}33m{s}{RES}"
+
+
 class CheckResult:
-    """ Represents the result of an assertion check. """
+    """
+    Represents the result of an assertion check.
+
+    Large runs can hold a great many of these so instances carry no __dict__
+    and opt/reason strings are interned so that repeated values share
+    storage.
+    Formatting is done on demand for each output sink.
+    """
+    __slots__ = ('rc', 'opt', '_reason')
+
     PASS = 0
     WARN = 1
     FAIL = 2
@@ -79,24 +115,29 @@ class CheckResult:
               WARN: 'WARN',
               FAIL: 'FAIL',
               SKIPPED: 'SKIPPED'}
+    RC_MAP_FMT = {PASS: _grn('PASS'),
+                  WARN: _ylw('WARN'),
+                  FAIL: _red('FAIL'),
+                  SKIPPED: _ylw('SKIPPED')}
 
     def __init__(self, rc=PASS, opt=None, reason=None):
         self.rc = rc
+        if isinstance(opt, str):
+            opt = sys.intern(opt)
+
         self.opt = opt
         self.reason = reason
-        self.formatted = True
 
-    @staticmethod
-    def _red(s):
-        return f"{CSI}31m{s}{RES}"
+    @property
+    def reason(self):
+        return self._reason
 
-    @staticmethod
-    def _grn(s):
-        return f"{CSI}32m{s}{RES}"
+    @reason.setter
+    def reason(self, value):
+        if isinstance(value, str):
+            value = sys.intern(value)
 
-    @staticmethod
-    def _ylw(s):
-        return f"{CSI}33m{s}{RES}"
+        self._reason = value
 
     @property
     def passed(self):
@@ -112,35 +153,41 @@ class CheckResult:
 
     @property
     def rc_str_fmt(self):
-        _map = {self.PASS: self._grn('PASS'),
-                self.WARN: self._ylw('WARN'),
-                self.SKIPPED: self._ylw('SKIPPED'),
-                self.FAIL: self._red('FAIL')}
-        return _map[self.rc]
+        return self.RC_MAP_FMT[self.rc]
 
-    def unformatted(self):
-        self.formatted = False
-        return str(self)
+    def render(self, formatted=True):
+        """
+        Return a string representation of this result.
 
-    def __str__(self):
-        if self.formatted:
-            msg = f"[{self.rc_str_fmt}]"
+        @param formatted: if True the result code is colourised for display
+                          on a terminal.
+        """
+        if formatted:
+            msg = f"[{self.RC_MAP_FMT[self.rc]}]"
         else:
-            msg = f"[{self.rc_str}]"
+            msg = f"[{self.RC_MAP[self.rc]}]"
 
         if self.opt:
             msg += f" {self.opt}"
-        if self.reason:
-            msg += f" ({self.reason})"
+        if self._reason:
+            msg += f" ({self._reason})"
 
         return msg
 
+    def unformatted(self):
+        return self.render(formatted=False)
 
-class AssertionBase:
+    def __str__(self):
+        return self.render()
+
+
+class AssertionBase(abc.ABC):
     """ Base class for all assertion implementations. """
     NAME = None
     OPTS = None
     IS_OVERRIDE = False
+    # True if the value is a charm name regex (or list of them)
+    CHARM_VALUE = False
 
     def __init__(self, settings):
         for name, value in settings.items():
@@ -155,10 +202,7 @@ class AssertionBase:
 
     @staticmethod
     def atoi(val):
-        if not isinstance(val, str):
-            return val
-
-        if not isinstance(val[-1], str):
+        if not isinstance(val, str) or not val:
             return val
 
         try:
@@ -170,12 +214,45 @@ class AssertionBase:
         if val[-1].lower() == val[-1]:
             quotient = 1000
 
-        conv = {"g": quotient ** 3,
+        conv = {"t": quotient ** 4,
+                "g": quotient ** 3,
                 "m": quotient ** 2,
                 "k": quotient}
 
+        if val[-1].lower() not in conv:
+            return val
+
         return _int * conv[val[-1].lower()]
 
+    @property
+    def value_charms(self):
+        """
+        Return the value of assertions that take a charm name regex or list of
+        them as a tuple.
+        """
+        if self.conf.value is None:
+            return ()
+
+        if isinstance(self.conf.value, (list, tuple)):
+            return tuple(self.conf.value)
+
+        return (self.conf.value,)
+
+    def fail(self, ret):
+        """
+        Mark a result as failed, or as a warning if warn-on-fail is set, and
+        append the assertion description to its reason.
+        """
+        if self.conf.description:
+            ret.reason = f"{ret.reason}: {self.conf.description}"
+
+        if self.conf.warn_on_fail:
+            ret.rc = CheckResult.WARN
+        else:
+            ret.rc = CheckResult.FAIL
+
+        return ret
+
     @staticmethod
     def get_units(application):
         if 'num_units' in application:
@@ -214,6 +291,7 @@ class AssertionSkipIfCharmExists(AssertionBase):
     Return True if a charm with the given name exist in the bundle.
     """
     IS_OVERRIDE = True
+    CHARM_VALUE = True
     OPTS = AssertionOptsCommon
 
     def __call__(self, charm_config_opt, application):
@@ -224,8 +302,13 @@ class AssertionSkipIfCharmExists(AssertionBase):
         regex_str = self.conf.value
         for app in self.conf.bundle_apps:
             charm = self.conf.bundle_apps[app].get('charm')
-            r = re.compile(CHARM_REGEX_TEMPLATE.format(
-                regex_str, regex_str, regex_str)).match(charm)
+            try:
+                r = charm_regex(regex_str).match(charm)
+            except RegexBudgetExceeded as exc:
+                ret.rc = CheckResult.WARN
+                ret.reason = str(exc)
+                return ret
+
             if r:
                 ret.reason = f"charm {charm} found in bundle - skipping check"
                 if self.conf.description:
@@ -372,7 +455,14 @@ class AssertionNEQ(AssertionBase):
                           reason=f"value={current}")
 
         if self.conf.regex:
-            if not re.fullmatch(expected.strip(), current):
+            try:
+                matched = get_regex(expected.strip()).fullmatch(current)
+            except RegexBudgetExceeded as exc:
+                ret.rc = CheckResult.WARN
+                ret.reason = str(exc)
+                return ret
+
+            if not matched:
                 return ret
         else:
             if current != self.atoi(expected):
@@ -411,7 +501,14 @@ class AssertionEQ(AssertionBase):
         ret = CheckResult(opt=charm_config_opt,
                           reason=f"value={current}")
         if self.conf.regex:
-            if re.fullmatch(expected.strip(), current):
+            try:
+                matched = get_regex(expected.strip()).fullmatch(current)
+            except RegexBudgetExceeded as exc:
+                ret.rc = CheckResult.WARN
+                ret.reason = str(exc)
+                return ret
+
+            if matched:
                 return ret
         else:
             if current == self.atoi(expected):
@@ -568,8 +665,48 @@ class LocalAssertionHelpers(AssertionBase):
                     'scope': 'application',
                     'source': 'Only supported source type is "bundle"',
                     'value': None},
+                ASSERTIONS['assert_ha_placement'].NAME: {
+                    'purpose': ('Ensure application units are spread over a '
+                                'minimum number of machines or zones'),
+                    'scope': 'application',
+                    'source': 'Only supported source type is "bundle"',
+                    'value': None},
                 ASSERTIONS['gte'].NAME: {
                     'purpose': 'Ensure option is gte to value'},
+                ASSERTIONS['expr'].NAME: {
+                    'purpose': ('Ensure expression in value is true e.g. '
+                                '"3 <= value <= 7 and units >= 3"')},
+                ASSERTIONS['constraint_gte'].NAME: {
+                    'purpose': ('Ensure constraint (e.g. mem) is gte to '
+                                'value'),
+                    'scope': 'application'},
+                ASSERTIONS['constraint_eq'].NAME: {
+                    'purpose': 'Ensure constraint (e.g. arch) equal to value',
+                    'scope': 'application'},
+                ASSERTIONS['consistent'].NAME: {
+                    'purpose': ('Ensure option has the same value on all '
+                                'applications using the charm(s) in value '
+                                '(default is all applications)'),
+                    'scope': 'bundle'},
+                ASSERTIONS['unique'].NAME: {
+                    'purpose': ('Ensure no part of the option value is used '
+                                'by another application using the charm(s) '
+                                'in value (default is all applications)'),
+                    'scope': 'bundle'},
+                ASSERTIONS['subset_of'].NAME: {
+                    'purpose': ('Ensure every part of the option value is set '
+                                'on an application using the charm(s) in '
+                                'value'),
+                    'scope': 'bundle'},
+                ASSERTIONS['related_to'].NAME: {
+                    'purpose': ('Ensure application is related to at least '
+                                'one application using the charm(s) in '
+                                'value'),
+                    'scope': 'application'},
+                ASSERTIONS['related_to_all'].NAME: {
+                    'purpose': ('Ensure application is related to every '
+                                'application using the charm(s) in value'),
+                    'scope': 'application'},
                 ASSERTIONS['eq'].NAME: {
                     'purpose': 'Ensure option equal to value'},
                 ASSERTIONS['neq'].NAME: {
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    CheckResult,
+    register,
+)
+from ua_bundle_checker.assertion.opts import AssertionOptsCommon
+from ua_bundle_checker.assertion.regex import RegexBudgetExceeded
+
+
+class ConsistencyAssertionBase(AssertionBase):
+    """
+    Base class for assertions that compare a charm option across
+    applications. These use scope=bundle and the optional value is a charm
+    name regex or list of them restricting which applications are compared.
+    By default all applications that set the option are compared.
+
+    Comparisons use the per-bundle option index so each option is grouped
+    once rather than rescanning every application for every check.
+    """
+    OPTS = AssertionOptsCommon
+    CHARM_VALUE = True
+
+    def option_groups(self, opt):
+        return self.conf.bundle_index.option_groups(opt, self.value_charms)
+
+    @abc.abstractmethod
+    def check(self, ret, opt, value):
+        raise NotImplementedError
+
+    def __call__(self, charm_config_opt, application):
+        if self.conf.skip:
+            return CheckResult(rc=CheckResult.SKIPPED, opt=charm_config_opt)
+
+        ret = CheckResult(opt=charm_config_opt)
+        if charm_config_opt not in (application.get('options') or {}):
+            ret.reason = "not found"
+            return self.fail(ret)
+
+        value = application['options'][charm_config_opt]
+        try:
+            return self.check(ret, charm_config_opt, value)
+        except RegexBudgetExceeded as exc:
+            ret.rc = CheckResult.WARN
+            ret.reason = str(exc)
+            return ret
+
+
+@register('consistent')
+class AssertionConsistent(ConsistencyAssertionBase):
+    """
+    Return True if option value is the same on all compared applications.
+    """
+
+    def check(self, ret, opt, value):
+        by_value, _ = self.option_groups(opt)
+        others = {v: sorted(apps) for v, apps in by_value.items()
+                  if v != str(value)}
+        if not others:
+            ret.reason = (f"value={value} consistent across "
+                          f"{len(by_value.get(str(value), ()))} applications")
+            return ret
+
+        differ = ', '.join(f"{app}={v}" for v, apps in sorted(others.items())
+                           for app in apps)
+        ret.reason = f"value={value} differs from {differ}"
+        return self.fail(ret)
+
+
+@register('unique')
+class AssertionUnique(ConsistencyAssertionBase):
+    """
+    Return True if no part of the option value (e.g. a vip address) is used
+    by another compared application.
+    """
+
+    def check(self, ret, opt, value):
+        _, by_token = self.option_groups(opt)
+        app_name = self.conf.application_name
+        dups = [f"'{token}' also used by "
+                f"{', '.join(sorted(by_token[token] - {app_name}))}"
+                for token in str(value).split()
+                if by_token.get(token, set()) - {app_name}]
+        if not dups:
+            ret.reason = f"value={value} is unique"
+            return ret
+
+        ret.reason = '; '.join(dups)
+        return self.fail(ret)
+
+
+@register('subset_of')
+class AssertionSubsetOf(ConsistencyAssertionBase):
+    """
+    Return True if every part of the option value is also set for the same
+    option on an application using the charm(s) in value e.g. every region
+    is one of the keystone regions.
+    """
+
+    def check(self, ret, opt, value):
+        if not self.value_charms:
+            ret.reason = "value must be set to the charm(s) to compare with"
+            return self.fail(ret)
+
+        _, by_token = self.option_groups(opt)
+        missing = [t for t in str(value).split() if t not in by_token]
+        if not missing:
+            ret.reason = f"value={value}"
+            return ret
+
+        ret.reason = (f"{', '.join(missing)} not set on any application "
+                      f"using {', '.join(self.value_charms)}")
+        return self.fail(ret)
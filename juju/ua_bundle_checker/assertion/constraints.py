@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+import re
+
+from types import MappingProxyType
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    CheckResult,
+    register,
+)
+from ua_bundle_checker.assertion.opts import AssertionOptsCommon
+
+# Constraint value types. Sizes without a unit suffix are in MiB as per Juju.
+CONSTRAINT_SIZES = ('mem', 'root-disk')
+CONSTRAINT_INTS = ('cores', 'cpu-cores', 'cpu-power')
+CONSTRAINT_LISTS = ('spaces', 'tags', 'zones')
+CONSTRAINT_BOOLS = ('allocate-public-ip',)
+# Juju size suffixes (case insensitive) as powers of 1024 of a MiB.
+SIZE_SUFFIXES = {'m': 0, 'g': 1, 't': 2, 'p': 3, 'e': 4, 'z': 5, 'y': 6}
+SIZE = re.compile(r'(?P<number>\d+(\.\d+)?)(?P<suffix>[mgtpezy])?',
+                  re.IGNORECASE)
+
+
+class ConstraintError(Exception):
+    """ Raised when a constraint string cannot be parsed. """
+
+
+def parse_size(value):
+    """
+    Return a Juju constraint size e.g. 16G in bytes or None if it is not a
+    valid size. Unlike config option sizes (see AssertionBase.atoi) suffixes
+    are case insensitive and always binary, and no suffix means MiB.
+    """
+    match = SIZE.fullmatch(value)
+    if not match:
+        return None
+
+    exponent = SIZE_SUFFIXES[(match.group('suffix') or 'm').lower()]
+    return int(float(match.group('number')) * 1024 ** (exponent + 2))
+
+
+def parse_constraint_value(key, value):
+    """
+    Convert a single constraint value to its typed representation.
+
+    @param key: constraint name e.g. mem
+    @param value: constraint value string e.g. 16G
+    """
+    value = str(value)
+    if key in CONSTRAINT_SIZES:
+        size = parse_size(value)
+        if size is None:
+            raise ConstraintError(f"invalid size '{value}' for {key}")
+
+        return size
+
+    if key in CONSTRAINT_INTS:
+        try:
+            return int(value)
+        except ValueError as exc:
+            raise ConstraintError(f"invalid integer '{value}' for "
+                                  f"{key}") from exc
+
+    if key in CONSTRAINT_LISTS:
+        return frozenset(v for v in value.split(',') if v)
+
+    if key in CONSTRAINT_BOOLS:
+        return value.lower() == 'true'
+
+    return value
+
+
+def format_constraint_value(value):
+    if isinstance(value, frozenset):
+        return ','.join(sorted(value))
+
+    return value
+
+
+def parse_constraints(constraints):
+    """
+    Parse a Juju constraints string e.g. 'mem=16G cores=8 spaces=a,b' into a
+    read-only mapping of typed values.
+    """
+    parsed = {}
+    for token in (constraints or '').split():
+        key, sep, value = token.partition('=')
+        if not sep:
+            raise ConstraintError(f"invalid constraint '{token}'")
+
+        parsed[key] = parse_constraint_value(key, value)
+
+    return MappingProxyType(parsed)
+
+
+class ConstraintAssertionBase(AssertionBase):
+    """
+    Base class for assertions on Juju constraints. These are application
+    scoped and the charm option name is the constraint name e.g. mem.
+
+    Application constraints are used if they set the constraint, otherwise
+    the constraints of every machine the application is placed on must set
+    it. Constraint strings are parsed once per bundle by the bundle index.
+    """
+    OPTS = AssertionOptsCommon
+
+    def get_constraint_values(self, constraint):
+        """
+        Return a list of (source, value) tuples where value is None if the
+        constraint is not set by that source.
+        """
+        index = self.conf.bundle_index
+        app_name = self.conf.application_name
+        constraints = index.app_constraints(app_name)
+        if constraint in constraints:
+            return [('application', constraints[constraint])]
+
+        return [(f"machine {machine}",
+                 index.machine_constraints(machine).get(constraint))
+                for machine in index.app_machines(app_name)]
+
+    @abc.abstractmethod
+    def compare(self, current, expected):
+        raise NotImplementedError
+
+    def __call__(self, charm_config_opt, application):
+        if self.conf.skip:
+            return CheckResult(rc=CheckResult.SKIPPED, opt=charm_config_opt)
+
+        ret = CheckResult(opt=f"constraints {charm_config_opt}")
+        try:
+            expected = parse_constraint_value(charm_config_opt,
+                                              self.conf.value)
+            values = self.get_constraint_values(charm_config_opt)
+        except ConstraintError as exc:
+            ret.reason = str(exc)
+            return self.fail(ret)
+
+        missing = [source for source, value in values if value is None]
+        if not values or missing:
+            ret.reason = "constraint not set"
+            if missing:
+                ret.reason = f"{ret.reason} ({', '.join(missing)})"
+
+            return self.fail(ret)
+
+        failed = [f"{source} value={format_constraint_value(value)}"
+                  for source, value in values
+                  if not self.compare(value, expected)]
+        if failed:
+            ret.reason = (f"{', '.join(failed)}, "
+                          f"expected='{format_constraint_value(expected)}'")
+            return self.fail(ret)
+
+        ret.reason = f"value={format_constraint_value(values[0][1])}"
+        return ret
+
+
+@register('constraint_gte')
+class AssertionConstraintGTE(ConstraintAssertionBase):
+    """
+    Return True if constraint value is >= expected. For list constraints
+    e.g. spaces, the value must be a superset of expected.
+    """
+
+    def compare(self, current, expected):
+        if isinstance(current, str) or isinstance(expected, str):
+            return False
+
+        return current >= expected
+
+
+@register('constraint_eq')
+class AssertionConstraintEQ(ConstraintAssertionBase):
+    """
+    Return True if constraint value == expected.
+    """
+
+    def compare(self, current, expected):
+        return current == expected
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import io
+import operator
+import tokenize
+
+from functools import lru_cache
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    CheckResult,
+    register,
+)
+from ua_bundle_checker.assertion.opts import AssertionOptsCommon
+
+# Suffixes of size literals e.g. 4G or 512M that are not valid python
+# numbers. These are converted with the same semantics as AssertionBase.atoi.
+SIZE_SUFFIXES = frozenset('KMGTkmgt')
+
+NAMES = ('value', 'units')
+
+COMPARE_OPS = {ast.Eq: operator.eq,
+               ast.NotEq: operator.ne,
+               ast.Lt: operator.lt,
+               ast.LtE: operator.le,
+               ast.Gt: operator.gt,
+               ast.GtE: operator.ge,
+               ast.In: lambda a, b: a in b,
+               ast.NotIn: lambda a, b: a not in b}
+
+UNARY_OPS = {ast.Not: operator.not_,
+             ast.USub: operator.neg}
+
+
+class ExprError(Exception):
+    """ Raised when an expression is invalid or uses unsupported syntax. """
+
+
+def to_number(val):
+    """
+    Convert an option value to a number where possible using atoi size
+    suffix semantics e.g. 4G, otherwise return it unchanged.
+    """
+    if isinstance(val, bool) or not isinstance(val, str):
+        return val
+
+    val = AssertionBase.atoi(val.strip())
+    if not isinstance(val, str):
+        return val
+
+    for convert in (int, float):
+        try:
+            return convert(val)
+        except ValueError:
+            pass
+
+    return val
+
+
+def _is_size(number, suffix):
+    """ Return True if two adjacent tokens make up a size literal. """
+    return (number.type == tokenize.NUMBER and number.string.isdigit() and
+            suffix.type == tokenize.NAME and suffix.string in SIZE_SUFFIXES and
+            number.end == suffix.start)
+
+
+def quote_sizes(source):
+    """
+    Quote size literals e.g. 4G so that source can be parsed as python. Only
+    an integer immediately followed by a size suffix is a size literal so
+    text inside strings is left untouched. Source that cannot be tokenized
+    is returned unchanged for the parser to report.
+    """
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    sizes = []
+    prev = None
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if prev is not None and _is_size(prev, tok):
+                sizes.append((offsets[prev.start[0] - 1] + prev.start[1],
+                              offsets[tok.end[0] - 1] + tok.end[1]))
+
+            prev = tok
+    except (tokenize.TokenError, SyntaxError):
+        return source
+
+    for start, end in reversed(sizes):
+        source = f"{source[:start]}'{source[start:end]}'{source[end:]}"
+
+    return source
+
+
+def _compile_compare(node, compile_node):
+    left = compile_node(node.left)
+    steps = tuple((COMPARE_OPS[type(op)], compile_node(comparator))
+                  for op, comparator in zip(node.ops, node.comparators))
+
+    def compare(env):
+        current = left(env)
+        for func, right in steps:
+            other = right(env)
+            if not func(current, other):
+                return False
+
+            current = other
+
+        return True
+
+    return compare
+
+
+def _compile_node(node):  # pylint: disable=too-many-return-statements
+    """ Compile an ast node to a closure taking the evaluation env. """
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.Constant):
+        value = to_number(node.value)
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in NAMES:
+            raise ExprError(f"unknown name '{node.id}' (expected one of "
+                            f"{', '.join(NAMES)})")
+
+        name = node.id
+        return lambda env: env[name]
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        items = tuple(_compile_node(e) for e in node.elts)
+        return lambda env: tuple(item(env) for item in items)
+
+    if isinstance(node, ast.BoolOp):
+        operands = tuple(_compile_node(v) for v in node.values)
+        if isinstance(node.op, ast.And):
+            return lambda env: all(o(env) for o in operands)
+
+        return lambda env: any(o(env) for o in operands)
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        func = UNARY_OPS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda env: func(operand(env))
+
+    if (isinstance(node, ast.Compare) and
+            all(type(op) in COMPARE_OPS for op in node.ops)):
+        return _compile_compare(node, _compile_node)
+
+    raise ExprError(f"unsupported syntax '{type(node).__name__}'")
+
+
+@lru_cache(maxsize=1024)
+def compile_expr(expr):
+    """
+    Compile an expression to a closure that takes a dict of names (value and
+    units) and returns True or False. Only literals, comparisons (including
+    chained comparisons and in), and, or and not are supported. Compiled
+    expressions are cached so each distinct expression is parsed once.
+
+    @param expr: expression string e.g. '3 <= value <= 7 and units >= 3'
+    """
+    source = quote_sizes(str(expr).strip())
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as exc:
+        raise ExprError(f"invalid expression '{expr}': {exc.msg}") from exc
+
+    try:
+        return _compile_node(tree)
+    except ExprError as exc:
+        raise ExprError(f"invalid expression '{expr}': {exc}") from exc
+
+
+@register('expr')
+class AssertionExpr(AssertionBase):
+    """
+    Return True if the expression in value evaluates to True for the option
+    value and number of units of the application.
+    """
+    OPTS = AssertionOptsCommon
+
+    def __call__(self, charm_config_opt, application):
+        if self.conf.skip:
+            return CheckResult(rc=CheckResult.SKIPPED, opt=charm_config_opt)
+
+        current = (application.get('options') or {}).get(charm_config_opt)
+        env = {'value': to_number(current),
+               'units': self.get_units(application)}
+        ret = CheckResult(opt=charm_config_opt, reason=f"value={current}")
+        try:
+            passed = compile_expr(self.conf.value)(env)
+        except ExprError as exc:
+            ret.reason = str(exc)
+            return self.fail(ret)
+        except TypeError:
+            passed = False
+
+        if not passed:
+            ret.reason = (f"value={current}, units={env['units']} does not "
+                          f"satisfy '{self.conf.value}'")
+            return self.fail(ret)
+
+        return ret
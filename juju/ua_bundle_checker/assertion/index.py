@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from functools import cached_property
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    charm_regex,
+)
+from ua_bundle_checker.assertion.constraints import parse_constraints
+
+
+class BundleIndex:
+    """
+    Indexes built once per bundle and shared by all assertions and sections
+    so that bundle-wide lookups do not rescan the bundle.
+    """
+
+    def __init__(self, bundle):
+        """
+        @param bundle: bundle dict (must contain applications or services)
+        """
+        self.bundle = bundle
+        if 'applications' in bundle:
+            self.applications = bundle['applications']
+        else:
+            # legacy juju fallback
+            self.applications = bundle.get('services', {})
+
+        self.machines = {str(m): conf or {} for m, conf in
+                         (bundle.get('machines') or {}).items()}
+        self._constraints = {}
+        self._charm_apps = {}
+        self._option_groups = {}
+
+    def constraints(self, constraints):
+        """
+        Return the parsed form of a constraints string. Each distinct string
+        is parsed only once.
+        """
+        constraints = constraints or ''
+        if constraints not in self._constraints:
+            self._constraints[constraints] = parse_constraints(constraints)
+
+        return self._constraints[constraints]
+
+    def app_constraints(self, app_name):
+        return self.constraints(self.applications[app_name].get(
+                                                              'constraints'))
+
+    def machine_constraints(self, machine):
+        return self.constraints(self.machines.get(str(machine),
+                                                  {}).get('constraints'))
+
+    def app_machines(self, app_name):
+        """
+        Return the machines an application's units are placed directly on
+        i.e. excluding containers.
+        """
+        machines = []
+        for directive in self.applications[app_name].get('to') or []:
+            directive = str(directive)
+            if directive.isdigit() and directive in self.machines:
+                machines.append(directive)
+
+        return machines
+
+    @staticmethod
+    def _split_endpoint(ref):
+        app, _, endpoint = str(ref).partition(':')
+        return app, endpoint or None
+
+    @cached_property
+    def relations(self):
+        """
+        Adjacency map of relations built once per bundle. Keyed by
+        application then local endpoint (None if the bundle did not specify
+        one) with a set of (remote application, remote endpoint) as values.
+        """
+        adjacency = {}
+        for relation in self.bundle.get('relations') or []:
+            if not relation:
+                continue
+
+            # legacy bundles can relate one application to a list of others
+            first, remotes = relation[0], []
+            for remote in relation[1:]:
+                if isinstance(remote, list):
+                    remotes += remote
+                else:
+                    remotes.append(remote)
+
+            for remote in remotes:
+                a, a_ep = self._split_endpoint(first)
+                b, b_ep = self._split_endpoint(remote)
+                adjacency.setdefault(a, {}).setdefault(a_ep,
+                                                       set()).add((b, b_ep))
+                adjacency.setdefault(b, {}).setdefault(b_ep,
+                                                       set()).add((a, a_ep))
+
+        return adjacency
+
+    def related_apps(self, app_name, endpoint=None):
+        """
+        Return the set of applications related to app_name, optionally only
+        those related on the given local endpoint.
+        """
+        endpoints = self.relations.get(app_name, {})
+        if endpoint is not None:
+            return {remote for remote, _ in endpoints.get(endpoint, ())}
+
+        return {remote for remotes in endpoints.values()
+                for remote, _ in remotes}
+
+    def app_uses_charm(self, app_name, charms):
+        """
+        Return True if app_name uses a charm matching any of the given charm
+        name regexes.
+        """
+        charm = self.applications.get(app_name, {}).get('charm', '')
+        return any(charm_regex(c).match(charm) for c in charms)
+
+    def apps_using_charms(self, charms):
+        """
+        Return the set of applications using a charm matching any of the
+        given charm name regexes. Cached per set of charms.
+        """
+        charms = tuple(charms)
+        if charms not in self._charm_apps:
+            self._charm_apps[charms] = frozenset(
+                app for app in self.applications
+                if self.app_uses_charm(app, charms))
+
+        return self._charm_apps[charms]
+
+    def related_to_charms(self, app_name, charms, endpoint=None):
+        """
+        Return the applications related to app_name that use a charm matching
+        any of the given charm name regexes. This is O(degree) of app_name.
+        """
+        return {remote for remote in self.related_apps(app_name, endpoint)
+                if self.app_uses_charm(remote, charms)}
+
+    def _resolve_directive(self, directive, placement, resolving):
+        """
+        Resolve a placement directive to a host. Returns a machine id, a
+        ('unknown', target) tuple if the host cannot be determined or None
+        if the unit is placed on a new machine.
+        """
+        # e.g. 0, lxd:0, lxd:mysql/1, mysql/1, lxd, new
+        target = directive.rpartition(':')[2]
+        if target.isdigit():
+            return target
+
+        app_name, sep, unit = target.partition('/')
+        if sep and unit.isdigit():
+            hosts = self._resolve_app(app_name, placement, resolving)
+            if hosts and int(unit) < len(hosts):
+                return hosts[int(unit)]
+
+            return ('unknown', target)
+
+        if target in self.applications:
+            # placed alongside some unit of target
+            return ('unknown', target)
+
+        return None
+
+    def _resolve_app(self, app_name, placement, resolving):
+        if app_name in placement:
+            return placement[app_name]
+
+        if app_name in resolving or app_name not in self.applications:
+            # unknown application or circular placement
+            return None
+
+        resolving.add(app_name)
+        application = self.applications[app_name]
+        directives = [str(d) for d in application.get('to') or []]
+        hosts = []
+        for unit in range(AssertionBase.get_units(application)):
+            host = None
+            if unit < len(directives):
+                host = self._resolve_directive(directives[unit], placement,
+                                               resolving)
+
+            if host is None:
+                host = ('new', app_name, unit)
+
+            hosts.append(host)
+
+        placement[app_name] = hosts
+        return hosts
+
+    @cached_property
+    def placement(self):
+        """
+        Map of application to the host of each of its units, built once per
+        bundle. A host is a machine id, ('new', app, unit) for a unit placed
+        on its own new machine or ('unknown', target) if the host cannot be
+        determined from the bundle.
+        """
+        placement = {}
+        for app_name in self.applications:
+            self._resolve_app(app_name, placement, set())
+
+        return placement
+
+    def unit_hosts(self, app_name):
+        return self.placement.get(app_name, [])
+
+    def unit_zones(self, app_name):
+        """
+        Return the availability zone of each unit of the application or None
+        where it cannot be determined. Zones come from the host machine's
+        zones constraint or, failing that, the application's.
+        """
+        app_zones = self.app_constraints(app_name).get('zones')
+        zones = []
+        for host in self.unit_hosts(app_name):
+            host_zones = None
+            if isinstance(host, str):
+                host_zones = self.machine_constraints(host).get('zones')
+
+            host_zones = host_zones or app_zones
+            if host_zones and len(host_zones) == 1:
+                zones.append(next(iter(host_zones)))
+            else:
+                zones.append(None)
+
+        return zones
+
+    @cached_property
+    def options(self):
+        """
+        Map of charm option name to {application: value} built in a single
+        pass over the bundle.
+        """
+        options = {}
+        for app_name, application in self.applications.items():
+            for opt, value in (application.get('options') or {}).items():
+                options.setdefault(opt, {})[app_name] = value
+
+        return options
+
+    def option_values(self, opt, charms=None):
+        """
+        Return {application: value} for applications that set opt,
+        optionally restricted to applications using the given charms.
+        """
+        values = self.options.get(opt, {})
+        if not charms:
+            return values
+
+        apps = self.apps_using_charms(charms)
+        return {app: value for app, value in values.items() if app in apps}
+
+    def option_groups(self, opt, charms=None):
+        """
+        Return a tuple of ({value: apps}, {token: apps}) for applications
+        that set opt, optionally restricted to applications using the given
+        charms. Tokens are the whitespace separated parts of each value e.g.
+        each address in a vip. Computed once per option and set of charms.
+        """
+        key = (opt, tuple(charms or ()))
+        if key not in self._option_groups:
+            by_value = {}
+            by_token = {}
+            for app, value in self.option_values(opt, charms).items():
+                by_value.setdefault(str(value), set()).add(app)
+                for token in str(value).split():
+                    by_token.setdefault(token, set()).add(app)
+
+            self._option_groups[key] = (by_value, by_token)
+
+        return self._option_groups[key]
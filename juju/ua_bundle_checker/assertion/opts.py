@@ -66,7 +66,7 @@ class AssertionOptsCommon(AssertionOptsBase):
             AssertionOpt('source', str, None,
                          'Set to one of [local|bundle|master]'),
             AssertionOpt('scope', str, None,
-                         'Set to one of [config|application]'),
+                         'Set to one of [config|application|bundle]'),
             AssertionOpt('value', str, None,
                          ('Value we are checking against. Note that if '
                           'source=master this must be regex with '
@@ -107,3 +107,27 @@ class AssertHAAssertionOpts(AssertionOptsCommon):
                f'is {min_units}')
         super().__init__(data + [AssertionOpt('min-units', int, min_units,
                                               msg)])
+
+
+class RelationAssertionOpts(AssertionOptsCommon):
+    """ Assertion options for relation assertions. """
+
+    def __init__(self, data=None):
+        if not data:
+            data = []
+
+        super().__init__(data + [AssertionOpt('endpoint', str, None,
+                                              'Only consider relations on '
+                                              'this local endpoint')])
+
+
+class HAPlacementAssertionOpts(AssertHAAssertionOpts):
+    """ Assertion options for the AssertHAPlacement assertion. """
+
+    def __init__(self, data=None):
+        if not data:
+            data = []
+
+        super().__init__(data + [AssertionOpt('spread', str, 'machine',
+                                              'Set to one of [machine|zone]. '
+                                              'Default is machine')])
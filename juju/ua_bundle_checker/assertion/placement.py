@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    CheckResult,
+    register,
+)
+from ua_bundle_checker.assertion.constraints import ConstraintError
+from ua_bundle_checker.assertion.opts import HAPlacementAssertionOpts
+
+
+@register('assert_ha_placement')
+class AssertionAssertHAPlacement(AssertionBase):
+    """
+    Return True if the application's units are spread over at least
+    min-units distinct machines (or availability zones).
+
+    Placement directives are resolved against the bundle's machines using
+    the placement index built once per bundle. Units placed in containers
+    are on the same host as the machine they are placed on and units without
+    a directive are placed on their own new machine.
+    """
+    OPTS = HAPlacementAssertionOpts
+
+    @staticmethod
+    def _shared(units_by_location):
+        shared = []
+        for location, units in units_by_location.items():
+            if len(units) > 1:
+                units = ','.join(str(u) for u in units)
+                shared.append(f"{location} has units {units}")
+
+        return shared
+
+    def __call__(self, charm_config_opt, application):
+        if self.conf.skip:
+            return CheckResult(rc=CheckResult.SKIPPED, opt=charm_config_opt)
+
+        spread = self.conf.spread
+        index = self.conf.bundle_index
+        app_name = self.conf.application_name
+        ret = CheckResult(opt=f"HA placement (>={self.conf.min_units} "
+                              f"{spread}s)")
+        try:
+            if spread == 'zone':
+                locations = index.unit_zones(app_name)
+            else:
+                locations = index.unit_hosts(app_name)
+        except ConstraintError as exc:
+            ret.reason = str(exc)
+            return self.fail(ret)
+
+        units_by_location = {}
+        for unit, location in enumerate(locations):
+            if isinstance(location, str):
+                location = f"{spread} {location}"
+            elif location is None or location[0] == 'unknown':
+                location = f"unknown {spread}"
+            else:
+                # a new machine, shared by any units placed on the unit that
+                # gets it
+                location = f"new {spread} {location[1]}/{location[2]}"
+
+            units_by_location.setdefault(location, []).append(unit)
+
+        distinct = len([loc for loc in units_by_location
+                        if not loc.startswith('unknown')])
+        ret.reason = f"units spread over {distinct} {spread}s"
+        if distinct >= self.conf.min_units:
+            return ret
+
+        shared = self._shared(units_by_location)
+        ret.reason = (f"units spread over {distinct} distinct {spread}s "
+                      f"(expected='>={self.conf.min_units}')")
+        if shared:
+            ret.reason = f"{ret.reason}; {'; '.join(shared)}"
+
+        return self.fail(ret)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import time
+
+from functools import lru_cache
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # python < 3.11
+    import sre_parse  # pylint: disable=deprecated-module
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Time in seconds after which a single match is reported as slow.
+REGEX_MATCH_BUDGET = 0.05
+
+_REPEATS = ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+_UNBOUNDED = sre_parse.MAXREPEAT
+
+
+class UnsafeRegexError(Exception):
+    """ Raised when a pattern is invalid or prone to catastrophic
+    backtracking. """
+
+
+class RegexBudgetExceeded(Exception):
+    """
+    Raised once a match has returned if it took longer than its time
+    budget.
+    """
+
+    def __init__(self, pattern, elapsed, budget):
+        self.pattern = pattern
+        self.elapsed = elapsed
+        self.budget = budget
+        super().__init__(f"regex '{pattern}' exceeded match time budget "
+                         f"({elapsed:.3f}s > {budget}s)")
+
+
+def _subpatterns(op, av):
+    """ Return the sub-patterns nested under a parsed pattern item. """
+    subpatterns = []
+    if op.name in _REPEATS:
+        subpatterns = [av[2]]
+    elif op.name == 'SUBPATTERN':
+        subpatterns = [av[-1]]
+    elif op.name == 'BRANCH':
+        subpatterns = av[1]
+    elif op.name in ('ASSERT', 'ASSERT_NOT'):
+        subpatterns = [av[1]]
+    elif op.name == 'ATOMIC_GROUP':
+        subpatterns = [av]
+    elif op.name == 'GROUPREF_EXISTS':
+        subpatterns = [p for p in av[1:] if p is not None]
+
+    return subpatterns
+
+
+def _first_chars(pattern):
+    """
+    Return the set of characters the pattern can start with or None if that
+    set is unknown or unbounded.
+    """
+    for op, av in pattern:
+        if op.name == 'AT':
+            continue
+
+        chars = None
+        if op.name == 'LITERAL':
+            chars = {av}
+        elif op.name == 'SUBPATTERN':
+            chars = _first_chars(av[-1])
+        elif op.name in _REPEATS and av[0] > 0:
+            chars = _first_chars(av[2])
+        elif op.name == 'BRANCH':
+            chars = set()
+            for branch in av[1]:
+                first = _first_chars(branch)
+                if first is None:
+                    return None
+
+                chars.update(first)
+
+        return chars
+
+    return None
+
+
+def _has_unbounded_repeat(pattern):
+    for op, av in pattern:
+        if op.name in _REPEATS and av[1] == _UNBOUNDED:
+            return True
+
+        for sub in _subpatterns(op, av):
+            if _has_unbounded_repeat(sub):
+                return True
+
+    return False
+
+
+def _has_ambiguous_branch(pattern):
+    for op, av in pattern:
+        if op.name == 'BRANCH':
+            seen = set()
+            for branch in av[1]:
+                first = _first_chars(branch)
+                if first is None or seen.intersection(first):
+                    return True
+
+                seen.update(first)
+
+        if op.name == 'SUBPATTERN' and _has_ambiguous_branch(av[-1]):
+            return True
+
+    return False
+
+
+def _find_unsafe(pattern):
+    for op, av in pattern:
+        if op.name in _REPEATS and av[1] > 1:
+            body = av[2]
+            if _has_unbounded_repeat(body):
+                return "nested quantifiers"
+
+            if av[1] == _UNBOUNDED and _has_ambiguous_branch(body):
+                return "quantified alternation with overlapping branches"
+
+        for sub in _subpatterns(op, av):
+            reason = _find_unsafe(sub)
+            if reason:
+                return reason
+
+    return None
+
+
+def check_pattern(pattern):
+    """
+    Raise UnsafeRegexError if pattern is invalid or contains constructs known
+    to cause catastrophic backtracking e.g. (a+)+ or (a|aa)*.
+
+    @param pattern: regular expression string
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as exc:
+        raise UnsafeRegexError(f"invalid regex '{pattern}': {exc}") from exc
+
+    reason = _find_unsafe(parsed)
+    if reason:
+        raise UnsafeRegexError(f"regex '{pattern}' is prone to catastrophic "
+                               f"backtracking ({reason})")
+
+
+class SafeRegex:
+    """
+    A compiled regular expression whose slow matches are reported.
+
+    If the re2 module is available patterns are compiled with it since it
+    guarantees linear time matching. Otherwise the stdlib re module is used
+    and any match that takes longer than the budget raises
+    RegexBudgetExceeded rather than returning a result. CPython's re cannot
+    be interrupted so this only happens after the match returns; it does not
+    stop a catastrophic match from stalling. Such patterns are instead
+    rejected up front by check_pattern().
+    """
+
+    def __init__(self, pattern, budget=REGEX_MATCH_BUDGET):
+        self.pattern = pattern
+        self.budget = budget
+        self.linear = False
+        self._regex = None
+        if re2 is not None:
+            try:
+                self._regex = re2.compile(pattern)
+                self.linear = True
+            except re2.error:
+                # e.g. backreferences are not supported by re2
+                pass
+
+        if self._regex is None:
+            self._regex = re.compile(pattern)
+
+    def _run(self, func, string):
+        if self.linear:
+            return func(string)
+
+        start = time.monotonic()
+        ret = func(string)
+        elapsed = time.monotonic() - start
+        if elapsed > self.budget:
+            raise RegexBudgetExceeded(self.pattern, elapsed, self.budget)
+
+        return ret
+
+    def match(self, string):
+        return self._run(self._regex.match, string)
+
+    def fullmatch(self, string):
+        return self._run(self._regex.fullmatch, string)
+
+
+@lru_cache(maxsize=1024)
+def get_regex(pattern):
+    """ Return a cached SafeRegex for pattern. """
+    return SafeRegex(pattern)
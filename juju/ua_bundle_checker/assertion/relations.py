@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import abc
+
+from ua_bundle_checker.assertion.commands import (
+    AssertionBase,
+    CheckResult,
+    register,
+)
+from ua_bundle_checker.assertion.opts import RelationAssertionOpts
+from ua_bundle_checker.assertion.regex import RegexBudgetExceeded
+
+
+class RelationAssertionBase(AssertionBase):
+    """
+    Base class for assertions on bundle relations. These are application
+    scoped and the value is a charm name regex or list of them. Lookups use
+    the relation adjacency index built once per bundle.
+    """
+    OPTS = RelationAssertionOpts
+    CHARM_VALUE = True
+
+    @abc.abstractmethod
+    def check(self, ret, app_name):
+        raise NotImplementedError
+
+    def __call__(self, charm_config_opt, application):
+        if self.conf.skip:
+            return CheckResult(rc=CheckResult.SKIPPED, opt=charm_config_opt)
+
+        ret = CheckResult(opt=f"relation {charm_config_opt}")
+        try:
+            return self.check(ret, self.conf.application_name)
+        except RegexBudgetExceeded as exc:
+            ret.rc = CheckResult.WARN
+            ret.reason = str(exc)
+            return ret
+
+    @property
+    def endpoint_info(self):
+        if self.conf.endpoint:
+            return f" on endpoint '{self.conf.endpoint}'"
+
+        return ""
+
+
+@register('related_to')
+class AssertionRelatedTo(RelationAssertionBase):
+    """
+    Return True if the application is related to at least one application
+    using one of the given charms.
+    """
+
+    def check(self, ret, app_name):
+        index = self.conf.bundle_index
+        related = index.related_to_charms(app_name, self.value_charms,
+                                          self.conf.endpoint)
+        if related:
+            ret.reason = f"related to {', '.join(sorted(related))}"
+            return ret
+
+        ret.reason = (f"not related to any application using "
+                      f"{', '.join(self.value_charms)}{self.endpoint_info}")
+        return self.fail(ret)
+
+
+@register('related_to_all')
+class AssertionRelatedToAll(RelationAssertionBase):
+    """
+    Return True if the application is related to every application using
+    one of the given charms.
+    """
+
+    def check(self, ret, app_name):
+        index = self.conf.bundle_index
+        expected = index.apps_using_charms(self.value_charms) - {app_name}
+        missing = expected - index.related_apps(app_name, self.conf.endpoint)
+        if not missing:
+            ret.reason = f"related to all {len(expected)} applications"
+            return ret
+
+        ret.reason = (f"not related to {', '.join(sorted(missing))}"
+                      f"{self.endpoint_info}")
+        return self.fail(ret)
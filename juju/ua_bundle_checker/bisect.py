@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+from functools import lru_cache
+
+import yaml
+
+from ua_bundle_checker.assertion.commands import AssertionAssertChannel
+from ua_bundle_checker.checker import (
+    BundleCheckerError,
+    check_bundle,
+    ChecksManager,
+    get_bundle,
+)
+
+DEFAULT_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                            os.path.expanduser('~/.cache')),
+                             'ua-bundle-checker', 'bisect-cache.json')
+
+
+@lru_cache(maxsize=None)
+def checker_digest():
+    """
+    Return a digest of the checker source. This package has no release
+    version so the code itself identifies which checker produced a result.
+    """
+    digest = hashlib.sha1()
+    top = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(top):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, top).encode())
+                with open(path, 'rb') as fd:
+                    digest.update(fd.read())
+
+    return digest.hexdigest()
+
+
+class Git:
+    """ Read-only access to blobs in a git repository. """
+
+    def __init__(self, path):
+        """
+        @param path: path of a file or directory in the repository.
+        """
+        self.cwd = path if os.path.isdir(path) else os.path.dirname(path)
+        self.cwd = self.cwd or '.'
+
+    def run(self, *args):
+        try:
+            return subprocess.run(['git', '-C', self.cwd, *args],
+                                  check=True, capture_output=True,
+                                  text=True).stdout
+        except subprocess.CalledProcessError as exc:
+            raise BundleCheckerError(f"git {' '.join(args)} failed: "
+                                     f"{exc.stderr.strip()}") from exc
+
+    def repo_path(self, path):
+        """ Return path relative to the top of the repository. """
+        prefix = self.run('rev-parse', '--show-prefix').strip()
+        return os.path.normpath(os.path.join(prefix, os.path.basename(path)))
+
+    def revisions(self, rev_range):
+        """
+        Return the revisions in rev_range (good..bad) oldest first, including
+        good.
+        """
+        good, sep, bad = rev_range.partition('..')
+        if not sep or not good or not bad:
+            raise BundleCheckerError(f"invalid range '{rev_range}' - expected "
+                                     "<good>..<bad>")
+
+        revs = self.run('rev-list', '--reverse', '--first-parent',
+                        f"{good}..{bad}").split()
+        return [self.run('rev-parse', good).strip()] + revs
+
+    def blob_sha(self, rev, path):
+        """ Return the sha of path at rev or None if it does not exist. """
+        try:
+            return self.run('rev-parse', '--verify', '--quiet',
+                            f"{rev}:{path}").strip()
+        except BundleCheckerError:
+            return None
+
+    def blob(self, sha):
+        return self.run('cat-file', 'blob', sha)
+
+    def subject(self, rev):
+        return self.run('log', '-1', '--format=%h %s', rev).strip()
+
+
+class BisectCache:
+    """
+    Results of checking a bundle blob keyed by blob sha, the checks and the
+    checker source. Results are saved so that repeated bisects do not re-run
+    checks. Entries from other checks or checker code are never reused but
+    are not removed either so delete the cache to reclaim space.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = path
+        self.hits = 0
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as fd:
+                    self.entries = json.load(fd)
+            except (OSError, ValueError):
+                # a corrupt cache is simply rebuilt
+                self.entries = {}
+
+    def get(self, key):
+        if key in self.entries:
+            self.hits += 1
+
+        return self.entries.get(key)
+
+    def set(self, key, failures):
+        self.entries[key] = failures
+
+    def save(self):
+        if not self.path:
+            return
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as fd:
+            json.dump(self.entries, fd)
+
+        os.replace(tmp, self.path)
+
+
+class BundleBisector:  # pylint: disable=too-many-instance-attributes
+    """
+    Find the first revision in a git range at which a check goes from
+    passing to failing. Bundles are read directly from git objects (nothing
+    is checked out) and revisions are evaluated using binary search.
+
+    Revisions whose bundle cannot be loaded are skipped, like git bisect
+    skip. If skipped revisions are left next to the first failing revision
+    they are recorded in ambiguous since any of them could be the first.
+    """
+
+    def __init__(self, git, bundle_path, checks, cache, **target):
+        """
+        @param git: Git
+        @param bundle_path: path of the bundle relative to the repository.
+        @param checks: dict of checks e.g. as returned by ChecksManager.checks
+        @param cache: BisectCache
+        @param target: optional section, opt and method restricting which
+                       check is considered. Default is any check.
+        """
+        self.git = git
+        self.bundle_path = bundle_path
+        self.cache = cache
+        self.target = target
+        self.checks = self._select(checks)
+        self.checks_sha = hashlib.sha1(json.dumps(self.checks, sort_keys=True,
+                                                  default=str).encode())
+        self.checks_sha = self.checks_sha.hexdigest()
+        self.evaluations = 0
+        self.skipped = []
+        self.ambiguous = []
+
+    def _select(self, checks):
+        label = self.target.get('section')
+        if label:
+            if label not in checks:
+                raise BundleCheckerError(f"section '{label}' not found in "
+                                         "checks")
+
+            checks = {label: checks[label]}
+
+        opt = self.target.get('opt')
+        method = self.target.get('method')
+        selected = {}
+        for label, section in checks.items():
+            assertions = section.get('assertions') or {}
+            if opt:
+                assertions = {k: v for k, v in assertions.items() if k == opt}
+
+            if method:
+                assertions = {k: {m: s for m, s in (v or {}).items()
+                                  if m == method}
+                              for k, v in assertions.items()}
+
+            selected[label] = dict(section, assertions=assertions)
+
+        return selected
+
+    def _is_target(self, result):
+        # a channel check is added to every section so only consider it if
+        # it is what we are looking for.
+        if result.opt.startswith('charmhub channel'):
+            return (self.target.get('opt') in (None, 'charm_channel') and
+                    self.target.get('method') in (None,
+                                                  AssertionAssertChannel.NAME))
+
+        return True
+
+    def _load(self, sha):
+        """ Return the bundle in blob sha or None if it cannot be checked. """
+        try:
+            bundle = get_bundle(self.git.blob(sha))
+        except yaml.YAMLError:
+            return None
+
+        if not isinstance(bundle, dict):
+            return None
+
+        apps = bundle.get('applications', bundle.get('services'))
+        if not isinstance(apps, dict):
+            return None
+
+        return bundle
+
+    def failures(self, rev):
+        """
+        Return the list of target FAIL results for the bundle at rev or None
+        if the bundle cannot be loaded e.g. it is not valid yaml or has no
+        applications.
+        """
+        sha = self.git.blob_sha(rev, self.bundle_path)
+        if sha is None:
+            return []
+
+        key = f"{sha}:{self.checks_sha}:{checker_digest()}"
+        failures = self.cache.get(key)
+        if failures is None:
+            bundle = self._load(sha)
+            if bundle is None:
+                self.skipped.append(rev)
+                return None
+
+            self.evaluations += 1
+            report = check_bundle(bundle, self.checks, errors_only=True)
+            failures = []
+            for app, categories in report.results.items():
+                failures += [f"{app}: {r.unformatted()}"
+                             for r in categories.get('FAIL', [])
+                             if self._is_target(r)]
+
+            self.cache.set(key, failures)
+
+        return failures
+
+    def bisect(self, rev_range):
+        """
+        Return (revision, failures) for the first failing revision in the
+        range or (None, []) if the last revision does not fail.
+        """
+        revs = self.git.revisions(rev_range)
+        first_failures = self.failures(revs[-1])
+        if first_failures is None:
+            raise BundleCheckerError(f"bundle at {revs[-1]} cannot be "
+                                     "loaded - please provide a bad revision "
+                                     "that can be checked")
+
+        if not first_failures:
+            return None, []
+
+        failures = self.failures(revs[0])
+        if failures is None:
+            raise BundleCheckerError(f"bundle at {revs[0]} cannot be loaded "
+                                     "- please provide a good revision that "
+                                     "can be checked")
+
+        if failures:
+            raise BundleCheckerError(f"check already fails at {revs[0]} - "
+                                     "please provide an earlier good "
+                                     "revision")
+
+        # invariant: revs[lo] passes and revs[hi] fails
+        lo, hi = 0, len(revs) - 1
+        skipped = set()
+        while True:
+            candidates = [i for i in range(lo + 1, hi) if i not in skipped]
+            if not candidates:
+                break
+
+            # the untested revision nearest the middle
+            mid = min(candidates, key=lambda i: abs(i - (lo + hi) // 2))
+            failures = self.failures(revs[mid])
+            if failures is None:
+                skipped.add(mid)
+            elif failures:
+                hi, first_failures = mid, failures
+            else:
+                lo = mid
+
+        self.ambiguous = revs[lo + 1:hi]
+        return revs[hi], first_failures
+
+
+def bisect(args):
+    """
+    Command line entry point for --bisect.
+
+    @return: exit code
+    """
+    if not args.bundle:
+        print("ERROR: --bundle is required with --bisect")
+        return 1
+
+    checks_mgr = ChecksManager(args.type, args.checks_path)
+    git = Git(args.bundle)
+    cache = BisectCache(args.bisect_cache)
+    bisector = BundleBisector(git, git.repo_path(args.bundle),
+                              checks_mgr.checks, cache,
+                              section=args.bisect_section,
+                              opt=args.bisect_opt,
+                              method=args.bisect_method)
+    rev, failures = bisector.bisect(args.bisect)
+    cache.save()
+    if rev is None:
+        print(f"No failures found at the end of {args.bisect}")
+    else:
+        print(f"First failing revision: {git.subject(rev)}")
+        for failure in failures:
+            print(f" {failure}")
+
+        if bisector.ambiguous:
+            print("\nWARNING: the bundle could not be loaded at these "
+                  "preceding revisions so any of them could be the first "
+                  "failing revision:")
+            for skipped in bisector.ambiguous:
+                print(f" {git.subject(skipped)}")
+
+    print(f"\n{bisector.evaluations} revision(s) checked, {cache.hits} "
+          f"cached result(s) used, {len(bisector.skipped)} skipped")
+    return 0
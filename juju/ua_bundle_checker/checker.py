@@ -17,23 +17,38 @@
 #  - edward.hope-morley@canonical.com
 
 import os
-import sys
 
 from dataclasses import dataclass
-from functools import cached_property
+from functools import cached_property, lru_cache
 
 import datetime
 import hashlib
-import re
+import tempfile
 import yaml
 
 from ua_bundle_checker.assertion.commands import (
     AssertionAssertChannel,
+    charm_regex,
     CheckResult,
-    CHARM_REGEX_TEMPLATE,
     LocalAssertionHelpers,
     ASSERTIONS,
 )
+from ua_bundle_checker.assertion.expr import (
+    compile_expr,
+    ExprError,
+)
+from ua_bundle_checker.assertion.index import BundleIndex
+from ua_bundle_checker.assertion.regex import (
+    check_pattern,
+    RegexBudgetExceeded,
+    UnsafeRegexError,
+)
+from ua_bundle_checker.status import (
+    get_status,
+    normalize_status,
+    overlay_status,
+    read_status,
+)
 
 HEADER_TEMPLATE = "=" * 80 + """
 UA Juju bundle config verification
@@ -44,46 +59,88 @@ UA Juju bundle config verification
  * assertions_sha1={}
 """ + "=" * 80
 
-OUT = None
-
 
 class BundleCheckerError(Exception):
     """ Raised when an error occurs while checking a bundle. """
 
 
 class OutputManager:
-    """ Manage output directed at a file and/or stdout. """
+    """
+    Manage output directed at a file and/or stdout.
+
+    Output is written to a temporary file alongside the logfile which is
+    atomically renamed into place by close() so that concurrent runs never
+    delete or interleave each other's logs.
+    """
 
-    def __init__(self, logfile, verbose=False):
+    def __init__(self, logfile, verbose=False, latest_link=None):
+        """
+        @param logfile: path to logfile.
+        @param verbose: if True all output is also sent to stdout.
+        @param latest_link: optional path to a symlink that will be pointed
+                            at logfile once it is complete.
+        """
         self.logfile = logfile
         self.verbose = verbose
+        self.latest_link = latest_link
+        self._fd = None
+        self._tmpfile = None
 
     def setup(self):
-        if os.path.exists(self.logfile):
-            os.unlink(self.logfile)
+        fd, self._tmpfile = tempfile.mkstemp(
+                              prefix=f".{os.path.basename(self.logfile)}.",
+                              suffix='.tmp',
+                              dir=os.path.dirname(self.logfile) or '.')
+        self._fd = os.fdopen(fd, 'w', encoding='utf-8')
+        return self
+
+    def close(self):
+        if self._fd is None:
+            return
+
+        self._fd.close()
+        self._fd = None
+        os.chmod(self._tmpfile, 0o644)
+        os.replace(self._tmpfile, self.logfile)
+        if self.latest_link:
+            target = os.path.relpath(self.logfile,
+                                     os.path.dirname(self.latest_link) or '.')
+            tmp_link = f"{self.latest_link}.{os.getpid()}.tmp"
+            os.symlink(target, tmp_link)
+            os.replace(tmp_link, self.latest_link)
 
-        global OUT  # pylint: disable=global-statement
-        OUT = self
+    def __enter__(self):
+        return self.setup()
+
+    def __exit__(self, *args):
+        self.close()
 
     def print(self, entry, stdout=False):
         if self.verbose or stdout:
             print(entry)
 
-        with open(self.logfile, 'a', encoding='utf-8') as fd:
-            if hasattr(entry, 'unformatted'):
-                entry = entry.unformatted()
+        if hasattr(entry, 'unformatted'):
+            entry = entry.unformatted()
 
-            fd.write(f"{entry}\n")
+        self._fd.write(f"{entry}\n")
 
 
 @dataclass
-class UABundleCheckerParams:
+class UABundleCheckerParams:  # pylint: disable=too-many-instance-attributes
     """ Parameters for the UABundleChecker """
     bundle_apps: dict
     charm_regex: str
     assertions: dict
     fce_config: str
     errors_only: bool = False
+    # If True, results are counted as they are produced and only WARN/FAIL
+    # results are retained.
+    summary_only: bool = False
+    # Maximum number of WARN/FAIL results retained per application when
+    # summary_only is True. None means no limit.
+    max_errors_per_app: int = None
+    # Indexes over the whole bundle shared by all sections.
+    bundle_index: BundleIndex = None
 
 
 @dataclass
@@ -100,39 +157,64 @@ class UABundleChecker:
 
     def __init__(self, params):
         self.params = params
+        if params.bundle_index is None:
+            params.bundle_index = BundleIndex({'applications':
+                                               params.bundle_apps})
+
         self.applications = []
         self.charm_name = None
         self.results = {}
+        self.summary = {}
+        self.dropped = {}
 
-    def show_results(self):
-        if not self.results:
+    def show_results(self, out):
+        """
+        Print results to an output manager.
+
+        @param out: OutputManager (or any object with a print() method)
+        """
+        if not self.results and not self.dropped:
             return
 
-        for app, results in self.results.items():
-            if (self.params.errors_only and
+        apps = list(self.results)
+        apps += [app for app in self.dropped if app not in self.results]
+        for app in apps:
+            results = self.results.get(app, {})
+            if (self.params.errors_only and app not in self.dropped and
                     set(results.keys()) == set(["PASS"])):
                 continue
 
-            OUT.print(f"=> application '{app}'")
+            out.print(f"=> application '{app}'")
             for category in results:
                 if self.params.errors_only and category == "PASS":
                     continue
 
                 for result in results[category]:
-                    OUT.print(result)
+                    out.print(result)
 
-    def get_results_summary(self):
-        summary = {}
-        for results in self.results.values():
-            for category in results:
-                if category in summary:
-                    summary[category] += len(results[category])
-                else:
-                    summary[category] = len(results[category])
+            if app in self.dropped:
+                out.print(f"... {self.dropped[app]} more WARN/FAIL results "
+                          "not retained")
 
-        return summary
+    def get_results_summary(self):
+        return dict(self.summary)
 
     def add_result(self, app_name, result):
+        rc_str = result.rc_str
+        self.summary[rc_str] = self.summary.get(rc_str, 0) + 1
+        if self.params.summary_only:
+            if result.rc not in (CheckResult.WARN, CheckResult.FAIL):
+                return
+
+            max_errors = self.params.max_errors_per_app
+            if max_errors is not None:
+                retained = sum(len(r) for r in
+                               self.results.get(app_name, {}).values())
+                if retained >= max_errors:
+                    self.dropped[app_name] = self.dropped.get(app_name,
+                                                              0) + 1
+                    return
+
         if app_name not in self.results:
             self.results[app_name] = {}
 
@@ -222,10 +304,14 @@ class UABundleChecker:
     def run(self, context, allow_missing=False, ignore_fails=False):
         assertion = ASSERTIONS[context.method](context.settings)
         assertion.conf.bundle_apps = self.params.bundle_apps
+        assertion.conf.bundle_index = self.params.bundle_index
+        assertion.conf.application_name = context.application
         application = self.params.bundle_apps[context.application]
 
         assertion_scope = context.settings.get('scope', 'config')
-        if assertion_scope == "application":
+        # bundle scoped assertions compare config across applications and
+        # handle a missing option themselves.
+        if assertion_scope in ("application", "bundle"):
             result = assertion(context.opt, application)
             self.add_result(context.application, result)
             return result.passed
@@ -281,11 +367,17 @@ class UABundleChecker:
 
     def get_applications(self):
         self.applications = []
+        regex = charm_regex(self.params.charm_regex)
         for app in self.params.bundle_apps:
-            regex_str = self.params.charm_regex
             charm = self.params.bundle_apps[app].get('charm')
-            r = re.compile(CHARM_REGEX_TEMPLATE.format(
-                regex_str, regex_str, regex_str)).match(charm)
+            try:
+                r = regex.match(charm)
+            except RegexBudgetExceeded as exc:
+                self.add_result(app, CheckResult(CheckResult.WARN,
+                                                 opt='charm',
+                                                 reason=str(exc)))
+                continue
+
             if r:
                 self.charm_name = r[0]
                 self.applications.append(app)
@@ -295,61 +387,239 @@ class UABundleChecker:
         return len(self.applications) > 0
 
 
-def finish(checks_run):
-    OUT.print("\nResults:")
-    main_summary = {s: 0 for rc, s in CheckResult.RC_MAP.items()}
-    for check in checks_run:
-        check_summary = check.get_results_summary()
-        for cat in check_summary:
-            if main_summary.get(cat):
-                main_summary[cat] += check_summary[cat]
-            else:
-                main_summary[cat] = check_summary[cat]
+@dataclass
+class Report:
+    """ Results of checking a bundle against a set of checks. """
+    checkers: list
+    # charm regexes for which no application was found in the bundle
+    unmatched: list
 
-        check.show_results()
+    @property
+    def summary(self):
+        summary = {s: 0 for rc, s in CheckResult.RC_MAP.items()}
+        for checker in self.checkers:
+            for cat, count in checker.get_results_summary().items():
+                summary[cat] = summary.get(cat, 0) + count
+
+        return summary
+
+    @property
+    def results(self):
+        """ Return a dict of results keyed by application name. """
+        results = {}
+        for checker in self.checkers:
+            for app, categories in checker.results.items():
+                app_results = results.setdefault(app, {})
+                for cat, entries in categories.items():
+                    app_results.setdefault(cat, []).extend(entries)
+
+        return results
+
+    @property
+    def passed(self):
+        return self.summary[CheckResult.RC_MAP[CheckResult.FAIL]] == 0
+
+
+def finish(report, out, errors_only=False):
+    """
+    Print the contents of a report to an output manager.
+
+    @param report: Report
+    @param out: OutputManager (or any object with a print() method)
+    @param errors_only: if True no INFO is printed for unmatched charms.
+    """
+    if not errors_only:
+        for charm_regex_str in report.unmatched:
+            out.print(f"INFO: no match found for {charm_regex_str} - "
+                      "skipping")
+
+    out.print("\nResults:")
+    for check in report.checkers:
+        check.show_results(out)
 
     # Show summary
-    OUT.print("\nSummary:", stdout=True)
-    for cat in main_summary:
-        OUT.print(f" {cat}: {main_summary[cat]}", stdout=True)
+    summary = report.summary
+    out.print("\nSummary:", stdout=True)
+    for cat in summary:
+        out.print(f" {cat}: {summary[cat]}", stdout=True)
 
-    print("\nINFO: see --help for more options")
-    print(f"Results saved in {OUT.logfile}")
+
+@lru_cache(maxsize=1024)
+def _pattern_error(pattern):
+    """ Return why pattern is unsafe or None if it is safe. """
+    try:
+        check_pattern(pattern)
+    except UnsafeRegexError as exc:
+        return str(exc)
+
+    return None
+
+
+def _structure_errors(label, section):
+    """ Return a list of errors in the structure of a checks section. """
+    if not isinstance(section, dict) or not isinstance(section.get('charm'),
+                                                       str):
+        return [f"{label}: section must be a mapping with a charm name"]
+
+    assertions = section.get('assertions')
+    if not isinstance(assertions, (dict, type(None))):
+        return [f"{label}: assertions must be a mapping"]
+
+    errors = []
+    for opt, methods in (assertions or {}).items():
+        if not isinstance(methods, (dict, type(None))):
+            errors.append(f"{label}: {opt}: assertions must be a mapping")
+            continue
+
+        for method, settings in (methods or {}).items():
+            if method not in ASSERTIONS:
+                errors.append(f"{label}: {opt}: unknown assertion method "
+                              f"'{method}'")
+            elif not isinstance(settings, (dict, type(None))):
+                errors.append(f"{label}: {opt}: {method} settings must be a "
+                              "mapping")
+
+    return errors
 
 
-def run_checks(checks, args, bundle_apps):
+def _settings_patterns(method, settings):
+    """ Return the regexes used by the settings of an assertion. """
+    if settings.get('regex'):
+        return [str(settings.get('value')).strip()]
+
+    if ASSERTIONS[method].CHARM_VALUE:
+        value = settings.get('value')
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+
+        return [str(v) for v in value if v is not None]
+
+    return []
+
+
+def validate_checks(checks, source='checks'):
+    """
+    Ensure that checks are well formed and that all regular expressions
+    used by them are valid and not prone to catastrophic backtracking so
+    that a bad check is rejected up front rather than failing or stalling
+    a run. Expressions are compiled here too so that each is parsed once
+    and errors are reported at load. Results are cached by pattern so
+    validating on every run is cheap.
+
+    @param checks: dict of checks e.g. as returned by ChecksManager.checks
+    @param source: where the checks came from, used in the error.
+    @return: checks
+    @raises BundleCheckerError: if any check is invalid.
+    """
+    if not isinstance(checks, dict):
+        raise BundleCheckerError(f"invalid checks found in {source}: checks "
+                                 "must be a mapping")
+
+    errors = []
+    for label, section in checks.items():
+        structure_errors = _structure_errors(label, section)
+        if structure_errors:
+            errors += structure_errors
+            continue
+
+        patterns = [section['charm']]
+        for assertions in (section.get('assertions') or {}).values():
+            for method, settings in (assertions or {}).items():
+                patterns += _settings_patterns(method, settings or {})
+                if method == 'expr':
+                    try:
+                        compile_expr((settings or {}).get('value'))
+                    except ExprError as exc:
+                        errors.append(f"{label}: {exc}")
+
+        for pattern in patterns:
+            error = _pattern_error(pattern)
+            if error:
+                errors.append(f"{label}: {error}")
+
+    if errors:
+        raise BundleCheckerError(f"invalid checks found in {source}:\n" +
+                                 "\n".join(errors))
+
+    return checks
+
+
+def run_checks(checks, bundle_apps, fce_config=None, **options):
     """
     Execute all assertions.
 
     NOTE: a default assert_channel check is added for all charms if not
           provided in the yaml.
+
+    Checks are validated first (see validate_checks()) so unsafe regexes
+    are rejected whichever entry point is used.
+
+    @param options: optional UABundleCheckerParams fields e.g. errors_only.
+    @return: Report
+    @raises BundleCheckerError: if the checks are invalid.
     """
+    validate_checks(checks)
+    if (options.get('max_errors_per_app') is not None and
+            not options.get('summary_only')):
+        raise BundleCheckerError("max_errors_per_app requires summary_only")
+
+    if options.get('bundle_index') is None:
+        options['bundle_index'] = BundleIndex({'applications': bundle_apps})
+
     checks_run = []
-    for label, assertions in checks.items():
-        section = checks[label]
-        assertions = section.get('assertions') or {}
+    unmatched = []
+    for section in checks.values():
+        # copy so that the caller's checks are never modified
+        assertions = dict(section.get('assertions') or {})
 
         # Ensure we check charm_channel for all charms
         key = 'charm_channel'
         if (key not in assertions or
-                assertions[key].get(AssertionAssertChannel.NAME,
-                                    {}).get('scope') != 'application'):
+                (assertions[key] or {}).get(AssertionAssertChannel.NAME,
+                                            {}).get('scope') !=
+                'application'):
             assertions[key] = {AssertionAssertChannel.NAME: {
                                         'scope': 'application'}}
 
         checker = UABundleChecker(UABundleCheckerParams(bundle_apps,
                                                         section['charm'],
                                                         assertions,
-                                                        args.fce_config,
-                                                        args.errors_only))
-        if not args.errors_only and not checker.has_charm_matches():
-            OUT.print("INFO: no match found for "
-                      f"{checker.params.charm_regex} - skipping")
-
+                                                        fce_config,
+                                                        **options))
         checker.run_assertions()
+        if not checker.applications:
+            unmatched.append(checker.params.charm_regex)
+
         checks_run.append(checker)
 
-    return checks_run
+    return Report(checks_run, unmatched)
+
+
+def get_bundle_apps(bundle):
+    try:
+        return bundle['applications']
+    except KeyError:
+        # legacy juju fallback
+        return bundle['services']
+
+
+def check_bundle(bundle, checks, fce_config=None, **kwargs):
+    """
+    Check a bundle against a set of checks without performing any output.
+    This does not depend on any global state so it is safe to call
+    concurrently from multiple threads.
+
+    @param bundle: bundle dict e.g. as returned by get_bundle()
+    @param checks: dict of checks e.g. as returned by ChecksManager.checks
+    @param fce_config: optional path to FCE config.
+    @param kwargs: passed to run_checks() e.g. summary_only=True
+    @return: Report
+    @raises BundleCheckerError: if the checks are invalid.
+    """
+    if kwargs.get('bundle_index') is None:
+        kwargs['bundle_index'] = BundleIndex(bundle)
+
+    return run_checks(checks, get_bundle_apps(bundle), fce_config, **kwargs)
 
 
 class ChecksManager:
@@ -390,6 +660,9 @@ class ChecksManager:
         self.checks  # pylint: disable=pointless-statement
         return self.full_type
 
+    def _validate(self, checks):
+        return validate_checks(checks, self.path)
+
     @cached_property
     def checks(self):
         """
@@ -402,13 +675,13 @@ class ChecksManager:
 
         for group, checks in check_defs.items():
             if group == 'checks':
-                return checks
+                return self._validate(checks)
 
             if self.group is None or self.group == group:
                 if not self.group:
                     self.full_type = f"{self.full_type}:{group}"
 
-                return checks['checks']
+                return self._validate(checks['checks'])
 
         raise BundleCheckerError("no checks group found with name "
                                  f"'{self.group}' in {self.path}")
@@ -423,10 +696,76 @@ def get_bundle(bundle_blob):
     return list(docs)[0]
 
 
+def load_bundle(bundle, status_blob, out):
+    """
+    Load the bundle to check from a bundle file and/or the output of
+    juju status --format=json. If both are provided the live state from the
+    status is overlaid on the bundle.
+
+    @param bundle: path to bundle file or None
+    @param status_blob: juju status json string or None
+    @param out: OutputManager used to report errors.
+    @return: bundle dict or None if it could not be loaded.
+    """
+    bundle_yaml = None
+    if bundle:
+        try:
+            with open(bundle, encoding='utf-8') as fd:
+                bundle_blob = fd.read()
+        except OSError as e:
+            out.print(f"ERROR: Error opening/reading bundle file: {e}")
+            return None
+
+        try:
+            bundle_yaml = get_bundle(bundle_blob)
+        except ValueError as e:
+            out.print(f"ERROR: Error parsing the bundle file: {e}")
+            out.print("Please check the above errors and run again.")
+            return None
+
+    if status_blob is None:
+        return bundle_yaml
+
+    try:
+        status = get_status(status_blob)
+    except ValueError as e:
+        out.print(f"ERROR: Error parsing the status json: {e}")
+        return None
+
+    if bundle_yaml is None:
+        return normalize_status(status)
+
+    return overlay_status(bundle_yaml, status)
+
+
+def log_paths(output_dir, logname, per_run=False):
+    """
+    Return the path of the results log and of the symlink to point at it
+    (or None).
+
+    @param output_dir: directory the log is saved in.
+    @param logname: log name without the .log suffix.
+    @param per_run: if True give the log a unique name and link
+                    <logname>.latest.log to it so that concurrent runs do
+                    not overwrite each other's log.
+    """
+    if not per_run:
+        return os.path.join(output_dir, f"{logname}.log"), None
+
+    run_id = f"{datetime.datetime.now():%Y%m%d-%H%M%S}.{os.getpid()}"
+    return (os.path.join(output_dir, f"{logname}.{run_id}.log"),
+            os.path.join(output_dir, f"{logname}.latest.log"))
+
+
 def setup(args):
+    """
+    Command line entry point.
+
+    @return: exit code
+    """
     if args.schema:
         LocalAssertionHelpers({}).show_schema()
-        sys.exit(0)
+        return 0
 
     bundle = None
     if args.bundle:
@@ -440,41 +779,48 @@ def setup(args):
     elif bundle and not os.path.exists(args.bundle):
         raise BundleCheckerError("ERROR: --bundle must be a path")
 
-    if not bundle:
-        print("ERROR: one of --bundle or --fce-config is required")
-        sys.exit(1)
+    if not bundle and not args.status:
+        print("ERROR: one of --bundle, --status or --fce-config is required")
+        return 1
 
     checks_mgr = ChecksManager(args.type, args.checks_path)
 
+    status_blob = read_status(args.status)
     bundle_sha = hashlib.sha1()
-    with open(bundle, 'rb') as fd:
-        bundle_sha.update(fd.read())
+    if bundle:
+        with open(bundle, 'rb') as fd:
+            bundle_sha.update(fd.read())
+
+    bundle_sha.update((status_blob or '').encode())
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    logfile, latest_link = log_paths(
+                                args.output_dir,
+                                f"ua-bundle-checks.{checks_mgr.checks_type}",
+                                args.per_run_log)
+    sources = [bundle] if bundle else []
+    if args.status:
+        sources.append(f"status:{args.status}")
+
+    with OutputManager(logfile, not args.quiet, latest_link) as out:
+        out.print(HEADER_TEMPLATE.format(datetime.datetime.now(),
+                                         checks_mgr.type, ' + '.join(sources),
+                                         bundle_sha.hexdigest(),
+                                         checks_mgr.hash.hexdigest()),
+                  stdout=True)
+
+        bundle_yaml = load_bundle(bundle, status_blob, out)
+        if bundle_yaml is None:
+            return 1
+
+        report = check_bundle(bundle_yaml, checks_mgr.checks,
+                              args.fce_config,
+                              errors_only=args.errors_only,
+                              summary_only=args.summary_only,
+                              max_errors_per_app=args.max_errors_per_app)
+        finish(report, out, args.errors_only)
 
-    OutputManager(f"ua-bundle-checks.{checks_mgr.checks_type}.log",
-                  not args.quiet).setup()
-    OUT.print(HEADER_TEMPLATE.format(datetime.datetime.now(), checks_mgr.type,
-                                     bundle, bundle_sha.hexdigest(),
-                                     checks_mgr.hash.hexdigest()),
-              stdout=True)
-
-    try:
-        with open(bundle, encoding='utf-8') as fd:
-            bundle_blob = fd.read()
-    except OSError as e:
-        OUT.print(f"ERROR: Error opening/reading bundle file: {e}")
-        sys.exit(1)
-
-    try:
-        bundle_yaml = get_bundle(bundle_blob)
-    except ValueError as e:
-        OUT.print(f"ERROR: Error parsing the bundle file: {e}")
-        OUT.print("Please check the above errors and run again.")
-        sys.exit(1)
-
-    try:
-        _bundle_apps = bundle_yaml['applications']
-    except KeyError:
-        # legacy juju fallback
-        _bundle_apps = bundle_yaml['services']
-
-    finish(run_checks(checks_mgr.checks, args, _bundle_apps))
+    print("\nINFO: see --help for more options")
+    print(f"Results saved in {out.logfile}")
+    return 0
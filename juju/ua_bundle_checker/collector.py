@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from ua_bundle_checker.checker import (
+    BundleCheckerError,
+    check_bundle,
+    ChecksManager,
+    finish,
+    get_bundle,
+    log_paths,
+    OutputManager,
+    Report,
+)
+
+# Command used to fetch a bundle. {target} is replaced with each
+# <controller>:<model> target.
+DEFAULT_FETCH_COMMAND = ('juju', 'export-bundle', '-m', '{target}')
+
+
+class BundleFetchError(Exception):
+    """ Raised when a bundle cannot be fetched for a target. """
+
+
+@dataclass
+class FleetResult:
+    """ Outcome of fetching and checking the bundle of one target. """
+    target: str
+    report: Report = None
+    error: str = None
+    attempts: int = 0
+    seconds: float = 0.0
+
+    @property
+    def passed(self):
+        return self.error is None and self.report.passed
+
+    def __str__(self):
+        if self.error:
+            return (f"{self.target}: ERROR after {self.attempts} attempt(s) "
+                    f"({self.error})")
+
+        summary = ', '.join(f"{cat}={count}" for cat, count in
+                            self.report.summary.items())
+        return f"{self.target}: {summary} ({self.seconds:.1f}s)"
+
+
+class FleetCollector:
+    """
+    Fetch bundles from many controllers/models concurrently and check each
+    one as soon as it arrives.
+
+    Fetches are run as subprocesses with at most concurrency in flight at
+    any time. Each attempt is bounded by timeout and failed attempts are
+    retried. Checks run in a worker thread (check_bundle() is thread safe) so
+    that slow checks do not hold up fetches.
+    """
+
+    def __init__(self, checks, command=DEFAULT_FETCH_COMMAND, **options):
+        """
+        @param checks: dict of checks e.g. as returned by ChecksManager.checks
+        @param command: fetch command as a sequence. Occurrences of {target}
+                        are replaced with the target and the bundle is read
+                        from stdout.
+        @param options: concurrency (maximum number of concurrent fetches,
+                        default 8), timeout (seconds allowed for each fetch
+                        attempt, default 60) and retries (number of times a
+                        failed fetch is retried, default 2). Anything else is
+                        passed to check_bundle() e.g. summary_only.
+        @raises BundleCheckerError: if an option is out of range.
+        """
+        self.checks = checks
+        self.command = tuple(command)
+        self.concurrency = options.pop('concurrency', 8)
+        self.timeout = options.pop('timeout', 60)
+        self.retries = options.pop('retries', 2)
+        if self.concurrency < 1:
+            raise BundleCheckerError("concurrency must be at least 1")
+
+        if self.timeout <= 0:
+            raise BundleCheckerError("timeout must be greater than 0")
+
+        if self.retries < 0:
+            raise BundleCheckerError("retries must not be negative")
+
+        self.retry_delay = 1.0
+        self.check_options = options
+
+    async def fetch(self, target):
+        """ Fetch the bundle for a target and return it as a string. """
+        cmd = [arg.replace('{target}', target) for arg in self.command]
+        proc = await asyncio.create_subprocess_exec(
+                                            *cmd,
+                                            stdout=asyncio.subprocess.PIPE,
+                                            stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(),
+                                                    self.timeout)
+        except asyncio.TimeoutError as exc:
+            proc.kill()
+            await proc.wait()
+            raise BundleFetchError(f"timed out after {self.timeout}s") from exc
+
+        if proc.returncode != 0:
+            err = stderr.decode(errors='replace').strip()
+            raise BundleFetchError(f"'{' '.join(cmd)}' failed with exit code "
+                                   f"{proc.returncode}: {err}")
+
+        return stdout.decode()
+
+    async def collect_one(self, target, semaphore):
+        result = FleetResult(target)
+        start = time.monotonic()
+        blob = None
+        async with semaphore:
+            while result.attempts <= self.retries:
+                result.attempts += 1
+                try:
+                    blob = await self.fetch(target)
+                    break
+                except (BundleFetchError, OSError) as exc:
+                    result.error = str(exc)
+                    if result.attempts <= self.retries:
+                        await asyncio.sleep(self.retry_delay)
+
+        if blob is None:
+            return result
+
+        result.error = None
+        try:
+            bundle = get_bundle(blob)
+            result.report = await asyncio.to_thread(check_bundle, bundle,
+                                                    self.checks,
+                                                    **self.check_options)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            result.error = f"failed to check bundle: {exc}"
+
+        result.seconds = time.monotonic() - start
+        return result
+
+    async def collect(self, targets, on_result=None):
+        """
+        Fetch and check all targets.
+
+        @param targets: list of <controller>:<model> targets.
+        @param on_result: optional callable called with each FleetResult as
+                          soon as it is available.
+        @return: list of FleetResult in the order they completed.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = []
+        for task in asyncio.as_completed([self.collect_one(t, semaphore)
+                                          for t in targets]):
+            result = await task
+            if on_result:
+                on_result(result)
+
+            results.append(result)
+
+        return results
+
+    def run(self, targets, on_result=None):
+        return asyncio.run(self.collect(targets, on_result))
+
+
+def get_targets(path):
+    """
+    Read targets from a file (or stdin if path is -) with one
+    <controller>:<model> per line. Blank lines and comments are ignored.
+    """
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding='utf-8') as fd:
+            lines = fd.read().splitlines()
+
+    targets = []
+    for line in lines:
+        line = line.partition('#')[0].strip()
+        if line:
+            targets.append(line)
+
+    return targets
+
+
+def fleet(args):
+    """
+    Command line entry point for --fleet.
+
+    @return: exit code, 1 if any target could not be checked or has FAIL
+             results.
+    """
+    checks_mgr = ChecksManager(args.type, args.checks_path)
+    targets = get_targets(args.fleet)
+    collector = FleetCollector(checks_mgr.checks,
+                               concurrency=args.fleet_concurrency,
+                               timeout=args.fleet_timeout,
+                               retries=args.fleet_retries,
+                               errors_only=args.errors_only,
+                               summary_only=args.summary_only,
+                               max_errors_per_app=args.max_errors_per_app)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    logfile, latest_link = log_paths(
+                        args.output_dir,
+                        f"ua-bundle-checks.{checks_mgr.checks_type}.fleet",
+                        args.per_run_log)
+    with OutputManager(logfile, False, latest_link) as out:
+        out.print(f"Fleet check of {len(targets)} target(s) started "
+                  f"{datetime.datetime.now()} (type={checks_mgr.type})",
+                  stdout=True)
+
+        log_only = SimpleNamespace(
+                    print=lambda entry, stdout=False: out.print(entry))
+
+        def on_result(result):
+            # per-target details only go to the log
+            out.print(result, stdout=True)
+            out.print("=" * 80 + f"\nTarget: {result.target}")
+            if result.error:
+                out.print(f"ERROR: {result.error}")
+            else:
+                finish(result.report, log_only, args.errors_only)
+
+        results = collector.run(targets, on_result)
+
+    errors = [r for r in results if r.error]
+    failed = [r for r in results if not r.error and not r.report.passed]
+    print(f"\n{len(results)} target(s) checked: {len(failed)} with FAIL "
+          f"results, {len(errors)} could not be checked")
+    print(f"Results saved in {out.logfile}")
+    return 1 if errors or failed else 0
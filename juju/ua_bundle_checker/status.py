@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+import sys
+
+# Bundle application keys that describe the live model and so are taken from
+# a status snapshot when it is overlaid on an exported bundle.
+LIVE_KEYS = ('charm', 'channel', 'num_units', 'scale', 'to')
+
+
+def read_status(path):
+    """
+    Return the contents of a juju status json file, stdin if path is - or
+    None if no path is given.
+    """
+    if not path:
+        return None
+
+    if path == '-':
+        return sys.stdin.read()
+
+    with open(path, encoding='utf-8') as fd:
+        return fd.read()
+
+
+def get_status(status_blob):
+    """ Parse the output of juju status --format=json. """
+    return json.loads(status_blob)
+
+
+def _charm_url(app_status):
+    charm = app_status.get('charm', '')
+    if ':' in charm:
+        # older juju e.g. cs:ceph-mon-55
+        return charm
+
+    name = app_status.get('charm-name') or charm
+    if app_status.get('charm-origin') == 'local':
+        return f"local:{name}"
+
+    return f"ch:{name}"
+
+
+def _placement(machine):
+    """
+    Convert a unit machine from status to a bundle placement directive
+    e.g. 0 -> 0 and 0/lxd/1 -> lxd:0.
+
+    Bundles cannot express nested containers so a unit in a nested container
+    e.g. 0/lxd/1/kvm/2 is placed in the innermost container type on the root
+    machine (kvm:0), which is the host that shares its failure domain.
+    """
+    parts = str(machine).split('/')
+    if len(parts) >= 3:
+        return f"{parts[-2]}:{parts[0]}"
+
+    return parts[0]
+
+
+def _unit_number(unit_name):
+    try:
+        return int(unit_name.rpartition('/')[2])
+    except ValueError:
+        return 0
+
+
+def _relations(app_name, app_status):
+    relations = []
+    for endpoint, remotes in (app_status.get('relations') or {}).items():
+        for remote in remotes:
+            if isinstance(remote, dict):
+                # juju >= 3
+                remote = remote.get('related-application')
+
+            if remote and remote != app_name:
+                relations.append([f"{app_name}:{endpoint}", remote])
+
+    return relations
+
+
+def _machine(machine_status):
+    """ Map a machine from status to a bundle machine. """
+    constraints = machine_status.get('constraints', '')
+    hardware = dict(item.partition('=')[::2] for item in
+                    machine_status.get('hardware', '').split())
+    zone = hardware.get('availability-zone')
+    if zone and 'zones=' not in constraints:
+        constraints = f"{constraints} zones={zone}".strip()
+
+    machine = {}
+    if constraints:
+        machine['constraints'] = constraints
+
+    if machine_status.get('series'):
+        machine['series'] = machine_status['series']
+
+    return machine
+
+
+def normalize_status(status):
+    """
+    Map a juju status --format=json snapshot onto the bundle structure that
+    the checks expect. Unit counts, placement and channels reflect the live
+    model. Status does not include application config so the applications
+    have no options unless overlaid on an exported bundle with
+    overlay_status().
+
+    @param status: dict as returned by get_status()
+    @return: bundle dict with applications, machines and relations.
+    """
+    applications = {}
+    relations = []
+    for app_name, app_status in (status.get('applications') or {}).items():
+        app = {'charm': _charm_url(app_status)}
+        if app_status.get('charm-channel'):
+            app['channel'] = app_status['charm-channel']
+
+        if 'scale' in app_status:
+            # kubernetes
+            app['scale'] = app_status['scale']
+        elif 'subordinate-to' not in app_status:
+            units = sorted(app_status.get('units') or {}, key=_unit_number)
+            app['num_units'] = len(units)
+            to = [_placement(app_status['units'][u]['machine'])
+                  for u in units if 'machine' in app_status['units'][u]]
+            if to:
+                app['to'] = to
+
+        if app_status.get('constraints'):
+            app['constraints'] = app_status['constraints']
+
+        applications[app_name] = app
+        relations += _relations(app_name, app_status)
+
+    machines = {str(m): _machine(conf or {})
+                for m, conf in (status.get('machines') or {}).items()}
+    return {'applications': applications,
+            'machines': machines,
+            'relations': relations}
+
+
+def overlay_status(bundle, status):
+    """
+    Return a copy of bundle with the live state of each application from a
+    status snapshot e.g. real unit counts and current channels. Config and
+    other bundle settings are retained. Machines and relations are taken
+    from the snapshot.
+
+    @param bundle: bundle dict e.g. as returned by get_bundle()
+    @param status: dict as returned by get_status()
+    """
+    live = normalize_status(status)
+    bundle = copy.deepcopy(bundle)
+    key = 'applications' if 'applications' in bundle else 'services'
+    apps = {}
+    for app_name, live_app in live['applications'].items():
+        # applications no longer in the model are dropped
+        app = bundle[key].get(app_name) or {}
+        for live_key in LIVE_KEYS:
+            app.pop(live_key, None)
+            if live_key in live_app:
+                app[live_key] = live_app[live_key]
+
+        apps[app_name] = app
+
+    bundle[key] = apps
+    bundle['machines'] = live['machines']
+    bundle['relations'] = live['relations']
+    return bundle
@@ -34,6 +34,15 @@ if [ -z "$OPENRC" ] || ! [ -r "$OPENRC" ]; then
 fi
 . $OPENRC
 
+# Take a single juju status snapshot to be shared by all checks unless one is
+# provided.
+if [ -z "${JUJU_STATUS_JSON:-}" ]; then
+    JUJU_STATUS_JSON=`mktemp`
+    trap "rm -f $JUJU_STATUS_JSON" EXIT
+    juju status --format=json > $JUJU_STATUS_JSON
+fi
+export JUJU_STATUS_JSON
+
 # See function definitions for explanation.
 CHECKS_DIR=`dirname $0`/extra-checks.d
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fio_runner.logstats import (
+    DEFAULT_CHUNK_SIZE,
+    LogError,
+    parse_log,
+    parse_log_lines,
+)
+
+
+def generate_log(path, samples):
+    """ Write a synthetic fio latency log with samples lines. """
+    rand = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as fd:
+        for n in range(samples):
+            fd.write(f"{n * 10}, {rand.randint(50000, 5000000)}, {n % 2}, "
+                     f"4096, {rand.randint(0, 2 ** 30) * 4096}, 0\n")
+
+
+def measure(func, *args):
+    """
+    Return (seconds, peak MiB allocated) of calling func(*args). Memory is
+    measured in a separate call since tracing slows down the parsers.
+    """
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Benchmark the streaming fio log parser against line by "
+                     "line parsing."))
+    parser.add_argument('log', nargs='?',
+                        help=("fio log to parse. A synthetic log is "
+                              "generated if not given."))
+    parser.add_argument('--samples', type=int, default=2000000,
+                        help="Number of samples in the synthetic log.")
+    parser.add_argument('--interval-ms', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Bytes read per chunk by the streaming parser.")
+    args = parser.parse_args()
+
+    path = args.log
+    if not path:
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, 'bench_clat.1.log')
+        generate_log(path, args.samples)
+
+    try:
+        print(f"{path}: {os.path.getsize(path) / 1024 ** 2:.1f} MiB")
+        for name, func, func_args in (
+                ('line by line', parse_log_lines, (path, args.interval_ms)),
+                ('streaming', parse_log, (path, args.interval_ms,
+                                          args.chunk_size))):
+            elapsed, peak = measure(func, *func_args)
+            print(f" {name:<12} time={elapsed:.2f}s peak_mem={peak:.1f}MiB")
+    finally:
+        if not args.log:
+            shutil.rmtree(tmp)
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except LogError as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
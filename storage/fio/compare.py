@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+
+from fio_runner.archive import ArchiveError
+from fio_runner.compare import (
+    compare_runs,
+    COMPARE_METRICS,
+    CompareError,
+    DEFAULT_ALPHA,
+    DEFAULT_INTERVAL_MS,
+    DEFAULT_THRESHOLDS,
+    FORMATS,
+)
+from fio_runner.logstats import LogError
+from fio_runner.summary import SummaryError
+
+
+def parse_threshold(value):
+    metric, sep, pct = value.partition('=')
+    if not sep or metric not in COMPARE_METRICS:
+        raise argparse.ArgumentTypeError(
+            f"expected METRIC=PERCENT with METRIC one of "
+            f"{', '.join(COMPARE_METRICS)}")
+
+    try:
+        return metric, float(pct)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid percent '{pct}'") from exc
+
+
+def main():
+    defaults = ', '.join(f"{m}={p:g}" for m, p in DEFAULT_THRESHOLDS.items())
+    parser = argparse.ArgumentParser(
+        description=("Compare fio test runs with a baseline run. Jobs are "
+                     "aligned by class, job and direction and the change in "
+                     "IOPS, bandwidth and tail latency is reported. IOPS and "
+                     "bandwidth changes are tested for significance using "
+                     "the per interval logs. Exits with 1 if any regression "
+                     "that is not noise exceeds its threshold."))
+    parser.add_argument('runs', nargs='+',
+                        help=("Results directories created by run-tests.py "
+                              "or their .tgz (read without being extracted). "
+                              "The first is the baseline."))
+    parser.add_argument('--max-regression', dest='thresholds',
+                        type=parse_threshold, action='append', default=[],
+                        help=("Maximum change for the worse of a metric as "
+                              "METRIC=PERCENT. Can be specified multiple "
+                              f"times. Defaults are {defaults}."))
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help=("Significance level below which a difference "
+                              "is not considered noise."))
+    parser.add_argument('--interval-ms', type=int,
+                        default=DEFAULT_INTERVAL_MS,
+                        help="Interval the logs are sampled at.")
+    parser.add_argument('--format', choices=sorted(FORMATS),
+                        default='table')
+    args = parser.parse_args()
+
+    comparisons, unmatched = compare_runs(args.runs,
+                                          thresholds=dict(args.thresholds),
+                                          alpha=args.alpha,
+                                          interval_ms=args.interval_ms)
+    print(FORMATS[args.format](comparisons), end='')
+    for run, fio_class, job, direction in unmatched:
+        print(f"WARNING: {fio_class}-{job} ({direction}) is not in both "
+              f"{args.runs[0]} and {run}", file=sys.stderr)
+
+    regressions = [c for c in comparisons if c.status == 'regression']
+    if regressions:
+        print(f"{len(regressions)} regression(s) found", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (ArchiveError, CompareError, LogError, SummaryError) as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+
+from fio_runner.archive import ArchiveError
+from fio_runner.graphs import (
+    create_graphs,
+    DEFAULT_FORMATS,
+    DEFAULT_INTERVAL_MS,
+    GraphError,
+)
+from fio_runner.logstats import LogError
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Create bandwidth, IOPS and latency over time graphs "
+                     "from the fio logs of each <class>-<job>.results "
+                     "directory in a test run. Graphs are saved alongside "
+                     "the logs unless --output-dir is given."))
+    parser.add_argument('results_dir',
+                        help=("Results directory created by run-tests.py or "
+                              "its .tgz which is read in a single pass "
+                              "without being extracted."))
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help=("Save graphs in this directory with one "
+                              "sub-directory per job. Default for a .tgz is "
+                              "<name>-graphs next to it."))
+    parser.add_argument('--interval-ms', type=int,
+                        default=DEFAULT_INTERVAL_MS,
+                        help=("Logs are downsampled to one point (mean with "
+                              "a min/max band) per interval."))
+    parser.add_argument('--format', dest='formats', action='append',
+                        choices=['png', 'svg', 'pdf'], default=None,
+                        help=("Graph format. Can be specified multiple times. "
+                              f"Default is {' and '.join(DEFAULT_FORMATS)}."))
+    parser.add_argument('--processes', type=int, default=None,
+                        help=("Number of job directories processed at the "
+                              "same time. Default is the number of CPUs."))
+    args = parser.parse_args()
+
+    graphs = create_graphs(args.results_dir, args.processes,
+                           output_dir=args.output_dir,
+                           interval_ms=args.interval_ms,
+                           formats=tuple(args.formats or DEFAULT_FORMATS))
+    for jobdir, written in graphs.items():
+        print(f"{jobdir}: {len(written)} graph(s)")
+
+    print("Done.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (ArchiveError, GraphError, LogError) as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
@@ -0,0 +1,19 @@
+from fio_runner.runner import (
+    FioJob,
+    FioRunner,
+    FioRunnerError,
+    FioRunParams,
+)
+from fio_runner.templates import (
+    TemplateError,
+    TemplateSet,
+)
+
+__all__ = [
+    'FioJob',
+    'FioRunner',
+    'FioRunnerError',
+    'FioRunParams',
+    'TemplateError',
+    'TemplateSet',
+]
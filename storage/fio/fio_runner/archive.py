@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fnmatch
+import json
+import os
+import posixpath
+import tarfile
+
+from fio_runner import logstats
+from fio_runner.manifest import MANIFEST_NAME, RESULTS_SUFFIX
+from fio_runner.summary import (
+    has_bins,
+    parse_fio_json,
+    split_label,
+    summarize_result,
+)
+
+ARCHIVE_SUFFIXES = ('.tgz', '.tar.gz')
+DEFAULT_INTERVAL_MS = 1000
+
+
+class ArchiveError(Exception):
+    """ Raised when a results archive cannot be read. """
+
+
+def is_archive(path):
+    return path.endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+def archive_name(path):
+    """ Return the name of a results archive without its suffix. """
+    for suffix in ARCHIVE_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+
+    return path
+
+
+def member_path(name):
+    """
+    Return the path of an archive member relative to the run directory at
+    the top of the archive e.g. mytest-1/randread-4k.results/randread-4k.json
+    is randread-4k.results/randread-4k.json.
+    """
+    parts = [p for p in name.split('/') if p not in ('', '.')]
+    return '/'.join(parts[1:])
+
+
+def scan_archive(path, handlers):
+    """
+    Read a gzipped tarball in a single sequential pass, since seeking in a
+    gzip stream is expensive, and pass each regular file matching a pattern
+    to its handler as a stream. Members are never extracted to disk.
+
+    @param handlers: list of (pattern, handler) where pattern is matched
+                     against the member path (see member_path()) and handler
+                     is called as handler(member path, file object). Only the
+                     first matching handler is called.
+    """
+    try:
+        with tarfile.open(path, 'r|gz') as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+
+                name = member_path(member.name)
+                for pattern, handler in handlers:
+                    if fnmatch.fnmatchcase(name, pattern):
+                        handler(name, tar.extractfile(member))
+                        break
+    except (OSError, tarfile.TarError) as exc:
+        raise ArchiveError(f"failed to read {path}: {exc}") from exc
+
+
+class RunArchive:
+    """
+    The results, manifest and logs of a test run read directly from its
+    tarball (as created by run-tests.py or run-tests.sh). Logs are parsed as
+    they are streamed and only their per interval statistics are kept.
+    """
+
+    def __init__(self, path, log_metrics=(), interval_ms=DEFAULT_INTERVAL_MS,
+                 clat_fallback=False):
+        """
+        @param path: path to the .tgz
+        @param log_metrics: metrics (e.g. iops, bw, clat) of the logs to
+                            parse.
+        @param interval_ms: width of the log time buckets in milliseconds.
+        @param clat_fallback: parse completion latency logs of jobs whose
+                              json output has no json+ latency histograms
+                              so that the summary can use them.
+        """
+        self.path = path
+        self.log_metrics = log_metrics
+        self.interval_ms = interval_ms
+        self.clat_fallback = clat_fallback
+        self.manifest = None
+        # job directory: fio json output
+        self.results = {}
+        # (job directory, metric): logstats.LogAggregate
+        self.logs = {}
+
+    @staticmethod
+    def _job_member(name):
+        """ Return (job directory, file name) or None if name is not in a
+        job directory. """
+        jobdir, filename = posixpath.split(name)
+        if '/' in jobdir or not jobdir.endswith(RESULTS_SUFFIX):
+            return None
+
+        return jobdir, filename
+
+    def _read_manifest(self, name, fileobj):
+        try:
+            self.manifest = json.load(fileobj)
+        except ValueError as exc:
+            raise ArchiveError(f"invalid manifest {name} in {self.path}: "
+                               f"{exc}") from exc
+
+    def _read_result(self, name, fileobj):
+        member = self._job_member(name)
+        if member is None:
+            return
+
+        jobdir, filename = member
+        if filename == f"{jobdir[:-len(RESULTS_SUFFIX)]}.json":
+            self.results[jobdir] = parse_fio_json(
+                                        fileobj.read().decode('utf-8'), name)
+
+    def _want_log(self, jobdir, metric):
+        if metric in self.log_metrics:
+            return True
+
+        # the json output usually comes first (it sorts before the logs)
+        # but if it has not been seen yet parse the log anyway.
+        return (self.clat_fallback and metric == 'clat' and
+                not has_bins(self.results.get(jobdir, {})))
+
+    def _read_log(self, name, fileobj):
+        member = self._job_member(name)
+        match = member and logstats.LOG_NAME.match(member[1])
+        if not match or not self._want_log(member[0],
+                                           match.group('metric')):
+            return
+
+        key = (member[0], match.group('metric'))
+        if key not in self.logs:
+            self.logs[key] = logstats.LogAggregate(key[1], self.interval_ms)
+
+        self.logs[key].add(logstats.parse_stream(
+                                logstats.log_reader(fileobj, name),
+                                self.interval_ms, name=name))
+
+    def read(self):
+        """ Read the archive in one pass. """
+        if self.log_metrics or self.clat_fallback:
+            logstats.check_numpy()
+
+        handlers = [(MANIFEST_NAME, self._read_manifest),
+                    (f"*{RESULTS_SUFFIX}/*.json", self._read_result)]
+        if self.log_metrics or self.clat_fallback:
+            compressed = f"*.log{logstats.COMPRESSED_SUFFIX}"
+            handlers += [(f"*{RESULTS_SUFFIX}/*.log", self._read_log),
+                         (f"*{RESULTS_SUFFIX}/{compressed}", self._read_log)]
+
+        scan_archive(self.path, handlers)
+        return self
+
+    def jobs(self):
+        """
+        Return a list of (class, job, job directory) of each job with json
+        output. The manifest is used if there is one, otherwise class and job
+        are taken from the directory name.
+        """
+        if self.manifest:
+            return [(j['fio_class'], j['job'], j['dir'])
+                    for j in self.manifest.get('jobs', [])
+                    if j.get('dir') in self.results]
+
+        return [(*split_label(jobdir[:-len(RESULTS_SUFFIX)]), jobdir)
+                for jobdir in sorted(self.results)]
+
+    def intervals(self, jobdir, metric):
+        """
+        Return the per interval statistics of the logs of a metric of a job.
+
+        @return: dict of direction to (times, means, lows, highs) arrays
+                 or None if the job has no such logs.
+        """
+        aggregate = self.logs.get((jobdir, metric))
+        return None if aggregate is None else aggregate.intervals()
+
+    def summarize(self):
+        """ Return a list of JobSummary for every job in the archive. """
+        summaries = []
+        for fio_class, job, jobdir in self.jobs():
+            data = self.results[jobdir]
+            clat_stats = None
+            if not has_bins(data) and (jobdir, 'clat') in self.logs:
+                clat_stats = self.logs[(jobdir, 'clat')].merged
+
+            summaries += summarize_result(fio_class, job, data, clat_stats)
+
+        return summaries
+
+
+def summarize_archive(path):
+    """ Return a list of JobSummary for every job in a results tarball. """
+    return RunArchive(path, clat_fallback=logstats.numpy is not None
+                      ).read().summarize()
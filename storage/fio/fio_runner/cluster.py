@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+
+from dataclasses import dataclass, fields
+
+from fio_runner.summary import (
+    client_jobs,
+    find_results,
+    format_table,
+    JobSummary,
+    load_fio_json,
+    summarize_result,
+    TABLE_COLUMNS,
+)
+
+# Seconds allowed for the job to be sent to every fio server before the
+# synchronised start.
+DEFAULT_START_DELAY = 10
+DEFAULT_PORT = 8765
+# Script run by the fio servers to wait for the synchronised start. It needs
+# to be at the same path on every server host.
+SYNC_SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                           os.pardir, 'tools',
+                                           'sync-start.sh'))
+# Characters fio's job file parser treats specially in option values.
+FIO_SPECIAL = re.compile(r'[$;#]')
+INCLUDE_COMMON = re.compile(r'^[ \t]*include[ \t]+common-global\.fio[ \t]*$',
+                            re.MULTILINE)
+
+
+def client_command(fio, hosts, config, output):
+    """
+    Return a fio client command that runs config on each fio server (started
+    with fio --server) and writes the json output of all of them to output.
+
+    @param hosts: list of fio servers as host[,port]
+    """
+    cmd = [fio, '--output-format=json+', f'--output={output}']
+    for host in hosts:
+        cmd += [f'--client={host}', config]
+
+    return cmd
+
+
+def sync_prerun(start_at, script=SYNC_SCRIPT):
+    """
+    Return an exec_prerun command that runs script to wait until start_at
+    (seconds since the epoch) so that the job starts at the same time on
+    every host. Host clocks are expected to be synchronised e.g. with NTP.
+
+    The wait is left to a script rather than inlined as a shell command
+    since fio substitutes $ expressions and strips comments in job files.
+
+    @param script: path of tools/sync-start.sh on the fio servers.
+    """
+    if FIO_SPECIAL.search(script) or not script.strip():
+        raise ValueError(f"invalid sync script path '{script}'")
+
+    return f"{script} {int(start_at)}"
+
+
+def client_config(config, common, remote_dir=None, start_at=None,
+                  sync_script=SYNC_SCRIPT):
+    """
+    Return a self-contained config for fio servers. Servers resolve include
+    directives and relative paths in their own working directory so the
+    common global config is inlined.
+
+    @param remote_dir: directory the servers create IO files in.
+    @param start_at: synchronised start time (seconds since the epoch).
+    @param sync_script: path of the script that waits until start_at on the
+                        servers.
+    """
+    lines = common.rstrip('\n').splitlines()
+    if remote_dir:
+        lines.append(f"directory={remote_dir}")
+
+    if start_at:
+        lines.append(f"exec_prerun={sync_prerun(start_at, sync_script)}")
+
+    block = '\n'.join(f" {line.strip()}" for line in lines if line.strip())
+    if INCLUDE_COMMON.search(config):
+        return INCLUDE_COMMON.sub(lambda _: block, config, count=1)
+
+    return f"[global]\n{block}\n{config}"
+
+
+@dataclass
+class HostSummary(JobSummary):
+    """ Summary of one direction of a class x job on one host. """
+    host: str = None
+
+
+HOST_TABLE_COLUMNS = (('host', 'host', '{}'),) + TABLE_COLUMNS
+
+
+def summarize_hosts(fio_class, job, data):
+    """
+    Return a list of HostSummary for each host in fio client/server json
+    output. The cluster as a whole is summarised by summarize_result().
+    """
+    hosts = {}
+    for stats in client_jobs(data):
+        host = stats.get('hostname', 'unknown')
+        if stats.get('port') not in (None, DEFAULT_PORT):
+            host = f"{host},{stats['port']}"
+
+        hosts.setdefault(host, []).append(stats)
+
+    summaries = []
+    for host, jobs in sorted(hosts.items()):
+        for summary in summarize_result(fio_class, job, {'jobs': jobs}):
+            summaries.append(HostSummary(
+                host=host, **{f.name: getattr(summary, f.name)
+                              for f in fields(JobSummary)}))
+
+    return summaries
+
+
+def summarize_run_hosts(run_dir):
+    """
+    Return a list of HostSummary for every job in a run directory that was
+    run on fio servers.
+    """
+    summaries = []
+    for fio_class, job, path in find_results(run_dir):
+        summaries += summarize_hosts(fio_class, job, load_fio_json(path))
+
+    return summaries
+
+
+def to_host_table(summaries):
+    return format_table(HOST_TABLE_COLUMNS, summaries, left=4)
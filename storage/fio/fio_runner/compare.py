@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import math
+import os
+
+from dataclasses import asdict, dataclass, field
+
+from fio_runner import logstats
+from fio_runner.archive import is_archive, RunArchive
+from fio_runner.summary import (
+    DIRECTIONS,
+    find_results,
+    format_table,
+    summarize_run,
+)
+
+# summary field: (log used to estimate variance, True if higher is better).
+# The logs only hold per interval means, which say nothing about changes in
+# the tail, so tail latency is not tested for significance and is judged on
+# its threshold alone.
+COMPARE_METRICS = {'iops': ('iops', True),
+                   'bw_mib_s': ('bw', True),
+                   'clat_p99_us': (None, False),
+                   'clat_p99_9_us': (None, False)}
+LOG_METRICS = tuple(sorted({log for log, _ in COMPARE_METRICS.values()
+                            if log is not None}))
+# Maximum change (percent) for the worse before a difference is a regression.
+DEFAULT_THRESHOLDS = {'iops': 5.0,
+                      'bw_mib_s': 5.0,
+                      'clat_p99_us': 10.0,
+                      'clat_p99_9_us': 10.0}
+DEFAULT_ALPHA = 0.05
+DEFAULT_INTERVAL_MS = 1000
+# Consecutive intervals of a run are autocorrelated so testing them as
+# independent samples overstates significance. Each run is instead split
+# into this many consecutive blocks and the block means are tested.
+BATCHES = 10
+# Minimum number of samples (block means) in each run needed to test
+# significance.
+MIN_INTERVALS = 5
+
+
+class CompareError(Exception):
+    """ Raised when runs cannot be compared. """
+
+
+def _betacf(a, b, x):
+    """ Continued fraction for the incomplete beta function (Lentz). """
+    tiny = 1e-300
+    c = 1.0
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for num in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2 * m) *
+                                                  (a + 2 * m + 1))):
+            d = 1 + num * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + num / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+
+        if abs(c * d - 1) < 1e-15:
+            break
+
+    return result
+
+
+def betainc(a, b, x):
+    """ Regularized incomplete beta function I_x(a, b). """
+    if x <= 0:
+        return 0.0
+
+    if x >= 1:
+        return 1.0
+
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+                     a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+
+    return 1 - front * _betacf(b, a, 1 - x) / b
+
+
+def batch_means(values, batches=BATCHES):
+    """
+    Split values into blocks of len(values) // batches (at least one)
+    consecutive values and return the mean of each full block.
+    """
+    size = max(1, len(values) // batches)
+    return [sum(values[i:i + size]) / size
+            for i in range(0, len(values) - size + 1, size)]
+
+
+def welch_pvalue(a, b):
+    """
+    Return the two sided p-value of Welch's t-test that samples a and b have
+    the same mean or None if there are too few samples.
+
+    @param a: sequence of numbers e.g. block means of the per interval IOPS
+              of a run.
+    @param b: sequence of numbers.
+    """
+    if len(a) < MIN_INTERVALS or len(b) < MIN_INTERVALS:
+        return None
+
+    mean_a, mean_b = sum(a) / len(a), sum(b) / len(b)
+    var_a = sum((x - mean_a) ** 2 for x in a) / (len(a) - 1) / len(a)
+    var_b = sum((x - mean_b) ** 2 for x in b) / (len(b) - 1) / len(b)
+    if not var_a + var_b:
+        return 1.0 if mean_a == mean_b else 0.0
+
+    t = (mean_a - mean_b) / math.sqrt(var_a + var_b)
+    df = (var_a + var_b) ** 2 / (var_a ** 2 / (len(a) - 1) +
+                                 var_b ** 2 / (len(b) - 1))
+    return betainc(df / 2, 0.5, df / (df + t * t))
+
+
+@dataclass
+class Comparison:  # pylint: disable=too-many-instance-attributes
+    """ Change in one metric of a class x job x direction between runs. """
+    fio_class: str
+    job: str
+    direction: str
+    metric: str
+    run: str
+    baseline: float
+    value: float
+    delta_pct: float
+    p_value: float = None
+    status: str = 'ok'
+
+    @property
+    def p_value_str(self):
+        return 'n/a' if self.p_value is None else f"{self.p_value:.3f}"
+
+
+@dataclass
+class RunData:
+    """ Summaries and job directories of a run. """
+    path: str
+    summaries: dict
+    jobdirs: dict
+    interval_ms: int = DEFAULT_INTERVAL_MS
+    archive: RunArchive = None
+    _intervals: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, path, interval_ms=DEFAULT_INTERVAL_MS):
+        """
+        Load a run from its results directory or tarball. Tarballs are read
+        in a single pass without being extracted.
+        """
+        if is_archive(path):
+            use_logs = logstats.numpy is not None
+            archive = RunArchive(path, LOG_METRICS if use_logs else (),
+                                 interval_ms, clat_fallback=use_logs).read()
+            summaries = archive.summarize()
+            jobdirs = {(fio_class, job): jobdir
+                       for fio_class, job, jobdir in archive.jobs()}
+        else:
+            archive = None
+            summaries = summarize_run(path)
+            jobdirs = {(fio_class, job): os.path.dirname(output)
+                       for fio_class, job, output in find_results(path)}
+
+        return cls(path, {(s.fio_class, s.job, s.direction): s
+                          for s in summaries}, jobdirs, interval_ms, archive)
+
+    def _aggregate(self, jobdir, metric):
+        if self.archive is not None:
+            return self.archive.intervals(jobdir, metric)
+
+        paths = logstats.find_logs(jobdir).get(metric)
+        if not paths or logstats.numpy is None:
+            return None
+
+        return logstats.aggregate_logs(paths, metric, self.interval_ms)
+
+    def intervals(self, key, metric):
+        """
+        Return the per interval means of a log metric for a class x job x
+        direction or None if there are no logs (or numpy is not installed).
+        """
+        fio_class, job, direction = key
+        if (fio_class, job, metric) not in self._intervals:
+            self._intervals[(fio_class, job, metric)] = self._aggregate(
+                                        self.jobdirs[(fio_class, job)], metric)
+
+        per_direction = self._intervals[(fio_class, job, metric)]
+        if per_direction is None:
+            return None
+
+        values = per_direction.get(DIRECTIONS.index(direction))
+        return None if values is None else values[1].tolist()
+
+
+class RunComparer:
+    """
+    Compare runs against a baseline run aligning jobs by class, job and
+    direction. Differences in bandwidth and IOPS are tested for significance
+    using block means of the per interval logs so that noise is not reported
+    as a regression. Tail latency has no per interval samples and is judged
+    on its threshold alone.
+    """
+
+    def __init__(self, baseline, thresholds=None, alpha=DEFAULT_ALPHA):
+        """
+        @param baseline: RunData of the baseline run.
+        @param thresholds: dict of metric to maximum change (percent) for
+                           the worse. Defaults to DEFAULT_THRESHOLDS.
+        @param alpha: significance level.
+        """
+        self.baseline = baseline
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        self.alpha = alpha
+
+    def classify(self, metric, delta_pct, p_value):
+        worse = delta_pct if not COMPARE_METRICS[metric][1] else -delta_pct
+        if abs(worse) <= self.thresholds[metric]:
+            return 'ok'
+
+        if p_value is not None and p_value >= self.alpha:
+            return 'noise'
+
+        return 'regression' if worse > 0 else 'improved'
+
+    def compare_metric(self, run, key, metric):
+        baseline = getattr(self.baseline.summaries[key], metric)
+        value = getattr(run.summaries[key], metric)
+        if baseline:
+            delta_pct = (value - baseline) / baseline * 100
+        else:
+            delta_pct = 0.0 if value == baseline else math.inf
+
+        log_metric = COMPARE_METRICS[metric][0]
+        p_value = None
+        if log_metric is not None:
+            samples = [r.intervals(key, log_metric)
+                       for r in (self.baseline, run)]
+            if None not in samples:
+                p_value = welch_pvalue(*[batch_means(s) for s in samples])
+
+        return Comparison(*key, metric=metric, run=run.path,
+                          baseline=baseline, value=value,
+                          delta_pct=delta_pct, p_value=p_value,
+                          status=self.classify(metric, delta_pct, p_value))
+
+    def compare(self, run):
+        """
+        Compare run with the baseline.
+
+        @param run: RunData
+        @return: tuple of (list of Comparison, list of class x job x
+                 direction keys found in only one of the runs).
+        """
+        keys = set(self.baseline.summaries) & set(run.summaries)
+        unmatched = sorted(set(self.baseline.summaries) ^ set(run.summaries))
+        comparisons = [self.compare_metric(run, key, metric)
+                       for key in sorted(keys) for metric in COMPARE_METRICS]
+        return comparisons, unmatched
+
+
+def compare_runs(run_dirs, interval_ms=DEFAULT_INTERVAL_MS, **options):
+    """
+    Compare each run with the first.
+
+    @param run_dirs: results directories or tarballs.
+    @param interval_ms: interval used to sample the logs.
+    @param options: passed to RunComparer.
+    @return: tuple of (list of Comparison, list of unmatched keys)
+    """
+    if len(run_dirs) < 2:
+        raise CompareError("at least two runs are needed")
+
+    for run_dir in run_dirs:
+        if not os.path.isdir(run_dir) and not is_archive(run_dir):
+            raise CompareError(f"results directory '{run_dir}' not found")
+
+    comparer = RunComparer(RunData.load(run_dirs[0], interval_ms), **options)
+    comparisons = []
+    unmatched = []
+    for run_dir in run_dirs[1:]:
+        results, missing = comparer.compare(RunData.load(run_dir,
+                                                         interval_ms))
+        comparisons += results
+        unmatched += [(run_dir, *key) for key in missing]
+
+    return comparisons, unmatched
+
+
+TABLE_COLUMNS = (('run', 'run', '{}'),
+                 ('class', 'fio_class', '{}'),
+                 ('job', 'job', '{}'),
+                 ('dir', 'direction', '{}'),
+                 ('metric', 'metric', '{}'),
+                 ('baseline', 'baseline', '{:.1f}'),
+                 ('value', 'value', '{:.1f}'),
+                 ('delta%', 'delta_pct', '{:+.1f}'),
+                 ('p', 'p_value_str', '{}'),
+                 ('status', 'status', '{}'))
+
+
+def to_table(comparisons):
+    return format_table(TABLE_COLUMNS, comparisons, left=5)
+
+
+def to_json(comparisons):
+    return json.dumps([asdict(c) for c in comparisons], indent=2)
+
+
+FORMATS = {'table': to_table, 'json': to_json}
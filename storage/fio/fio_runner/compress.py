@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import os
+import struct
+import tarfile
+import time
+import zlib
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# fio options that compress logs in memory as they are written and store
+# them compressed (<log>.fz) rather than inflating them when the job ends.
+LOG_COMPRESSION_OPTIONS = "log_compression=4M\nlog_store_compressed=1\n"
+DEFAULT_LEVEL = 6
+DEFAULT_BLOCK_SIZE = 1024 ** 2
+# Each block is compressed using the end of the data before it as a
+# dictionary so the ratio is close to that of compressing it in one go.
+DICT_SIZE = 32 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def compress_block(block, dictionary, level, last):
+    """
+    Compress one block to raw deflate data that can be concatenated with the
+    blocks before and after it. Blocks other than the last end with a sync
+    flush so that they end on a byte boundary.
+    """
+    options = {'zdict': dictionary} if dictionary else {}
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS,
+                                  **options)
+    return compressor.compress(block) + compressor.flush(
+                                zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelGzipWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Write-only binary file object that gzips what is written to it using a
+    pool of threads (zlib releases the GIL), in the same way as pigz. The
+    output is a single standard gzip member so any gzip reader, including
+    tarfile stream mode, can read it.
+    """
+
+    def __init__(self, fileobj, threads=None, level=DEFAULT_LEVEL,
+                 block_size=DEFAULT_BLOCK_SIZE):
+        """
+        @param fileobj: binary file object the gzip data is written to.
+        @param threads: number of compression threads. Default is the number
+                        of CPUs.
+        """
+        self.fileobj = fileobj
+        self.threads = threads or os.cpu_count() or 1
+        self.level = level
+        self.block_size = block_size
+        self.size = 0
+        self.compressed_size = 0
+        self.closed = False
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._dictionary = b''
+        self._crc = 0
+        self._write(GZIP_MAGIC + b'\x08\x00' +
+                    struct.pack('<I', int(time.time())) + b'\x00\xff')
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.compressed_size += len(data)
+
+    def _submit(self, block, last=False):
+        block = bytes(block)
+        self._crc = zlib.crc32(block, self._crc)
+        self._pending.append(self._executor.submit(
+                compress_block, block, self._dictionary, self.level, last))
+        self._dictionary = (self._dictionary + block)[-DICT_SIZE:]
+        # bound memory use by writing blocks in order once enough are queued
+        while len(self._pending) > self.threads * 2:
+            self._write(self._pending.popleft().result())
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed file")
+
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.block_size:
+            self._submit(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+
+        return len(data)
+
+    def close(self):
+        """ Flush all data and write the gzip trailer. The underlying file
+        object is not closed. """
+        if self.closed:
+            return
+
+        self.closed = True
+        self._submit(self._buffer, last=True)
+        self._buffer = bytearray()
+        while self._pending:
+            self._write(self._pending.popleft().result())
+
+        self._executor.shutdown()
+        self._write(struct.pack('<II', self._crc & 0xffffffff,
+                                self.size & 0xffffffff))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class ArchiveStats:
+    """ Size of a tarball before and after compression and time taken. """
+    path: str
+    size: int
+    compressed_size: int
+    seconds: float
+    threads: int
+
+    @property
+    def ratio(self):
+        if not self.compressed_size:
+            return 0
+
+        return self.size / self.compressed_size
+
+    def __str__(self):
+        return (f"{self.compressed_size / 1024 ** 2:.1f} MiB, compression "
+                f"ratio {self.ratio:.2f}, {self.seconds:.1f}s using "
+                f"{self.threads} thread(s)")
+
+
+def create_tarball(source_dir, path, threads=None, level=DEFAULT_LEVEL):
+    """
+    Create a gzipped tarball of source_dir compressed by a pool of threads.
+
+    @param threads: number of compression threads. Default is the number of
+                    CPUs.
+    @return: ArchiveStats
+    """
+    start = time.monotonic()
+    with open(path, 'wb') as fd:
+        with ParallelGzipWriter(fd, threads, level) as writer:
+            with tarfile.open(fileobj=writer, mode='w|') as tar:
+                tar.add(source_dir, arcname=os.path.basename(source_dir))
+
+    return ArchiveStats(path, writer.size, writer.compressed_size,
+                        time.monotonic() - start, writer.threads)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot
+except ImportError:
+    pyplot = None
+
+from fio_runner.archive import archive_name, is_archive, RunArchive
+from fio_runner.logstats import aggregate_logs, find_logs, numpy
+from fio_runner.summary import RESULTS_SUFFIX
+
+DIRECTIONS = {0: 'read', 1: 'write', 2: 'trim'}
+# metric: (title, unit, divisor applied to the logged value)
+METRICS = {'bw': ('Bandwidth', 'MiB/s', 1024),
+           'iops': ('IOPS', 'IOPS', 1),
+           'lat': ('Total latency', 'usec', 1000),
+           'clat': ('Completion latency', 'usec', 1000),
+           'slat': ('Submission latency', 'usec', 1000)}
+DEFAULT_INTERVAL_MS = 1000
+DEFAULT_FORMATS = ('png', 'svg')
+
+
+class GraphError(Exception):
+    """ Raised when graphs cannot be created. """
+
+
+def check_matplotlib():
+    if pyplot is None or numpy is None:
+        raise GraphError("matplotlib is required to create graphs - please "
+                         "install it e.g. apt install python3-matplotlib")
+
+
+@dataclass
+class Series:
+    """ Downsampled samples of one metric and direction. """
+    times: object
+    means: object
+    lows: object
+    highs: object
+
+
+def make_series(intervals, metric):
+    """
+    Convert per interval statistics of a metric to {direction: Series} in
+    the units of the graph.
+
+    @param intervals: dict of direction to (times, means, lows, highs).
+    """
+    divisor = METRICS[metric][2]
+    return {DIRECTIONS.get(direction, str(direction)):
+            Series(times, *(v / divisor for v in values))
+            for direction, (times, *values) in sorted(intervals.items())}
+
+
+def downsample(paths, metric, interval_ms=DEFAULT_INTERVAL_MS):
+    """
+    Read the logs of one metric (one per fio job) and return {direction:
+    Series} with one point per interval. Bandwidth and IOPS are summed
+    across logs and latencies are averaged.
+    """
+    return make_series(aggregate_logs(paths, metric, interval_ms), metric)
+
+
+def plot(series, metric, title, path_prefix, formats=DEFAULT_FORMATS):
+    """
+    Plot downsampled series of one metric over time and save it in each
+    format.
+
+    @return: list of files written.
+    """
+    check_matplotlib()
+    name, unit, _ = METRICS[metric]
+    fig, ax = pyplot.subplots(figsize=(10, 5))
+    for direction, points in sorted(series.items()):
+        line, = ax.plot(points.times, points.means, label=direction)
+        ax.fill_between(points.times, points.lows, points.highs, alpha=0.2,
+                        color=line.get_color(), linewidth=0)
+
+    ax.set_title(f"{title} - {name}")
+    ax.set_xlabel('time (s)')
+    ax.set_ylabel(unit)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    written = []
+    for fmt in formats:
+        path = f"{path_prefix}.{fmt}"
+        fig.savefig(path)
+        written.append(path)
+
+    pyplot.close(fig)
+    return written
+
+
+def job_label(jobdir):
+    label = os.path.basename(os.path.normpath(jobdir))
+    if label.endswith(RESULTS_SUFFIX):
+        label = label[:-len(RESULTS_SUFFIX)]
+
+    return label
+
+
+def plot_job(label, series, output_dir, formats=DEFAULT_FORMATS):
+    """
+    Create a graph of each metric of a job.
+
+    @param series: dict of metric to {direction: Series}
+    @return: list of files written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for metric, points in sorted(series.items()):
+        if points:
+            written += plot(points, metric, label,
+                            os.path.join(output_dir, f"{label}_{metric}"),
+                            formats)
+
+    return written
+
+
+def graph_job(jobdir, output_dir=None, interval_ms=DEFAULT_INTERVAL_MS,
+              formats=DEFAULT_FORMATS):
+    """
+    Create a graph of each metric logged in a job directory.
+
+    @return: list of files written.
+    """
+    series = {metric: downsample(paths, metric, interval_ms)
+              for metric, paths in find_logs(jobdir).items()}
+    return plot_job(job_label(jobdir), series, output_dir or jobdir, formats)
+
+
+def find_jobdirs(run_dir):
+    return [os.path.join(run_dir, d) for d in sorted(os.listdir(run_dir))
+            if d.endswith(RESULTS_SUFFIX) and
+            os.path.isdir(os.path.join(run_dir, d))]
+
+
+def graph_archive(path, processes=None, output_dir=None,
+                  interval_ms=DEFAULT_INTERVAL_MS, formats=DEFAULT_FORMATS):
+    """
+    Create graphs for every job in a results tarball without extracting it.
+    The logs are parsed in a single pass over the archive and the graphs
+    are then plotted using a pool of processes.
+
+    @param output_dir: directory graphs are saved in, one sub-directory per
+                       job. Default is <archive name>-graphs.
+    @return: dict of job directory to list of files written.
+    """
+    archive = RunArchive(path, tuple(METRICS), interval_ms).read()
+    output_dir = output_dir or f"{archive_name(path)}-graphs"
+    jobdirs = sorted({jobdir for jobdir, _ in archive.logs})
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {}
+        for jobdir in jobdirs:
+            series = {metric: make_series(archive.intervals(jobdir, metric),
+                                          metric)
+                      for metric in METRICS if (jobdir, metric) in
+                      archive.logs}
+            futures[jobdir] = executor.submit(plot_job, job_label(jobdir),
+                                              series,
+                                              os.path.join(output_dir,
+                                                           jobdir),
+                                              formats)
+
+    return {d: f.result() for d, f in futures.items()}
+
+
+def create_graphs(run_dir, processes=None, output_dir=None, **options):
+    """
+    Create graphs for every job directory in a run, or results tarball,
+    using a pool of processes.
+
+    @param processes: size of the process pool. Default is the number of
+                      CPUs.
+    @param output_dir: directory graphs are saved in, one sub-directory per
+                       job. Default is each job directory (or
+                       <archive name>-graphs for tarballs).
+    @param options: passed to graph_job() i.e. interval_ms and formats.
+    @return: dict of job directory to list of files written.
+    """
+    if is_archive(run_dir):
+        check_matplotlib()
+        return graph_archive(run_dir, processes, output_dir, **options)
+
+    if not os.path.isdir(run_dir):
+        raise GraphError(f"results directory '{run_dir}' not found")
+
+    check_matplotlib()
+    futures = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for jobdir in find_jobdirs(run_dir):
+            job_output = None
+            if output_dir:
+                job_output = os.path.join(output_dir,
+                                          os.path.basename(jobdir))
+
+            futures[jobdir] = executor.submit(graph_job, jobdir, job_output,
+                                              **options)
+
+    return {d: f.result() for d, f in futures.items()}
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Directory (within the results directory) the prepare phase configs and
+# output are saved in. It has no results suffix so it is not summarised as
+# a job.
+PREPARE_DIR = 'prepare'
+LAYOUT = 'layout'
+PRECONDITION = 'precondition'
+DEFAULT_PRECONDITION_PASSES = 1
+# Large sequential writes fill the data set quickly while still putting the
+# media (and e.g. thin provisioned volumes) into the state it is in after
+# being fully written.
+PRECONDITION_OPTIONS = ('readwrite=write', 'blocksize=1m', 'iodepth=32',
+                        'sync=0', 'time_based=0', 'runtime=0', 'ramp_time=0')
+# Added to the common config of jobs once the data set is laid out so that
+# a job fails rather than paying to lay out files while it is measured.
+REUSE_OPTIONS = 'allow_file_create=0\n'
+
+
+def stage_config(stage, passes=DEFAULT_PRECONDITION_PASSES):
+    """
+    Return the config of a prepare stage. Both use the files defined in the
+    common global config so that every job reuses them.
+
+    @param stage: LAYOUT to only create the files (create_only) or
+                  PRECONDITION to sequentially write the whole data set.
+    @param passes: number of times the data set is written when
+                   preconditioning.
+    """
+    options = ['readwrite=write', 'create_only=1']
+    if stage == PRECONDITION:
+        options = list(PRECONDITION_OPTIONS) + [f"loops={passes}"]
+
+    body = '\n'.join(f" {option}" for option in options)
+    return f"[global]\n include common-global.fio\n[{stage}]\n{body}\n"
+
+
+def prepare_stages(passes=DEFAULT_PRECONDITION_PASSES):
+    """ Return the list of prepare stages to run. """
+    if passes > 0:
+        return [LAYOUT, PRECONDITION]
+
+    return [LAYOUT]
+
+
+def run_timings(manifest):
+    """
+    Return a dict of the seconds spent laying out and preconditioning the
+    IO files and measuring (the measurement windows of every job) in a run.
+
+    @param manifest: Manifest of the run.
+    """
+    prepare = manifest.run.get('prepare') or {}
+    timings = {stage: prepare[stage].get('duration', 0)
+               for stage in (LAYOUT, PRECONDITION) if stage in prepare}
+    timings['measured'] = sum((job.get('windows') or {}).get('measured_s', 0)
+                              for job in manifest.jobs.values())
+    return timings
+
+
+def format_timings(timings):
+    return ', '.join(f"{name} {seconds:.1f}s"
+                     for name, seconds in timings.items())
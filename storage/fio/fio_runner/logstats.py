@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import re
+import zlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# e.g. randread-4k_bw.1.log or randread-4k_clat.2.log.fz
+LOG_NAME = re.compile(r'^(?P<label>.+)_(?P<metric>bw|iops|lat|clat|slat)'
+                      r'(\.(?P<index>\d+))?\.log(?P<compressed>\.fz)?$')
+# Suffix of logs stored compressed by fio (log_store_compressed).
+COMPRESSED_SUFFIX = '.fz'
+# Metrics whose logs are summed across jobs rather than averaged.
+SUMMED_METRICS = ('bw', 'iops')
+# Logs are read in blocks of this many bytes so memory use is bounded
+# regardless of the size of the log.
+DEFAULT_CHUNK_SIZE = 4 * 1024 ** 2
+# Percentiles are approximated with a log-linear histogram of SUB_BINS bins
+# per power of two which keeps the error within 1% of the value.
+SUB_BINS = 64
+MAX_EXPONENT = 64
+NUM_BINS = MAX_EXPONENT * SUB_BINS
+
+
+class LogError(Exception):
+    """ Raised when fio logs cannot be parsed. """
+
+
+def check_numpy():
+    if numpy is None:
+        raise LogError("numpy is required to parse fio logs - please install "
+                       "it e.g. apt install python3-numpy")
+
+
+def bin_index(values):
+    """ Return the histogram bin of each (non-negative) value. """
+    mantissa, exponent = numpy.frexp(numpy.maximum(values, 0) + 1)
+    index = ((exponent - 1) * SUB_BINS +
+             ((mantissa - 0.5) * 2 * SUB_BINS).astype(numpy.int64))
+    return numpy.clip(index, 0, NUM_BINS - 1)
+
+
+def bin_value(index):
+    """ Return the value at the middle of a histogram bin. """
+    exponent, sub = divmod(int(index), SUB_BINS)
+    return (0.5 + (sub + 0.5) / (2 * SUB_BINS)) * 2.0 ** (exponent + 1) - 1
+
+
+class MetricStats:
+    """
+    Statistics of one direction of a fio log metric computed incrementally.
+    Samples are bucketed by time interval keeping the sum, count, min and max
+    of each interval along with a histogram of all samples for approximate
+    percentiles. Memory use depends on the number of intervals rather than
+    the number of samples.
+    """
+
+    def __init__(self, interval_ms):
+        """
+        @param interval_ms: width of the time buckets in milliseconds.
+        """
+        check_numpy()
+        self.interval_ms = interval_ms
+        self.sums = numpy.zeros(0)
+        self.counts = numpy.zeros(0, dtype=numpy.int64)
+        self.lows = numpy.zeros(0)
+        self.highs = numpy.zeros(0)
+        self.histogram = numpy.zeros(NUM_BINS, dtype=numpy.int64)
+
+    def _grow(self, size):
+        extra = size - self.sums.size
+        if extra <= 0:
+            return
+
+        self.sums = numpy.concatenate((self.sums, numpy.zeros(extra)))
+        self.counts = numpy.concatenate((self.counts,
+                                         numpy.zeros(extra,
+                                                     dtype=numpy.int64)))
+        self.lows = numpy.concatenate((self.lows,
+                                       numpy.full(extra, numpy.inf)))
+        self.highs = numpy.concatenate((self.highs,
+                                        numpy.full(extra, -numpy.inf)))
+
+    def add(self, times, values):
+        """
+        Add samples.
+
+        @param times: array of sample times in milliseconds.
+        @param values: array of sample values.
+        """
+        if not values.size:
+            return
+
+        index = (times // self.interval_ms).astype(numpy.int64)
+        self._grow(int(index.max()) + 1)
+        self.sums += numpy.bincount(index, values, minlength=self.sums.size)
+        self.counts += numpy.bincount(index, minlength=self.counts.size)
+        numpy.minimum.at(self.lows, index, values)
+        numpy.maximum.at(self.highs, index, values)
+        self.histogram += numpy.bincount(bin_index(values),
+                                         minlength=NUM_BINS)
+
+    def merge(self, other):
+        """ Add the samples of other e.g. the same metric of another job. """
+        self._grow(other.sums.size)
+        size = other.sums.size
+        self.sums[:size] += other.sums
+        self.counts[:size] += other.counts
+        self.lows[:size] = numpy.minimum(self.lows[:size], other.lows)
+        self.highs[:size] = numpy.maximum(self.highs[:size], other.highs)
+        self.histogram += other.histogram
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    @property
+    def mean(self):
+        return float(self.sums.sum() / self.count) if self.count else 0.0
+
+    @property
+    def min(self):
+        return float(self.lows.min()) if self.count else 0.0
+
+    @property
+    def max(self):
+        return float(self.highs.max()) if self.count else 0.0
+
+    def percentile(self, pct):
+        """
+        Return the approximate pct percentile of all samples (within 1% of
+        the exact value).
+        """
+        if not self.count:
+            return 0.0
+
+        if pct >= 100:
+            return self.max
+
+        cumulative = numpy.cumsum(self.histogram)
+        index = numpy.searchsorted(cumulative, self.count * pct / 100)
+        value = bin_value(min(index, NUM_BINS - 1))
+        return min(max(value, self.min), self.max)
+
+    def intervals(self):
+        """
+        Return arrays of (start time in seconds, mean, min, max) for each
+        interval that has samples.
+        """
+        index = numpy.flatnonzero(self.counts)
+        return (index * self.interval_ms / 1000,
+                self.sums[index] / self.counts[index], self.lows[index],
+                self.highs[index])
+
+
+def find_logs(jobdir):
+    """ Return {metric: [log paths]} for the fio logs in a job directory. """
+    logs = {}
+    for entry in sorted(os.listdir(jobdir)):
+        match = LOG_NAME.match(entry)
+        if match:
+            logs.setdefault(match.group('metric'),
+                            []).append(os.path.join(jobdir, entry))
+
+    return logs
+
+
+def parse_block(block):
+    """
+    Parse complete lines of a fio log.
+
+    @param block: bytes
+    @return: tuple of (times, values, directions) arrays.
+    """
+    try:
+        data = numpy.loadtxt(io.BytesIO(block), delimiter=',',
+                             usecols=(0, 1, 2), ndmin=2)
+    except ValueError as exc:
+        raise LogError(f"invalid fio log data: {exc}") from exc
+
+    return data[:, 0], data[:, 1], data[:, 2].astype(numpy.int64)
+
+
+def read_chunks(fd, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read a fio log from a binary file object in blocks of chunk_size bytes,
+    splitting on line boundaries, and yield (times, values, directions)
+    arrays per block. The file is read sequentially so it can be a stream
+    e.g. a member of a tarball.
+    """
+    check_numpy()
+    tail = b''
+    while True:
+        block = fd.read(chunk_size)
+        if not block:
+            break
+
+        block = tail + block
+        end = block.rfind(b'\n') + 1
+        tail = block[end:]
+        if end:
+            yield parse_block(block[:end])
+
+    if tail.strip():
+        yield parse_block(tail)
+
+
+class InflateReader:
+    """
+    Binary file object that inflates a log stored compressed by fio as it
+    is read. fio compresses each chunk of a log as its own zlib stream so the
+    streams are inflated one after another.
+    """
+
+    def __init__(self, fd, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.fd = fd
+        self.chunk_size = chunk_size
+        self._inflate = zlib.decompressobj()
+
+    @staticmethod
+    def readable():
+        return True
+
+    def read(self, size=DEFAULT_CHUNK_SIZE):
+        """ Return up to size bytes of inflated data or b'' at the end. """
+        while True:
+            if self._inflate.eof:
+                pending = self._inflate.unused_data
+                self._inflate = zlib.decompressobj()
+            else:
+                pending = self._inflate.unconsumed_tail
+
+            if not pending:
+                pending = self.fd.read(self.chunk_size)
+                if not pending:
+                    return b''
+
+            try:
+                data = self._inflate.decompress(pending, size)
+            except zlib.error as exc:
+                raise LogError(f"invalid compressed log: {exc}") from exc
+
+            if data:
+                return data
+
+
+def log_reader(fd, name):
+    """
+    Return a binary file object that reads the log called name from fd,
+    inflating it if it was stored compressed.
+    """
+    if name.endswith(COMPRESSED_SUFFIX):
+        return InflateReader(fd)
+
+    return fd
+
+
+def parse_stream(fd, interval_ms, chunk_size=DEFAULT_CHUNK_SIZE, name=None):
+    """
+    Parse a fio bw, iops or latency log (e.g. from --write_lat_log) from a
+    binary file object in bounded memory.
+
+    @param interval_ms: width of the time buckets in milliseconds.
+    @param name: name of the log used in errors.
+    @return: dict of direction (0=read, 1=write, 2=trim) to MetricStats
+    """
+    stats = {}
+    try:
+        for times, values, directions in read_chunks(fd, chunk_size):
+            for direction in numpy.unique(directions):
+                mask = directions == direction
+                if int(direction) not in stats:
+                    stats[int(direction)] = MetricStats(interval_ms)
+
+                stats[int(direction)].add(times[mask], values[mask])
+    except LogError as exc:
+        raise LogError(f"{name or fd}: {exc}") from exc
+
+    return stats
+
+
+def parse_log(path, interval_ms, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parse a fio log file, which may be stored compressed. See
+    parse_stream().
+    """
+    with open(path, 'rb') as fd:
+        return parse_stream(log_reader(fd, path), interval_ms, chunk_size,
+                            name=path)
+
+
+def parse_logs(paths, interval_ms, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parse the logs of one metric of several jobs and merge them i.e. as if
+    all samples came from a single log.
+
+    @return: dict of direction to MetricStats
+    """
+    merged = {}
+    for path in paths:
+        for direction, stats in parse_log(path, interval_ms,
+                                          chunk_size).items():
+            if direction in merged:
+                merged[direction].merge(stats)
+            else:
+                merged[direction] = stats
+
+    return merged
+
+
+class LogAggregate:
+    """
+    Combine the logs of one metric (one per fio job) per interval as each is
+    parsed so only one set of per interval statistics is kept per direction.
+    Bandwidth and IOPS are summed across logs and latencies are averaged.
+    """
+
+    def __init__(self, metric, interval_ms):
+        self.summed = metric in SUMMED_METRICS
+        self.interval_ms = interval_ms
+        # direction: MetricStats of all samples if latencies are averaged
+        self.merged = {}
+        # direction: (present, totals) arrays if values are summed
+        self._totals = {}
+
+    def _add_sum(self, direction, stats):
+        present, totals = self._totals.get(direction, (numpy.zeros(0, bool),
+                                                       numpy.zeros((3, 0))))
+        extra = stats.sums.size - present.size
+        if extra > 0:
+            present = numpy.concatenate((present, numpy.zeros(extra, bool)))
+            totals = numpy.concatenate((totals, numpy.zeros((3, extra))),
+                                       axis=1)
+
+        index = numpy.flatnonzero(stats.counts)
+        present[index] = True
+        totals[:, index] += numpy.array(stats.intervals()[1:])
+        self._totals[direction] = (present, totals)
+
+    def add(self, log_stats):
+        """
+        @param log_stats: dict of direction to MetricStats of one log.
+        """
+        for direction, stats in log_stats.items():
+            if self.summed:
+                self._add_sum(direction, stats)
+            elif direction in self.merged:
+                self.merged[direction].merge(stats)
+            else:
+                self.merged[direction] = stats
+
+    def intervals(self):
+        """
+        @return: dict of direction to (times, means, lows, highs) arrays.
+        """
+        if not self.summed:
+            return {direction: stats.intervals()
+                    for direction, stats in self.merged.items()}
+
+        result = {}
+        for direction, (present, totals) in self._totals.items():
+            index = numpy.flatnonzero(present)
+            result[direction] = (index * self.interval_ms / 1000,
+                                 *totals[:, index])
+
+        return result
+
+
+def aggregate_logs(paths, metric, interval_ms,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parse the logs of one metric (one per fio job) and combine them per
+    interval. See LogAggregate.
+
+    @return: dict of direction to (times, means, lows, highs) arrays.
+    """
+    aggregate = LogAggregate(metric, interval_ms)
+    for path in paths:
+        aggregate.add(parse_log(path, interval_ms, chunk_size))
+
+    return aggregate.intervals()
+
+
+def parse_log_lines(path, interval_ms):
+    """
+    Reference line by line parser that keeps every sample in memory. Only
+    used to validate and benchmark parse_log().
+
+    @return: dict of direction to {interval: list of values}
+    """
+    samples = {}
+    with open(path, encoding='utf-8') as fd:
+        for line in fd:
+            parts = line.split(',', 3)
+            if len(parts) < 3:
+                continue
+
+            interval = int(parts[0]) // interval_ms
+            samples.setdefault(int(parts[2]), {}).setdefault(
+                                        interval, []).append(float(parts[1]))
+
+    return samples
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+MANIFEST_NAME = 'manifest.json'
+# Suffix of the directory each job's output and logs are saved in.
+RESULTS_SUFFIX = '.results'
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 ** 2
+
+
+def file_hash(path):
+    """ Return the sha256 hex digest of a file. """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as fd:
+        for block in iter(lambda: fd.read(HASH_BLOCK_SIZE), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+class Manifest:
+    """
+    Machine-readable record of a test run and each of its jobs. It is
+    rewritten atomically every time a job is updated so it always reflects
+    what has been run so far.
+    """
+
+    def __init__(self, results_dir, run_info=None):
+        """
+        @param results_dir: directory the manifest is saved in.
+        @param run_info: dict of information about the run as a whole.
+        """
+        self.path = os.path.join(results_dir, MANIFEST_NAME)
+        self.run = dict(run_info or {})
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, results_dir):
+        with open(os.path.join(results_dir, MANIFEST_NAME),
+                  encoding='utf-8') as fd:
+            data = json.load(fd)
+
+        manifest = cls(results_dir, data.get('run'))
+        manifest.jobs = {job['label']: job for job in data.get('jobs', [])}
+        return manifest
+
+    def update(self, label, **info):
+        """ Add or update the entry for a job and save the manifest. """
+        with self._lock:
+            self.jobs.setdefault(label, {'label': label}).update(info)
+            self._save()
+
+    def update_run(self, **info):
+        """ Update the information about the run as a whole and save it. """
+        with self._lock:
+            self.run.update(info)
+            self._save()
+
+    def _save(self):
+        data = {'version': MANIFEST_VERSION,
+                'run': self.run,
+                'jobs': list(self.jobs.values())}
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fd:
+            json.dump(data, fd, indent=2)
+
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.path)
+
+    def save(self):
+        with self._lock:
+            self._save()
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import shutil
+import subprocess
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+
+from fio_runner.cluster import (
+    client_command,
+    client_config,
+    DEFAULT_START_DELAY,
+    sync_prerun,
+    SYNC_SCRIPT,
+)
+from fio_runner.compress import create_tarball, LOG_COMPRESSION_OPTIONS
+from fio_runner.layout import (
+    DEFAULT_PRECONDITION_PASSES,
+    PREPARE_DIR,
+    prepare_stages,
+    REUSE_OPTIONS,
+    stage_config,
+)
+from fio_runner.manifest import file_hash, Manifest
+from fio_runner.steadystate import (
+    check_criterion,
+    DEFAULT_WINDOW,
+    measurement_windows,
+    steady_state_options,
+)
+from fio_runner.summary import load_fio_json, SummaryError
+from fio_runner.templates import CUSTOM_JOB
+
+# Takes a lot less time to write the same amount of data with 4m vs 4k so use
+# a smaller ramp_time.
+RAMP_TIMES = {'4K': 30, '4M': 5}
+CUSTOM_OPTS = ('blocksize', 'iodepth', 'size', 'fdatasync', 'ioengine',
+               'direct')
+WILDCARD = 'all'
+DEFAULT_NAME = 'fio-perf-test'
+IOFILES = 'iofiles'
+
+HEADER_TEMPLATE = "#" * 59 + """
+#
+#  Running test='{}' job='{}'
+#  Results dir: {}
+#
+""" + "#" * 59
+
+
+class FioRunnerError(Exception):
+    """ Raised when tests cannot be run as requested. """
+
+
+def parse_config(text):
+    """
+    Return a dict of the options set in rendered fio config text. Sections
+    and include directives are ignored and later options override earlier
+    ones.
+    """
+    options = {}
+    for line in text.splitlines():
+        line = line.partition('#')[0].strip()
+        if not line or line.startswith(('[', ';', 'include ')):
+            continue
+
+        key, _, value = line.partition('=')
+        options[key.strip()] = value.strip().strip('"')
+
+    return options
+
+
+@dataclass(frozen=True)
+class FioJob:
+    """ A single class x job combination. """
+    fio_class: str
+    job: str
+
+    @property
+    def label(self):
+        return f"{self.fio_class}-{self.job}"
+
+    @property
+    def jobdir(self):
+        return f"{self.label}.results"
+
+    @property
+    def config(self):
+        return f"{self.label}.fio"
+
+    @property
+    def output(self):
+        return f"{self.label}.json"
+
+
+@dataclass
+class FioRunParams:  # pylint: disable=too-many-instance-attributes
+    """ Parameters of a test run. """
+    name: str = DEFAULT_NAME
+    # default is the current time in seconds
+    label: str = None
+    # dict of CUSTOM_OPTS values
+    custom_opts: dict = None
+    # dict overriding RAMP_TIMES
+    ramp_times: dict = None
+    dry_run: bool = False
+    # path to the fio binary
+    fio: str = 'fio'
+    # maximum number of jobs run at the same time. Concurrent jobs each use
+    # their own set of IO files.
+    parallel: int = 1
+    # directory in which results are saved
+    base_dir: str = '.'
+    # fio servers (host[,port]) to run every job on at the same time using
+    # fio client/server. Default is to run fio locally.
+    hosts: list = None
+    # seconds between sending a job to the servers and its synchronised
+    # start
+    start_delay: int = DEFAULT_START_DELAY
+    # directory the fio servers create IO files in (default is each server's
+    # working directory)
+    remote_dir: str = None
+    # path of tools/sync-start.sh on the fio servers, run before each job to
+    # wait for the synchronised start
+    sync_script: str = SYNC_SCRIPT
+    # fio steadystate criterion e.g. iops_slope:0.3% to end jobs once they
+    # are stable. Default is to always run for the full runtime.
+    steady_state: str = None
+    # seconds of samples the steady state criterion is evaluated over
+    steady_state_window: int = DEFAULT_WINDOW
+    # seconds after ramp_time before steady state samples are collected
+    steady_state_ramp_time: int = 0
+    # lay out the IO files once, before any job is run, so that every job
+    # reuses them
+    prepare: bool = False
+    # number of times the data set is written after being laid out so that
+    # results reflect the steady state of the media
+    precondition_passes: int = DEFAULT_PRECONDITION_PASSES
+    # have fio compress logs as they are written and store them compressed
+    compress_logs: bool = False
+    # keep the IO files of each job when jobs run in parallel. By default
+    # they are deleted as soon as the job ends.
+    keep_iofiles: bool = False
+
+    def __post_init__(self):
+        self.label = self.label or str(int(time.time()))
+        self.custom_opts = {k: v for k, v in (self.custom_opts or {}).items()
+                            if v not in (None, '')}
+        self.ramp_times = dict(RAMP_TIMES, **(self.ramp_times or {}))
+        self.parallel = max(self.parallel or 1, 1)
+        self.hosts = list(self.hosts or [])
+
+
+def resume_run(results_dir):
+    """
+    Return the parameters and matrix of the run whose results are in
+    results_dir, as recorded in its manifest, so that it can be resumed.
+
+    @return: tuple of (FioRunParams, list of FioJob)
+    @raises FioRunnerError: if the run cannot be resumed.
+    """
+    try:
+        manifest = Manifest.load(results_dir)
+    except (OSError, ValueError) as exc:
+        raise FioRunnerError(f"unable to resume {results_dir}: "
+                             f"{exc}") from exc
+
+    params = manifest.run.get('params')
+    if not params:
+        raise FioRunnerError(f"unable to resume {results_dir}: its manifest "
+                             "has no run parameters")
+
+    names = {f.name for f in fields(FioRunParams)}
+    params = FioRunParams(**{k: v for k, v in params.items() if k in names})
+    params.base_dir = os.path.dirname(os.path.abspath(results_dir))
+    run_name = f"{params.name}-{params.label}"
+    if os.path.basename(os.path.abspath(results_dir)) != run_name:
+        raise FioRunnerError(f"unable to resume {results_dir}: expected the "
+                             f"results directory to be called {run_name}")
+
+    return params, [FioJob(job['fio_class'], job['job'])
+                    for job in manifest.jobs.values()]
+
+
+class FioRunner:
+    """
+    Render fio configs for a class x job matrix, run them and record the
+    results of each in a manifest.
+    """
+
+    def __init__(self, templates, params):
+        """
+        @param templates: TemplateSet
+        @param params: FioRunParams
+        """
+        self.templates = templates
+        self.params = params
+        run_name = f"{params.name}-{params.label}"
+        self.results_dir = os.path.join(params.base_dir or '.', run_name)
+        self.logfile = os.path.join(self.results_dir, f"{run_name}.log")
+        self.manifest = None
+        self.archive_stats = None
+        if params.steady_state:
+            check_criterion(params.steady_state)
+
+        if params.hosts:
+            try:
+                sync_prerun(0, params.sync_script)
+            except ValueError as exc:
+                raise FioRunnerError(str(exc)) from exc
+
+    @property
+    def has_custom_opts(self):
+        return bool(self.params.custom_opts)
+
+    @staticmethod
+    def _select(requested, available, kind):
+        if not requested or WILDCARD in requested:
+            return list(available)
+
+        unknown = [r for r in requested if r not in available]
+        if unknown:
+            raise FioRunnerError(f"unknown {kind} '{unknown[0]}'")
+
+        return list(requested)
+
+    def matrix(self, classes=None, jobs=None):
+        """
+        Return the list of FioJob to run for the requested classes and jobs.
+        None or 'all' selects everything available. If custom options are set
+        a custom job is added and no other jobs are selected by default.
+        """
+        classes = self._select(classes, self.templates.classes, 'class')
+        if self.has_custom_opts:
+            missing = [o for o in CUSTOM_OPTS
+                       if o not in self.params.custom_opts]
+            if missing:
+                raise FioRunnerError(f"please provide --{missing[0]}")
+
+            jobs = self._select(jobs, self.templates.jobs,
+                                'job') if jobs else []
+            jobs.append(CUSTOM_JOB)
+        else:
+            jobs = self._select(jobs, self.templates.jobs, 'job')
+
+        return [FioJob(c, j) for c in classes for j in jobs]
+
+    def ramp_time(self, job):
+        ramp_times = self.params.ramp_times
+        return ramp_times.get(job.job.upper(), ramp_times['4M'])
+
+    def render_common(self, ramp_time=0):
+        return self.templates.common_global().render(
+                        {'TESTNAME': f"{self.params.name}-{self.params.label}",
+                         'RAMP_TIME': ramp_time})
+
+    def render(self, job, start_at=None):
+        """
+        Render the config for a job in memory. When running on fio servers
+        the job config is self-contained and waits until start_at.
+
+        @return: tuple of (job config, common global config)
+        """
+        values = {k.upper(): v for k, v in self.params.custom_opts.items()}
+        values['TESTNAME'] = self.params.name
+        config = (self.templates.class_global(job.fio_class).render(values) +
+                  self.templates.job(job.job).render(values))
+        common = self.render_common(self.ramp_time(job))
+        if self.params.steady_state:
+            common += steady_state_options(self.params.steady_state,
+                                           self.params.steady_state_window,
+                                           self.params.steady_state_ramp_time)
+
+        if self.params.prepare:
+            common += REUSE_OPTIONS
+
+        if self.params.compress_logs:
+            common += LOG_COMPRESSION_OPTIONS
+
+        if self.params.parallel > 1:
+            # concurrent jobs must not lay out, read or write the same files
+            common += f"directory=../{self.job_iofiles(job)}\n"
+
+        if self.params.hosts:
+            config = client_config(config, common, self.params.remote_dir,
+                                   start_at, self.params.sync_script)
+
+        return config, common
+
+    @staticmethod
+    def job_iofiles(job):
+        """ Directory of the IO files of a job when jobs run in parallel. """
+        return os.path.join(IOFILES, job.label)
+
+    def command(self, job):
+        if self.params.hosts:
+            # per interval logs are not requested; the json output of every
+            # host is merged instead
+            return client_command(self.params.fio, self.params.hosts,
+                                  job.config, job.output)
+
+        return [self.params.fio, job.config, '--output-format=json+',
+                f'--output={job.output}', f'--write_lat_log={job.label}',
+                f'--write_bw_log={job.label}',
+                f'--write_iops_log={job.label}']
+
+    def write_configs(self, dirname, config_name, config, common):
+        path = os.path.join(self.results_dir, dirname)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, config_name), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(config)
+
+        with open(os.path.join(path, 'common-global.fio'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(common)
+
+    def prepare(self, job, start_at=None):
+        """ Write the rendered configs of a job to its results directory. """
+        config, common = self.render(job, start_at)
+        self.write_configs(job.jobdir, job.config, config, common)
+        options = parse_config(common)
+        options.update(parse_config(config))
+        return options
+
+    def log(self, entry):
+        print(entry)
+        with open(self.logfile, 'a', encoding='utf-8') as fd:
+            fd.write(f"{entry}\n")
+
+    def run_job(self, job):
+        """ Prepare and run a single job, recording it in the manifest. """
+        start_at = None
+        if self.params.hosts:
+            start_at = int(time.time()) + self.params.start_delay
+
+        options = self.prepare(job, start_at)
+        cmd = self.command(job)
+        self.manifest.update(job.label, fio_class=job.fio_class, job=job.job,
+                             dir=job.jobdir, config=job.config,
+                             output=job.output, command=cmd, options=options,
+                             ramp_time=self.ramp_time(job), status='pending')
+        if start_at:
+            self.manifest.update(job.label, hosts=self.params.hosts,
+                                 start_at=start_at)
+
+        self.log(HEADER_TEMPLATE.format(self.params.name, job.job,
+                                        job.jobdir))
+        if self.params.dry_run:
+            self.log(f"## DRY-RUN ##\n{' '.join(cmd)}\n")
+            self.manifest.update(job.label, status='dry-run')
+            return 0
+
+        iofiles = None
+        if self.params.parallel > 1:
+            iofiles = os.path.join(self.results_dir, self.job_iofiles(job))
+            os.makedirs(iofiles, exist_ok=True)
+
+        start = datetime.datetime.now(datetime.timezone.utc)
+        self.manifest.update(job.label, status='running',
+                             start=start.isoformat())
+        proc = subprocess.run(cmd, cwd=os.path.join(self.results_dir,
+                                                    job.jobdir),
+                              capture_output=True, text=True, check=False)
+        end = datetime.datetime.now(datetime.timezone.utc)
+        if iofiles and not self.params.keep_iofiles:
+            # no other job uses them so free the space straight away
+            shutil.rmtree(iofiles, ignore_errors=True)
+
+        status = 'passed' if proc.returncode == 0 else 'failed'
+        result = {}
+        if proc.returncode == 0:
+            # recorded with the status so that resume can tell complete
+            # results from ones cut short
+            result['result_sha256'] = self.result_hash(job)
+
+        self.log(f"{job.label}: {status} (rc={proc.returncode}, "
+                 f"{(end - start).total_seconds():.1f}s)")
+        if proc.stderr:
+            self.log(proc.stderr.rstrip())
+
+        self.manifest.update(job.label, status=status,
+                             returncode=proc.returncode,
+                             end=end.isoformat(),
+                             duration=(end - start).total_seconds(),
+                             **result)
+        if proc.returncode == 0:
+            self.record_windows(job)
+
+        return proc.returncode
+
+    def result_hash(self, job):
+        try:
+            return file_hash(os.path.join(self.results_dir, job.jobdir,
+                                          job.output))
+        except OSError as exc:
+            self.log(f"{job.label}: unable to read results: {exc}")
+            return None
+
+    def completed(self, job):
+        """
+        Return True if a job passed in an earlier attempt of the run and its
+        results are intact i.e. they match the hash in the manifest.
+        """
+        entry = self.manifest.jobs.get(job.label, {})
+        if entry.get('status') != 'passed' or not entry.get('result_sha256'):
+            return False
+
+        return self.result_hash(job) == entry['result_sha256']
+
+    def record_windows(self, job):
+        """
+        Record the ramp and measurement windows a job actually used, which
+        are shorter than its runtime if it reached steady state.
+        """
+        try:
+            data = load_fio_json(os.path.join(self.results_dir, job.jobdir,
+                                              job.output))
+        except (OSError, SummaryError) as exc:
+            self.log(f"{job.label}: unable to read results: {exc}")
+            return
+
+        windows = measurement_windows(data, self.ramp_time(job))
+        self.manifest.update(job.label, windows=windows)
+        steady = windows.get('steady_state')
+        if steady:
+            self.log(f"{job.label}: steady state "
+                     f"{'attained' if steady['attained'] else 'NOT attained'}"
+                     f" ({steady['criterion']}) after {windows['ramp_s']}s "
+                     f"ramp and {windows['measured_s']:.1f}s measured")
+
+    def run_stage(self, stage):
+        """
+        Run one stage of the IO file preparation.
+
+        @return: dict describing the stage.
+        """
+        config = stage_config(stage, self.params.precondition_passes)
+        common = self.render_common()
+        if self.params.hosts:
+            config = client_config(config, common, self.params.remote_dir)
+
+        self.write_configs(PREPARE_DIR, f"{stage}.fio", config, common)
+        output = f"{stage}.json"
+        if self.params.hosts:
+            cmd = client_command(self.params.fio, self.params.hosts,
+                                 f"{stage}.fio", output)
+        else:
+            cmd = [self.params.fio, f"{stage}.fio", '--output-format=json',
+                   f'--output={output}']
+
+        if self.params.dry_run:
+            self.log(f"## DRY-RUN ##\n{' '.join(cmd)}\n")
+            return {'command': cmd, 'status': 'dry-run'}
+
+        start = datetime.datetime.now(datetime.timezone.utc)
+        proc = subprocess.run(cmd, cwd=os.path.join(self.results_dir,
+                                                    PREPARE_DIR),
+                              capture_output=True, text=True, check=False)
+        end = datetime.datetime.now(datetime.timezone.utc)
+        info = {'command': cmd, 'output': output,
+                'status': 'passed' if proc.returncode == 0 else 'failed',
+                'returncode': proc.returncode, 'start': start.isoformat(),
+                'end': end.isoformat(),
+                'duration': (end - start).total_seconds()}
+        self.log(f"{stage}: {info['status']} (rc={proc.returncode}, "
+                 f"{info['duration']:.1f}s)")
+        if proc.stderr:
+            self.log(proc.stderr.rstrip())
+
+        return info
+
+    def prepare_iofiles(self):
+        """
+        Lay out the IO files, and precondition them, once before any job is
+        run. Jobs then reuse the files so layout time is not mixed into the
+        time they measure. The time taken by each stage is recorded in the
+        manifest.
+
+        @raises FioRunnerError: if a stage fails.
+        """
+        info = {'dir': PREPARE_DIR,
+                'precondition_passes': self.params.precondition_passes}
+        # stages that passed in an earlier attempt of the run are not
+        # repeated as long as the files are still there
+        done = self.manifest.run.get('prepare') or {}
+        if not os.listdir(os.path.join(self.results_dir, IOFILES)):
+            done = {}
+
+        for stage in prepare_stages(self.params.precondition_passes):
+            if (done.get(stage) or {}).get('status') == 'passed':
+                self.log(f"{stage}: already done, skipping")
+                info[stage] = done[stage]
+                continue
+
+            self.log(HEADER_TEMPLATE.format(self.params.name, stage,
+                                            PREPARE_DIR))
+            info[stage] = self.run_stage(stage)
+            self.manifest.update_run(prepare=info)
+            if info[stage]['status'] == 'failed':
+                raise FioRunnerError(f"IO file {stage} failed (rc="
+                                     f"{info[stage]['returncode']}) - see "
+                                     f"{self.logfile}")
+
+    def fio_version(self):
+        if self.params.dry_run:
+            return None
+
+        try:
+            return subprocess.run([self.params.fio, '--version'], check=True,
+                                  capture_output=True,
+                                  text=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError) as exc:
+            raise FioRunnerError(f"unable to run {self.params.fio}: "
+                                 f"{exc}") from exc
+
+    def _new_manifest(self, jobs):
+        """
+        Create the manifest of a run. Every job in the matrix is recorded as
+        pending so that an interrupted run can be resumed.
+        """
+        self.manifest = Manifest(self.results_dir,
+                                 {'name': self.params.name,
+                                  'label': self.params.label,
+                                  'created': datetime.datetime.now(
+                                        datetime.timezone.utc).isoformat(),
+                                  'fio_version': self.fio_version(),
+                                  'dry_run': self.params.dry_run,
+                                  'custom_opts': self.params.custom_opts,
+                                  'ramp_times': self.params.ramp_times,
+                                  'hosts': self.params.hosts,
+                                  'steady_state': self.params.steady_state,
+                                  'prepare': None,
+                                  'compress_logs': self.params.compress_logs,
+                                  'params': asdict(self.params)})
+        for job in jobs:
+            self.manifest.jobs[job.label] = {'label': job.label,
+                                             'fio_class': job.fio_class,
+                                             'job': job.job,
+                                             'dir': job.jobdir,
+                                             'status': 'pending'}
+
+        self.manifest.save()
+
+    def _resume_manifest(self, jobs):
+        """
+        Load the manifest of an earlier attempt of the run and return the
+        jobs that still need to be run. Results of jobs that did not
+        complete are removed.
+        """
+        self.manifest = Manifest.load(self.results_dir)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.manifest.update_run(resumed=self.manifest.run.get('resumed', []) +
+                                 [now.isoformat()])
+        remaining = []
+        for job in jobs:
+            if self.completed(job):
+                self.log(f"{job.label}: already completed, skipping")
+                continue
+
+            shutil.rmtree(os.path.join(self.results_dir, job.jobdir),
+                          ignore_errors=True)
+            self.manifest.update(job.label, fio_class=job.fio_class,
+                                 job=job.job, dir=job.jobdir,
+                                 status='pending')
+            remaining.append(job)
+
+        return remaining
+
+    def run(self, jobs, resume=False):
+        """
+        Run jobs, at most parallel at a time.
+
+        @param resume: continue an earlier attempt of the run whose results
+                       are in results_dir, skipping jobs it completed.
+        @return: number of jobs that failed.
+        """
+        if self.params.hosts and self.params.parallel > 1:
+            raise FioRunnerError("jobs cannot be run in parallel on fio "
+                                 "servers since each job already loads every "
+                                 "host")
+
+        if self.params.prepare and self.params.parallel > 1:
+            raise FioRunnerError("jobs cannot be run in parallel with "
+                                 "prepared IO files since every job would "
+                                 "use the same files at the same time")
+
+        os.makedirs(os.path.join(self.results_dir, IOFILES), exist_ok=True)
+        print(f"Logging to {os.path.abspath(self.logfile)}")
+        if resume:
+            jobs = self._resume_manifest(jobs)
+        else:
+            self._new_manifest(jobs)
+
+        if self.params.prepare:
+            self.prepare_iofiles()
+
+        with ThreadPoolExecutor(max_workers=self.params.parallel) as executor:
+            rcs = list(executor.map(self.run_job, jobs))
+
+        return len([rc for rc in rcs if rc != 0])
+
+    def cleanup(self):
+        """ Delete the fio IO files to avoid running out of space. """
+        shutil.rmtree(os.path.join(self.results_dir, IOFILES),
+                      ignore_errors=True)
+
+    def tarball(self, threads=None):
+        """
+        Create a tarball of the results compressed by a pool of threads.
+
+        @param threads: number of compression threads. Default is the number
+                        of CPUs.
+        @return: path to the tarball. Its size, compression ratio and the
+                 time taken are saved in archive_stats.
+        """
+        self.archive_stats = create_tarball(self.results_dir,
+                                            f"{self.results_dir}.tgz",
+                                            threads)
+        return self.archive_stats.path
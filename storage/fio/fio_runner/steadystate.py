@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fio_runner.summary import job_stats
+
+# fio steadystate criterion used by default: stop once the slope of the
+# IOPS over the window is within 0.3% of its mean.
+DEFAULT_CRITERION = 'iops_slope:0.3%'
+# Seconds of samples the criterion is evaluated over.
+DEFAULT_WINDOW = 60
+CRITERIA = ('iops', 'iops_slope', 'bw', 'bw_slope')
+
+
+class SteadyStateError(Exception):
+    """ Raised when steady state options are invalid. """
+
+
+def check_criterion(criterion):
+    """
+    Validate a fio steadystate criterion e.g. iops_slope:0.3% or bw:2%.
+    """
+    metric, sep, limit = criterion.partition(':')
+    if not sep or metric not in CRITERIA:
+        raise SteadyStateError(f"invalid steady state criterion "
+                               f"'{criterion}' - expected one of "
+                               f"{', '.join(CRITERIA)} followed by "
+                               ":<tolerance>")
+
+    try:
+        float(limit.rstrip('%'))
+    except ValueError as exc:
+        raise SteadyStateError(f"invalid steady state tolerance "
+                               f"'{limit}'") from exc
+
+
+def steady_state_options(criterion, window=DEFAULT_WINDOW, ramp_time=0):
+    """
+    Return fio options that end a job once it has reached steady state
+    (or after its runtime, whichever comes first).
+
+    @param criterion: fio steadystate criterion e.g. iops_slope:0.3%
+    @param window: seconds of samples the criterion is evaluated over.
+    @param ramp_time: seconds after ramp_time before samples are collected.
+    """
+    check_criterion(criterion)
+    options = [f"steadystate={criterion}",
+               f"steadystate_duration={window}"]
+    if ramp_time:
+        options.append(f"steadystate_ramp_time={ramp_time}")
+
+    return '\n'.join(options) + '\n'
+
+
+def measurement_windows(data, ramp_time):
+    """
+    Return the ramp and measurement windows actually used by a job from its
+    fio json output. With several jobs (numjobs or hosts) the longest is
+    used.
+
+    @param ramp_time: ramp_time the job was run with.
+    @return: dict
+    """
+    stats = job_stats(data)
+    windows = {'ramp_s': ramp_time,
+               'measured_s': max((j.get('job_runtime', 0) for j in stats),
+                                 default=0) / 1000,
+               'elapsed_s': max((j.get('elapsed', 0) for j in stats),
+                                default=0)}
+    steady = [j['steadystate'] for j in stats if j.get('steadystate')]
+    if steady:
+        windows['ramp_s'] += max(s.get('steadystate_ramptime', 0)
+                                 for s in steady)
+        windows['steady_state'] = {
+            'criterion': steady[0].get('ss'),
+            'window_s': steady[0].get('duration'),
+            'attained': all(s.get('attained') for s in steady)}
+
+    return windows
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import io
+import json
+import os
+
+from dataclasses import asdict, dataclass, fields
+
+from fio_runner import logstats
+from fio_runner.manifest import Manifest, MANIFEST_NAME, RESULTS_SUFFIX
+
+DIRECTIONS = ('read', 'write', 'trim')
+PERCENTILES = (50.0, 99.0, 99.9, 99.99)
+# Name fio gives the aggregate of all clients in client/server json output.
+CLIENT_AGGREGATE = 'All clients'
+
+
+class SummaryError(Exception):
+    """ Raised when results cannot be summarised. """
+
+
+def _pct_key(pct):
+    return f"clat_p{pct:g}_us".replace('.', '_')
+
+
+@dataclass
+class JobSummary:  # pylint: disable=too-many-instance-attributes
+    """ Summary of one direction (read/write/trim) of a class x job. """
+    fio_class: str
+    job: str
+    direction: str
+    iops: float
+    bw_mib_s: float
+    lat_mean_us: float
+    clat_p50_us: float
+    clat_p99_us: float
+    clat_p99_9_us: float
+    clat_p99_99_us: float
+    usr_cpu: float
+    sys_cpu: float
+
+
+def parse_fio_json(text, name):
+    """
+    Parse fio json output. fio can print warnings before the json document
+    so anything before the first '{' is skipped.
+
+    @param name: name of the output used in errors.
+    """
+    start = text.find('{')
+    if start < 0:
+        raise SummaryError(f"no json found in {name}")
+
+    try:
+        return json.loads(text[start:])
+    except ValueError as exc:
+        raise SummaryError(f"invalid fio json in {name}: {exc}") from exc
+
+
+def load_fio_json(path):
+    with open(path, encoding='utf-8') as fd:
+        return parse_fio_json(fd.read(), path)
+
+
+def client_jobs(data):
+    """
+    Return the per host job stats of fio client/server json output excluding
+    the aggregate fio adds for all clients.
+    """
+    return [j for j in data.get('client_stats') or []
+            if j.get('jobname') != CLIENT_AGGREGATE]
+
+
+def job_stats(data):
+    """
+    Return the job stats of fio json output. For client/server output these
+    are the jobs of every host so that they are combined like numjobs > 1
+    giving cluster-wide results.
+    """
+    return data.get('jobs') or client_jobs(data)
+
+
+def split_label(label):
+    """ Return (class, job) of a <class>-<job> label. """
+    fio_class, _, job = label.partition('-')
+    return fio_class, job
+
+
+def percentile_from_bins(bins, pct):
+    """
+    Return the pct percentile of a json+ latency histogram.
+
+    @param bins: dict of latency (ns) to count.
+    """
+    items = sorted((int(lat), count) for lat, count in bins.items())
+    total = sum(count for _, count in items)
+    if not total:
+        return 0.0
+
+    target = total * pct / 100
+    seen = 0
+    for lat, count in items:
+        seen += count
+        if seen >= target:
+            return float(lat)
+
+    return float(items[-1][0])
+
+
+def clat_percentiles(stats, clat_stats=None):
+    """
+    Return {field name: completion latency percentile in usec} for one
+    direction of a set of fio jobs.
+    """
+    bins = {}
+    for s in stats:
+        for lat, count in s.get('clat_ns', {}).get('bins', {}).items():
+            bins[lat] = bins.get(lat, 0) + count
+
+    percentiles = {}
+    for pct in PERCENTILES:
+        if bins:
+            value = percentile_from_bins(bins, pct)
+        elif clat_stats is not None and clat_stats.count:
+            value = clat_stats.percentile(pct)
+        else:
+            key = f"{pct:.6f}"
+            value = max(s.get('clat_ns', {}).get('percentile', {}).get(key, 0)
+                        for s in stats)
+
+        percentiles[_pct_key(pct)] = value / 1000
+
+    return percentiles
+
+
+def summarize_direction(fio_class, job, direction, fio_jobs,
+                        clat_stats=None):
+    """
+    Combine one direction of all fio jobs (e.g. numjobs > 1) in a result.
+    Latency percentiles are computed from the merged json+ histograms when
+    available, then from the completion latency logs if given, otherwise the
+    worst per-job percentile is used.
+
+    @param clat_stats: optional logstats.MetricStats of this direction's
+                       completion latency logs.
+    @return: JobSummary or None if there was no IO in this direction.
+    """
+    stats = [j[direction] for j in fio_jobs
+             if j.get(direction, {}).get('total_ios')]
+    if not stats:
+        return None
+
+    ios = sum(s['total_ios'] for s in stats)
+    percentiles = clat_percentiles(stats, clat_stats)
+    lat_mean = sum(s.get('lat_ns', {}).get('mean', 0) * s['total_ios']
+                   for s in stats) / ios
+    return JobSummary(fio_class, job, direction,
+                      iops=sum(s.get('iops', 0) for s in stats),
+                      bw_mib_s=sum(s.get('bw_bytes', s.get('bw', 0) * 1024)
+                                   for s in stats) / 1024 ** 2,
+                      lat_mean_us=lat_mean / 1000,
+                      usr_cpu=sum(j.get('usr_cpu', 0) for j in fio_jobs),
+                      sys_cpu=sum(j.get('sys_cpu', 0) for j in fio_jobs),
+                      **percentiles)
+
+
+def summarize_result(fio_class, job, data, clat_stats=None):
+    """
+    Return a list of JobSummary for the fio json output of a job.
+
+    @param clat_stats: optional dict of direction index to
+                       logstats.MetricStats of the completion latency logs.
+    """
+    summaries = []
+    for index, direction in enumerate(DIRECTIONS):
+        summary = summarize_direction(fio_class, job, direction,
+                                      job_stats(data),
+                                      (clat_stats or {}).get(index))
+        if summary:
+            summaries.append(summary)
+
+    return summaries
+
+
+def find_results(run_dir):
+    """
+    Return a list of (class, job, json path) for each <class>-<job>.results
+    directory in a run. The manifest is used if there is one, otherwise class
+    and job are taken from the directory name.
+    """
+    if os.path.exists(os.path.join(run_dir, MANIFEST_NAME)):
+        manifest = Manifest.load(run_dir)
+        return [(j['fio_class'], j['job'],
+                 os.path.join(run_dir, j['dir'], j['output']))
+                for j in manifest.jobs.values()
+                if os.path.exists(os.path.join(run_dir, j['dir'],
+                                               j['output']))]
+
+    results = []
+    for entry in sorted(os.listdir(run_dir)):
+        path = os.path.join(run_dir, entry)
+        if not entry.endswith(RESULTS_SUFFIX) or not os.path.isdir(path):
+            continue
+
+        label = entry[:-len(RESULTS_SUFFIX)]
+        output = os.path.join(path, f"{label}.json")
+        if os.path.exists(output):
+            results.append((*split_label(label), output))
+
+    return results
+
+
+def has_bins(data):
+    return any(j.get(d, {}).get('clat_ns', {}).get('bins')
+               for j in job_stats(data) for d in DIRECTIONS)
+
+
+def log_clat_stats(jobdir):
+    """
+    Return completion latency statistics from the logs in a job directory
+    or None if there are no logs (or numpy is not installed).
+    """
+    paths = logstats.find_logs(jobdir).get('clat')
+    if not paths or logstats.numpy is None:
+        return None
+
+    # one bucket per second is enough since only the percentiles are used
+    return logstats.parse_logs(paths, 1000)
+
+
+def summarize_run(run_dir):
+    """
+    Return a list of JobSummary for every job in a run directory. If fio did
+    not output json+ latency histograms percentiles are approximated from
+    the completion latency logs where available.
+    """
+    if not os.path.isdir(run_dir):
+        raise SummaryError(f"results directory '{run_dir}' not found")
+
+    summaries = []
+    for fio_class, job, path in find_results(run_dir):
+        data = load_fio_json(path)
+        clat_stats = None
+        if not has_bins(data):
+            clat_stats = log_clat_stats(os.path.dirname(path))
+
+        summaries += summarize_result(fio_class, job, data, clat_stats)
+
+    return summaries
+
+
+def to_json(summaries):
+    return json.dumps([asdict(s) for s in summaries], indent=2)
+
+
+def to_csv(summaries):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, [f.name for f in fields(JobSummary)])
+    writer.writeheader()
+    for summary in summaries:
+        writer.writerow(asdict(summary))
+
+    return out.getvalue()
+
+
+TABLE_COLUMNS = (('class', 'fio_class', '{}'),
+                 ('job', 'job', '{}'),
+                 ('dir', 'direction', '{}'),
+                 ('IOPS', 'iops', '{:.0f}'),
+                 ('MiB/s', 'bw_mib_s', '{:.1f}'),
+                 ('lat avg', 'lat_mean_us', '{:.1f}'),
+                 ('p50', 'clat_p50_us', '{:.1f}'),
+                 ('p99', 'clat_p99_us', '{:.1f}'),
+                 ('p99.9', 'clat_p99_9_us', '{:.1f}'),
+                 ('p99.99', 'clat_p99_99_us', '{:.1f}'),
+                 ('usr%', 'usr_cpu', '{:.1f}'),
+                 ('sys%', 'sys_cpu', '{:.1f}'))
+
+
+def format_table(columns, items, left=3):
+    """
+    Return items as a text table.
+
+    @param columns: tuple of (title, attribute, format) per column.
+    @param left: number of (leading) left aligned columns.
+    """
+    rows = [[title for title, _, _ in columns]]
+    for item in items:
+        rows.append([fmt.format(getattr(item, attr))
+                     for _, attr, fmt in columns])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    lines = []
+    for n, row in enumerate(rows):
+        lines.append('  '.join(cell.ljust(w) if i < left else cell.rjust(w)
+                               for i, (cell, w) in
+                               enumerate(zip(row, widths))).rstrip())
+        if n == 0:
+            lines.append('  '.join('-' * w for w in widths))
+
+    return '\n'.join(lines) + '\n'
+
+
+def to_table(summaries):
+    """ Return summaries as a text table. Latencies are in microseconds. """
+    return format_table(TABLE_COLUMNS, summaries)
+
+
+FORMATS = {'table': to_table, 'csv': to_csv, 'json': to_json}
+
+
+def save_summary(summaries, output_dir):
+    """ Save summaries as summary.csv, summary.json and summary.txt. """
+    os.makedirs(output_dir, exist_ok=True)
+    for fmt, ext in (('csv', 'csv'), ('json', 'json'), ('table', 'txt')):
+        with open(os.path.join(output_dir, f"summary.{ext}"), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(FORMATS[fmt](summaries))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+
+from functools import cached_property
+
+# Placeholder tokens used in conf/*.fio.template e.g. __BLOCKSIZE__
+PLACEHOLDER = re.compile(r'__([A-Z0-9_]+)__')
+TEMPLATE_SUFFIX = '.fio.template'
+GLOBAL_SUFFIX = f'-global{TEMPLATE_SUFFIX}'
+COMMON_GLOBAL = 'common'
+CUSTOM_JOB = 'custom'
+
+
+class TemplateError(Exception):
+    """ Raised when a template cannot be rendered. """
+
+
+class Template:
+    """ A fio config template that is read once and rendered in memory. """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, encoding='utf-8') as fd:
+            self.text = fd.read()
+
+    @cached_property
+    def placeholders(self):
+        """ Set of placeholder names used in the template. """
+        return frozenset(PLACEHOLDER.findall(self.text))
+
+    def render(self, values):
+        """
+        Replace all placeholders in a single pass.
+
+        @param values: dict of placeholder name (without underscores) to
+                       value. Values not used by the template are ignored.
+        @raises TemplateError: if a placeholder has no value.
+        """
+        missing = sorted(p for p in self.placeholders
+                         if values.get(p) in (None, ''))
+        if missing:
+            raise TemplateError(f"{os.path.basename(self.path)}: no value "
+                                f"for {', '.join(missing)}")
+
+        return PLACEHOLDER.sub(lambda m: str(values[m.group(1)]), self.text)
+
+
+class TemplateSet:
+    """
+    The templates in a conf directory. Classes are readwrite definitions
+    (<class>-global.fio.template) and jobs are the config of the test itself
+    (<job>.fio.template).
+    """
+
+    def __init__(self, conf_dir):
+        if not os.path.isdir(conf_dir):
+            raise TemplateError(f"conf directory '{conf_dir}' not found")
+
+        self.conf_dir = conf_dir
+        self._templates = {}
+
+    def _names(self, suffix):
+        return sorted(f[:-len(suffix)] for f in os.listdir(self.conf_dir)
+                      if f.endswith(suffix))
+
+    @cached_property
+    def classes(self):
+        return [c for c in self._names(GLOBAL_SUFFIX) if c != COMMON_GLOBAL]
+
+    @cached_property
+    def jobs(self):
+        return [j for j in self._names(TEMPLATE_SUFFIX)
+                if not j.endswith('-global') and j != CUSTOM_JOB]
+
+    def get(self, name):
+        """ Return the (cached) Template for conf/<name>.fio.template. """
+        if name not in self._templates:
+            path = os.path.join(self.conf_dir, f'{name}{TEMPLATE_SUFFIX}')
+            if not os.path.exists(path):
+                raise TemplateError(f"template '{path}' not found")
+
+            self._templates[name] = Template(path)
+
+        return self._templates[name]
+
+    def common_global(self):
+        return self.get(f'{COMMON_GLOBAL}-global')
+
+    def class_global(self, fio_class):
+        return self.get(f'{fio_class}-global')
+
+    def job(self, job):
+        return self.get(job)
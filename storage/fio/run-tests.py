@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import sys
+
+from fio_runner import (
+    FioRunner,
+    FioRunnerError,
+    FioRunParams,
+    TemplateError,
+    TemplateSet,
+)
+from fio_runner.cluster import (
+    DEFAULT_START_DELAY,
+    summarize_run_hosts,
+    SYNC_SCRIPT,
+    to_host_table,
+)
+from fio_runner.layout import (
+    DEFAULT_PRECONDITION_PASSES,
+    format_timings,
+    run_timings,
+)
+from fio_runner.runner import (
+    CUSTOM_OPTS,
+    DEFAULT_NAME,
+    RAMP_TIMES,
+    resume_run,
+    WILDCARD,
+)
+from fio_runner.steadystate import (
+    DEFAULT_CRITERION,
+    DEFAULT_WINDOW,
+    SteadyStateError,
+)
+from fio_runner.summary import (
+    save_summary,
+    summarize_run,
+    SummaryError,
+    to_table,
+)
+
+
+def confirm_all(option, available, requested, yes):
+    """ Ask for confirmation if nothing was requested (i.e. run all). """
+    if requested or yes:
+        return True
+
+    answer = input(f"All --{option} values ({len(available)}) will be run - "
+                   f"OK? (use "
+                   f"'--{option} {WILDCARD}' to avoid this message) [y/N] ")
+    return answer.lower() == 'y'
+
+
+def new_run(args, templates):
+    """
+    Return a FioRunner and the jobs to run for the command line arguments or
+    None if the user aborts.
+    """
+    custom_opts = {o: getattr(args, o) for o in CUSTOM_OPTS}
+    runner = FioRunner(templates,
+                       FioRunParams(args.name, args.label,
+                                    custom_opts=custom_opts,
+                                    ramp_times={'4K': args.ramp_time_4k,
+                                                '4M': args.ramp_time_4m},
+                                    dry_run=args.dry_run, fio=args.fio,
+                                    parallel=args.parallel, hosts=args.hosts,
+                                    start_delay=args.start_delay,
+                                    remote_dir=args.remote_dir,
+                                    sync_script=args.sync_script,
+                                    steady_state=args.steady_state,
+                                    steady_state_window=(
+                                        args.steady_state_window),
+                                    steady_state_ramp_time=(
+                                        args.steady_state_ramp_time),
+                                    prepare=args.prepare,
+                                    precondition_passes=(
+                                        args.precondition_passes),
+                                    compress_logs=args.compress_logs,
+                                    keep_iofiles=args.no_cleanup))
+    if not confirm_all('class', templates.classes, args.classes, args.yes):
+        return None
+
+    if not (runner.has_custom_opts or
+            confirm_all('job', templates.jobs, args.jobs, args.yes)):
+        return None
+
+    return runner, runner.matrix(args.classes, args.jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Run a set of pre-configured fio test jobs. Results are "
+                     "collected into a tarball."))
+    parser.add_argument('--class', dest='classes', action='append',
+                        default=[],
+                        help=("Test class to run. Can be specified multiple "
+                              "times. If no class is specified then all will "
+                              "be run. Set to 'all' to avoid being asked for "
+                              "confirmation."))
+    parser.add_argument('--job', dest='jobs', action='append', default=[],
+                        help=("Test job to run. Can be specified multiple "
+                              "times. If no job is specified then all will be "
+                              "run. Set to 'all' to avoid being asked for "
+                              "confirmation."))
+    for opt in CUSTOM_OPTS:
+        parser.add_argument(f'--{opt}', type=str, default=None,
+                            help=(f"Custom job {opt}. If any custom option is "
+                                  "provided they must all be provided and a "
+                                  "custom job is run."))
+
+    parser.add_argument('--dry-run', action='store_true', default=False,
+                        help=("Do not execute the tests. Will generate the "
+                              "config and print the command."))
+    parser.add_argument('--ramp-time-4k', type=int, default=RAMP_TIMES['4K'],
+                        help="Override 4k block size ramp_time.")
+    parser.add_argument('--ramp-time-4m', type=int, default=RAMP_TIMES['4M'],
+                        help="Override 4m block size ramp_time.")
+    parser.add_argument('-l', '--label', type=str, default=None,
+                        help="Job label. Default is the current time.")
+    parser.add_argument('-n', '--name', type=str, default=DEFAULT_NAME,
+                        help="Name for test run used to identify results.")
+    parser.add_argument('--no-cleanup', action='store_true', default=False,
+                        help="Don't delete the fio IO files after tests.")
+    parser.add_argument('--no-tarball', action='store_true', default=False,
+                        help="Do not create a tarball.")
+    parser.add_argument('--yes', action='store_true', default=False,
+                        help="Run tests non-interactively.")
+    parser.add_argument('--parallel', type=int, default=1,
+                        help=("Maximum number of jobs run at the same time. "
+                              "Each job then lays out its own IO files (so up "
+                              "to this many times the job size is needed) "
+                              "which are deleted when it ends unless "
+                              "--no-cleanup is given. Concurrent jobs share "
+                              "the storage under test so results are only "
+                              "comparable between runs with the same value. "
+                              "Cannot be used with --prepare or --host."))
+    parser.add_argument('--fio', type=str, default='fio',
+                        help="Path to the fio binary.")
+    parser.add_argument('--host', dest='hosts', action='append', default=[],
+                        help=("Run every job on this fio server (started "
+                              "with 'fio --server') as host[,port] using "
+                              "fio client/server. Can be specified multiple "
+                              "times to load the storage from many clients "
+                              "at once. Results are merged into cluster-wide "
+                              "IOPS, bandwidth and latency percentiles."))
+    parser.add_argument('--start-delay', type=int,
+                        default=DEFAULT_START_DELAY,
+                        help=("Seconds allowed for a job to reach every fio "
+                              "server before all of them start it at the "
+                              "same time. Host clocks must be in sync."))
+    parser.add_argument('--remote-dir', type=str, default=None,
+                        help=("Directory the fio servers create IO files in. "
+                              "Default is each server's working directory."))
+    parser.add_argument('--sync-script', type=str, default=SYNC_SCRIPT,
+                        help=("Path of tools/sync-start.sh on the fio "
+                              "servers, run before each job to wait for the "
+                              "synchronised start. Default is the path of "
+                              "this copy."))
+    parser.add_argument('--steady-state', nargs='?', default=None,
+                        const=DEFAULT_CRITERION, metavar='CRITERION',
+                        help=("End each job once it reaches steady state "
+                              "rather than always running for the full "
+                              "runtime, using a fio steadystate criterion "
+                              "(iops, iops_slope, bw or bw_slope followed by "
+                              f":<tolerance>). Default is {DEFAULT_CRITERION}"
+                              ". With a fixed iodepth stable throughput also "
+                              "means stable mean latency. The ramp and "
+                              "measurement windows used are recorded in the "
+                              "manifest."))
+    parser.add_argument('--steady-state-window', type=int,
+                        default=DEFAULT_WINDOW,
+                        help=("Seconds of samples the steady state criterion "
+                              "must hold for."))
+    parser.add_argument('--steady-state-ramp-time', type=int, default=0,
+                        help=("Seconds after ramp_time before steady state "
+                              "samples are collected."))
+    parser.add_argument('--prepare', action='store_true', default=False,
+                        help=("Lay out the IO files once before running any "
+                              "job, and precondition them, so that every job "
+                              "reuses them rather than laying out or "
+                              "extending files while being measured. Layout "
+                              "and precondition times are reported "
+                              "separately from measured time."))
+    parser.add_argument('--precondition-passes', type=int,
+                        default=DEFAULT_PRECONDITION_PASSES,
+                        help=("Number of times --prepare sequentially writes "
+                              "the whole data set after laying it out so "
+                              "that results reflect steady state media. 0 "
+                              "only lays out the files."))
+    parser.add_argument('--compress-logs', action='store_true',
+                        default=False,
+                        help=("Have fio compress logs as they are written "
+                              "and store them compressed (<log>.fz). "
+                              "summarize.py, compare.py and create-graphs.py "
+                              "read them transparently."))
+    parser.add_argument('--archive-threads', type=int, default=None,
+                        help=("Number of threads used to compress the "
+                              "results tarball. Default is the number of "
+                              "CPUs."))
+    parser.add_argument('--resume', type=str, default=None,
+                        metavar='RESULTS_DIR',
+                        help=("Resume an interrupted run from its results "
+                              "directory. Jobs whose results are complete "
+                              "(checked against the hash in the manifest) "
+                              "are skipped and the rest of the matrix is run "
+                              "with the parameters recorded in the manifest; "
+                              "class, job and test options are ignored."))
+    parser.add_argument('--conf-dir', type=str,
+                        default=os.path.join(os.path.dirname(__file__),
+                                             'conf'))
+    args = parser.parse_args()
+
+    templates = TemplateSet(args.conf_dir)
+    if args.resume:
+        params, jobs = resume_run(args.resume)
+        runner = FioRunner(templates, params)
+    else:
+        new = new_run(args, templates)
+        if new is None:
+            print("Aborting.")
+            return 0
+
+        runner, jobs = new
+
+    params = runner.params
+    failed = runner.run(jobs, resume=bool(args.resume))
+    if not args.no_cleanup:
+        runner.cleanup()
+
+    # the results directory covers the whole matrix, including jobs
+    # completed before a resume
+    summaries = [] if params.dry_run else summarize_run(runner.results_dir)
+    if summaries:
+        print(to_table(summaries), end='')
+        save_summary(summaries, runner.results_dir)
+
+    if params.hosts and not params.dry_run:
+        table = to_host_table(summarize_run_hosts(runner.results_dir))
+        print(f"\nPer host:\n{table}", end='')
+        with open(os.path.join(runner.results_dir, 'summary-hosts.txt'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(table)
+
+    if params.prepare and not params.dry_run:
+        print("\nTime spent: "
+              f"{format_timings(run_timings(runner.manifest))}")
+
+    if not args.no_tarball and not params.dry_run:
+        path = runner.tarball(args.archive_threads)
+        print(f"Results tarball '{path}' created ({runner.archive_stats}).")
+
+    print(f"Manifest saved in {runner.manifest.path}")
+    print("Done.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (FioRunnerError, SteadyStateError, SummaryError,
+            TemplateError) as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Copyright 2025 Canonical Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import sys
+
+from fio_runner.archive import ArchiveError, is_archive, summarize_archive
+from fio_runner.logstats import LogError
+from fio_runner.summary import (
+    FORMATS,
+    save_summary,
+    summarize_run,
+    SummaryError,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=("Summarise the fio json output of a test run with one "
+                     "row per class, job and direction. Latencies are "
+                     "completion latencies in microseconds."))
+    parser.add_argument('results_dir',
+                        help=("Results directory created by run-tests.py or "
+                              "its .tgz which is read without being "
+                              "extracted."))
+    parser.add_argument('--format', choices=sorted(FORMATS), default=None,
+                        help=("Output format. Default is a table on stdout "
+                              "and, if --output-dir is provided, all formats "
+                              "are saved."))
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help=("Save summary.csv, summary.json and "
+                              "summary.txt in this directory."))
+    args = parser.parse_args()
+
+    if is_archive(args.results_dir):
+        summaries = summarize_archive(args.results_dir)
+    else:
+        summaries = summarize_run(args.results_dir)
+
+    if not summaries:
+        print(f"No fio json results found in {args.results_dir}")
+        return 1
+
+    print(FORMATS[args.format or 'table'](summaries), end='')
+    if args.output_dir:
+        save_summary(summaries, args.output_dir)
+        print(f"Summary saved in {args.output_dir}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (ArchiveError, LogError, SummaryError) as exc:
+        print(f"ERROR: {exc}")
+        sys.exit(1)
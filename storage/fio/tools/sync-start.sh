@@ -0,0 +1,11 @@
+#!/bin/sh -u
+# Wait until the time given in seconds since the epoch. fio servers run this
+# via exec_prerun so that a job starts at the same time on every host; it is
+# a script since fio's job file parser mangles shell expressions.
+start_at=${1:?need start time in seconds since the epoch}
+
+delay=$((start_at - $(date +%s)))
+if [ "$delay" -gt 0 ]; then
+    sleep "$delay"
+fi
+exit 0
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+from fio_runner import graphs, logstats
+from fio_runner.archive import (
+    ArchiveError,
+    member_path,
+    RunArchive,
+    scan_archive,
+    summarize_archive,
+)
+from fio_runner.compare import compare_runs
+from fio_runner.summary import summarize_run
+
+
+class TestArchive(unittest.TestCase):
+    """ Tests for reading results directly from a tarball. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.run_dir = os.path.join(self.tmp, 'mytest-1')
+        for label, iops in (('randwrite-4k', 500), ('seqread-1m', 40)):
+            jobdir = os.path.join(self.run_dir, f"{label}.results")
+            os.makedirs(jobdir)
+            read = {'total_ios': iops * 10, 'iops': iops,
+                    'bw_bytes': iops * 4096, 'lat_ns': {'mean': 3000},
+                    'clat_ns': {}}
+            with open(os.path.join(jobdir, f"{label}.json"), 'w',
+                      encoding='utf-8') as fd:
+                json.dump({'jobs': [{'read': read, 'usr_cpu': 2,
+                                     'sys_cpu': 4}]}, fd)
+
+            for metric, value in (('iops', iops), ('clat', 3000)):
+                with open(os.path.join(jobdir, f"{label}_{metric}.1.log"),
+                          'w', encoding='utf-8') as fd:
+                    fd.writelines(f"{n * 500}, {value + n % 3}, 0, 4096, 0\n"
+                                  for n in range(20))
+
+        # large files that must not be read
+        os.makedirs(os.path.join(self.run_dir, 'iofiles'))
+        with open(os.path.join(self.run_dir, 'iofiles', 'data'), 'wb') as fd:
+            fd.write(b'\0' * 4096)
+
+        self.tarball = f"{self.run_dir}.tgz"
+        with tarfile.open(self.tarball, 'w:gz') as tar:
+            tar.add(self.run_dir, arcname='mytest-1')
+
+    def test_member_path(self):
+        self.assertEqual(member_path('./mytest-1/a.results/a.json'),
+                         'a.results/a.json')
+        self.assertEqual(member_path('mytest-1/manifest.json'),
+                         'manifest.json')
+
+    def test_scan_archive(self):
+        seen = []
+        scan_archive(self.tarball,
+                     [('*.results/*.json',
+                       lambda name, fd: seen.append((name, len(fd.read()))))])
+        self.assertEqual([name for name, _ in seen],
+                         ['randwrite-4k.results/randwrite-4k.json',
+                          'seqread-1m.results/seqread-1m.json'])
+        with open(self.tarball, 'r+b') as fd:
+            fd.truncate(100)
+
+        with self.assertRaises(ArchiveError):
+            scan_archive(self.tarball, [])
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_summarize_archive(self):
+        self.assertEqual(summarize_archive(self.tarball),
+                         summarize_run(self.run_dir))
+        archive = RunArchive(self.tarball, ('iops',), 1000).read()
+        self.assertEqual(archive.jobs(),
+                         [('randwrite', '4k', 'randwrite-4k.results'),
+                          ('seqread', '1m', 'seqread-1m.results')])
+        times, means = archive.intervals('seqread-1m.results',
+                                         'iops')[0][:2]
+        self.assertEqual(times.tolist(), [0.0, 1.0, 2.0, 3.0, 4.0,
+                                          5.0, 6.0, 7.0, 8.0, 9.0])
+        self.assertAlmostEqual(means[0], 40.5)
+        self.assertIsNone(archive.intervals('seqread-1m.results', 'bw'))
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_compare_archive(self):
+        from_dir = compare_runs([self.run_dir, self.run_dir])[0]
+        from_archive = compare_runs([self.tarball, self.run_dir])[0]
+        self.assertEqual([(c.metric, c.delta_pct, c.p_value)
+                          for c in from_archive],
+                         [(c.metric, c.delta_pct, c.p_value)
+                          for c in from_dir])
+
+    @unittest.skipIf(graphs.pyplot is None, "matplotlib not installed")
+    def test_graph_archive(self):
+        written = graphs.create_graphs(self.tarball, 1, formats=('svg',))
+        output_dir = os.path.join(self.tmp, 'mytest-1-graphs')
+        self.assertEqual(sorted(written), ['randwrite-4k.results',
+                                           'seqread-1m.results'])
+        self.assertEqual(written['seqread-1m.results'],
+                         [os.path.join(output_dir, 'seqread-1m.results',
+                                       f"seqread-1m_{metric}.svg")
+                          for metric in ('clat', 'iops')])
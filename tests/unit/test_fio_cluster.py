@@ -0,0 +1,245 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from fio_runner import FioRunner, FioRunnerError, FioRunParams, TemplateSet
+from fio_runner.cluster import (
+    client_config,
+    summarize_hosts,
+    summarize_run_hosts,
+    SYNC_SCRIPT,
+)
+from fio_runner.manifest import Manifest
+from fio_runner.summary import summarize_run
+
+CONF_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'storage',
+                        'fio', 'conf')
+
+# Stand-in for fio client/server. A server (--server=,port) receives a job
+# config, runs its exec_prerun and replies with the stats of one job. A
+# client (--client=host,port config ...) sends the config to every server
+# at once and writes their stats as fio client/server json output.
+FIO_STANDIN = """#!{python}
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+args = sys.argv[1:]
+if args[0] == '--version':
+    print('fio-3.36')
+    sys.exit(0)
+
+if args[0].startswith('--server'):
+    port = int(args[0].rpartition(',')[2])
+    sock = socket.create_server(('127.0.0.1', port))
+    print('ready', flush=True)
+    while True:
+        conn, _ = sock.accept()
+        config = conn.makefile('rb').read().decode()
+        for line in config.splitlines():
+            if line.strip().startswith('exec_prerun='):
+                subprocess.run(line.partition('=')[2], shell=True)
+
+        stats = {{'total_ios': port, 'iops': port, 'bw_bytes': port * 4096,
+                  'lat_ns': {{'mean': 1000}},
+                  'clat_ns': {{'bins': {{str(port): 99,
+                                         str(port * 10): 1}}}}}}
+        conn.sendall(json.dumps({{'jobname': 'randread', 'port': port,
+                                  'hostname': 'localhost',
+                                  'job_start': time.time(),
+                                  'read': stats}}).encode())
+        conn.close()
+
+output = [a.partition('=')[2] for a in args if a.startswith('--output=')][0]
+results = []
+
+def run(port, config):
+    with open(config, 'rb') as fd, \\
+            socket.create_connection(('127.0.0.1', port)) as conn:
+        conn.sendall(fd.read())
+        conn.shutdown(socket.SHUT_WR)
+        results.append(json.loads(conn.makefile('rb').read()))
+
+threads = [threading.Thread(target=run, args=(int(a.rpartition(',')[2]),
+                                              args[i + 1]))
+           for i, a in enumerate(args) if a.startswith('--client=')]
+for thread in threads:
+    thread.start()
+
+for thread in threads:
+    thread.join()
+
+results.append({{'jobname': 'All clients'}})
+with open(output, 'w') as fd:
+    json.dump({{'client_stats': results}}, fd)
+"""
+
+# Minimal templates for running jobs with a real fio in a second.
+SHORT_TEMPLATES = {
+    'common-global': ("ioengine=psync\nsize=1m\ndirectory=../iofiles\n"
+                      "filename_format=\"__TESTNAME__.$filenum\"\n"
+                      "ramp_time=__RAMP_TIME__\nruntime=1\ntime_based\n"),
+    'randread-global': ("[global]\n name=__TESTNAME__\n readwrite=randread"
+                        "\n include common-global.fio\n"),
+    '4k': "[4k]\n blocksize=4k\n",
+}
+
+
+class TestCluster(unittest.TestCase):
+    """ Tests for running fio on many hosts with fio client/server. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.fio = os.path.join(self.tmp, 'fio')
+        with open(self.fio, 'w', encoding='utf-8') as fd:
+            fd.write(FIO_STANDIN.format(python=sys.executable))
+
+        os.chmod(self.fio, 0o755)
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def start_server(self):
+        port = self.free_port()
+        # pylint: disable-next=consider-using-with
+        proc = subprocess.Popen([self.fio, f'--server=,{port}'],
+                                stdout=subprocess.PIPE, text=True)
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.kill)
+        self.assertEqual(proc.stdout.readline().strip(), 'ready')
+        return f'localhost,{port}'
+
+    def start_fio_server(self, fio, workdir):
+        """ Start a real fio server and wait until it accepts clients. """
+        port = self.free_port()
+        os.makedirs(workdir)
+        # pylint: disable-next=consider-using-with
+        proc = subprocess.Popen([fio, f'--server=,{port}'], cwd=workdir,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.kill)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('localhost', port), 1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.fail(f"fio server on port {port} did not start")
+
+                time.sleep(0.1)
+
+        return f'localhost,{port}'
+
+    def test_client_config(self):
+        config = client_config("[global]\n name=x\n include common-global.fio"
+                               "\n[4k]\n bs=4k\n", "directory=../iofiles\n",
+                               '/srv/fio', 1700000000)
+        self.assertNotIn('include', config)
+        self.assertIn(" directory=../iofiles\n directory=/srv/fio\n"
+                      f" exec_prerun={SYNC_SCRIPT} 1700000000\n", config)
+        self.assertTrue(config.endswith("[4k]\n bs=4k\n"))
+        config = client_config("[4k]\n", "", start_at=1700000000,
+                               sync_script='/opt/sync-start.sh')
+        self.assertIn(" exec_prerun=/opt/sync-start.sh 1700000000\n",
+                      config)
+
+    def test_invalid_sync_script(self):
+        for script in ('', '/opt/$HOME/sync-start.sh', '/opt/a;b'):
+            with self.subTest(script=script), \
+                    self.assertRaises(FioRunnerError):
+                FioRunner(TemplateSet(CONF_DIR),
+                          FioRunParams('test', '1', base_dir=self.tmp,
+                                       hosts=['localhost'],
+                                       sync_script=script))
+
+    def test_summarize_hosts(self):
+        stats = {'total_ios': 10, 'iops': 10, 'bw_bytes': 1024 ** 2,
+                 'clat_ns': {'bins': {'1000': 10}}}
+        data = {'client_stats': [
+            {'hostname': 'a', 'port': 8765, 'read': stats},
+            {'hostname': 'b', 'port': 8766, 'read': stats},
+            {'jobname': 'All clients', 'read': stats}]}
+        hosts = summarize_hosts('randread', '4k', data)
+        self.assertEqual([h.host for h in hosts], ['a', 'b,8766'])
+        self.assertEqual(hosts[1].bw_mib_s, 1)
+
+    def test_run_on_servers(self):
+        hosts = [self.start_server() for _ in range(3)]
+        runner = FioRunner(TemplateSet(CONF_DIR),
+                           FioRunParams('test', '1', base_dir=self.tmp,
+                                        fio=self.fio, hosts=hosts,
+                                        start_delay=1,
+                                        remote_dir='/srv/fio'))
+        self.assertEqual(runner.run(runner.matrix(['randread'], ['4k'])), 0)
+        manifest = Manifest.load(runner.results_dir)
+        job = manifest.jobs['randread-4k']
+        self.assertEqual(job['hosts'], hosts)
+        self.assertEqual(job['options']['directory'], '/srv/fio')
+        self.assertEqual(job['command'].count('randread-4k.fio'), 3)
+        with open(os.path.join(runner.results_dir, job['dir'],
+                               job['output']), encoding='utf-8') as fd:
+            starts = [c['job_start'] for c in json.load(fd)['client_stats']
+                      if 'job_start' in c]
+
+        # all servers waited for the same synchronised start
+        self.assertGreaterEqual(min(starts), job['start_at'])
+        self.assertLess(max(starts) - min(starts), 0.5)
+
+        ports = [int(h.rpartition(',')[2]) for h in hosts]
+        cluster = summarize_run(runner.results_dir)[0]
+        self.assertEqual(cluster.iops, sum(ports))
+        # percentiles come from the merged histograms of all hosts
+        self.assertEqual(cluster.clat_p50_us, sorted(ports)[1] / 1000)
+        per_host = summarize_run_hosts(runner.results_dir)
+        self.assertEqual(sorted(h.iops for h in per_host), sorted(ports))
+
+    @unittest.skipUnless(shutil.which('fio'), "fio is not installed")
+    def test_run_on_fio_servers(self):
+        conf_dir = os.path.join(self.tmp, 'conf')
+        os.makedirs(conf_dir)
+        for name, template in SHORT_TEMPLATES.items():
+            with open(os.path.join(conf_dir, f'{name}.fio.template'), 'w',
+                      encoding='utf-8') as fd:
+                fd.write(template)
+
+        workdirs = [os.path.join(self.tmp, f'server{i}') for i in range(2)]
+        hosts = [self.start_fio_server(shutil.which('fio'), w)
+                 for w in workdirs]
+        remote_dir = os.path.join(self.tmp, 'remote')
+        os.makedirs(remote_dir)
+        runner = FioRunner(TemplateSet(conf_dir),
+                           FioRunParams('test', '1', base_dir=self.tmp,
+                                        fio=shutil.which('fio'), hosts=hosts,
+                                        ramp_times={'4K': 0, '4M': 0},
+                                        start_delay=2,
+                                        remote_dir=remote_dir))
+        self.assertEqual(runner.run(runner.matrix(['randread'], ['4k'])), 0)
+        job = Manifest.load(runner.results_dir).jobs['randread-4k']
+        self.assertEqual(job['status'], 'passed')
+        for workdir in workdirs:
+            # fio runs exec_prerun in the server's working directory and
+            # saves its output there; the script prints nothing unless it
+            # fails
+            prerun = [f for f in os.listdir(workdir)
+                      if f.endswith('.prerun.txt')]
+            self.assertEqual(len(prerun), 1)
+            with open(os.path.join(workdir, prerun[0]),
+                      encoding='utf-8') as fd:
+                self.assertEqual(fd.read(), '')
+
+        self.assertEqual(len(summarize_run_hosts(runner.results_dir)), 2)
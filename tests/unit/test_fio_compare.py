@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from fio_runner import logstats
+from fio_runner.compare import (
+    batch_means,
+    compare_runs,
+    CompareError,
+    RunComparer,
+    RunData,
+    to_table,
+    welch_pvalue,
+)
+
+
+def make_run(path, iops, clat_ns, noise=0.01, seed=0):
+    """
+    Create a run with a randread-4k job and per second iops and clat logs.
+    """
+    jobdir = os.path.join(path, 'randread-4k.results')
+    os.makedirs(jobdir)
+    stats = {'total_ios': iops * 60, 'iops': iops,
+             'bw_bytes': iops * 4096, 'lat_ns': {'mean': clat_ns},
+             'clat_ns': {'bins': {str(clat_ns): 99, str(clat_ns * 2): 1}}}
+    with open(os.path.join(jobdir, 'randread-4k.json'), 'w',
+              encoding='utf-8') as fd:
+        json.dump({'jobs': [{'read': stats, 'write': {'total_ios': 0},
+                             'usr_cpu': 1, 'sys_cpu': 1}]}, fd)
+
+    rand = random.Random(seed)
+    with open(os.path.join(jobdir, 'randread-4k_iops.1.log'), 'w',
+              encoding='utf-8') as fd:
+        for second in range(60):
+            value = iops * (1 + rand.uniform(-noise, noise))
+            fd.write(f"{second * 1000}, {value:.0f}, 0, 4096, 0\n")
+
+    with open(os.path.join(jobdir, 'randread-4k_clat.1.log'), 'w',
+              encoding='utf-8') as fd:
+        for second in range(60):
+            value = clat_ns * (1 + rand.uniform(-noise, noise))
+            fd.write(f"{second * 1000}, {value:.0f}, 0, 4096, 0\n")
+
+
+class TestCompare(unittest.TestCase):
+    """ Tests for comparing fio runs. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def run_dir(self, name, *args, **kwargs):
+        path = os.path.join(self.tmp, name)
+        make_run(path, *args, **kwargs)
+        return path
+
+    def test_welch_pvalue(self):
+        self.assertIsNone(welch_pvalue([1, 2], [1, 2, 3, 4, 5]))
+        self.assertAlmostEqual(welch_pvalue([1, 2, 3, 4, 5],
+                                            [1, 2, 3, 4, 5]), 1.0)
+        self.assertLess(welch_pvalue([10, 11, 10, 11, 10],
+                                     [20, 21, 20, 21, 20]), 0.001)
+        self.assertEqual(welch_pvalue([5] * 5, [6] * 5), 0.0)
+
+    def test_batch_means(self):
+        self.assertEqual(batch_means(list(range(20))),
+                         [0.5, 2.5, 4.5, 6.5, 8.5, 10.5, 12.5, 14.5, 16.5,
+                          18.5])
+        self.assertEqual(batch_means([1, 2, 3, 4, 5, 6, 7]),
+                         [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(len(batch_means(list(range(65)))), 10)
+
+    def test_autocorrelated_intervals(self):
+        # each run shifts level half way through so neighbouring intervals
+        # are correlated. Taken as independent samples a 5% change looks
+        # significant but block means show it is within run to run noise.
+        rand = random.Random(0)
+        base = [level + rand.uniform(-5, 5)
+                for level in [900] * 30 + [1100] * 30]
+        other = [level + rand.uniform(-5, 5)
+                 for level in [950] * 30 + [1150] * 30]
+        self.assertLess(welch_pvalue(base, other), 0.05)
+        self.assertGreater(welch_pvalue(batch_means(base),
+                                        batch_means(other)), 0.05)
+
+    @staticmethod
+    def by_metric(comparisons):
+        return {c.metric: c for c in comparisons}
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_regression(self):
+        base = self.run_dir('base', 1000, 100000)
+        slow = self.run_dir('slow', 800, 150000, seed=1)
+        comparisons, unmatched = compare_runs([base, slow])
+        self.assertEqual(unmatched, [])
+        results = self.by_metric(comparisons)
+        self.assertEqual(results['iops'].delta_pct, -20)
+        self.assertLess(results['iops'].p_value, 0.001)
+        self.assertEqual(results['iops'].status, 'regression')
+        # per interval latency means say nothing about the tail so it is
+        # judged on its threshold alone.
+        self.assertIsNone(results['clat_p99_us'].p_value)
+        self.assertIsNone(results['clat_p99_9_us'].p_value)
+        self.assertEqual(results['clat_p99_us'].status, 'regression')
+        self.assertIn('regression', to_table(comparisons))
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_noise(self):
+        base = self.run_dir('base', 1000, 100000, noise=0.5)
+        other = self.run_dir('other', 930, 100000, noise=0.5, seed=2)
+        results = self.by_metric(compare_runs([base, other])[0])
+        self.assertGreater(results['iops'].p_value, 0.05)
+        self.assertEqual(results['iops'].status, 'noise')
+        self.assertEqual(results['clat_p99_us'].status, 'ok')
+
+    def test_thresholds(self):
+        base = RunData.load(self.run_dir('base', 1000, 100000))
+        fast = RunData.load(self.run_dir('fast', 1200, 100000, seed=1))
+        comparer = RunComparer(base, thresholds={'iops': 25})
+        self.assertEqual(self.by_metric(comparer.compare(fast)[0])[
+                         'iops'].status, 'ok')
+        comparer = RunComparer(base)
+        self.assertEqual(self.by_metric(comparer.compare(fast)[0])[
+                         'bw_mib_s'].status, 'improved')
+
+    def test_unmatched(self):
+        base = self.run_dir('base', 1000, 100000)
+        os.rename(os.path.join(base, 'randread-4k.results'),
+                  os.path.join(base, 'randread-8k.results'))
+        os.rename(os.path.join(base, 'randread-8k.results',
+                               'randread-4k.json'),
+                  os.path.join(base, 'randread-8k.results',
+                               'randread-8k.json'))
+        other = self.run_dir('other', 1000, 100000)
+        comparisons, unmatched = compare_runs([base, other])
+        self.assertEqual(comparisons, [])
+        self.assertEqual([u[1:] for u in unmatched],
+                         [('randread', '4k', 'read'),
+                          ('randread', '8k', 'read')])
+        with self.assertRaises(CompareError):
+            compare_runs([base])
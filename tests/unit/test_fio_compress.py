@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+import random
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zlib
+
+from fio_runner import logstats
+from fio_runner.archive import RunArchive
+from fio_runner.compress import create_tarball, ParallelGzipWriter
+
+
+def fio_compress(text, chunk_size):
+    """ Compress a log the way fio stores it i.e. one zlib stream per
+    chunk. """
+    data = text.encode('utf-8')
+    return b''.join(zlib.compress(data[i:i + chunk_size])
+                    for i in range(0, len(data), chunk_size))
+
+
+class TestCompress(unittest.TestCase):
+    """ Tests for compressed logs and parallel archiving. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        rand = random.Random(1)
+        self.log = ''.join(f"{n * 10}, {rand.randint(1000, 9000)}, "
+                           f"{n % 2}, 4096, 0\n" for n in range(5000))
+
+    def test_parallel_gzip(self):
+        data = self.log.encode('utf-8') * 3
+        for size in (0, 100, len(data)):
+            out = io.BytesIO()
+            with ParallelGzipWriter(out, threads=4, block_size=1000) as gz:
+                gz.write(data[:size])
+
+            self.assertEqual(gzip.decompress(out.getvalue()), data[:size])
+            self.assertEqual(gz.size, size)
+            self.assertEqual(gz.compressed_size, len(out.getvalue()))
+
+        with self.assertRaises(ValueError):
+            gz.write(b'x')
+
+        # close to the ratio of compressing it in one go
+        out = io.BytesIO()
+        with ParallelGzipWriter(out, threads=2, block_size=64 * 1024) as gz:
+            gz.write(data)
+
+        self.assertEqual(gzip.decompress(out.getvalue()), data)
+        self.assertLess(len(out.getvalue()), len(gzip.compress(data)) * 1.02)
+
+    def test_create_tarball(self):
+        run_dir = os.path.join(self.tmp, 'mytest-1')
+        jobdir = os.path.join(run_dir, 'randread-4k.results')
+        os.makedirs(jobdir)
+        with open(os.path.join(jobdir, 'randread-4k_clat.1.log'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(self.log)
+
+        stats = create_tarball(run_dir, f"{run_dir}.tgz", threads=2)
+        self.assertEqual(stats.path, f"{run_dir}.tgz")
+        self.assertEqual(stats.compressed_size, os.path.getsize(stats.path))
+        self.assertGreater(stats.ratio, 2)
+        self.assertIn('2 thread(s)', str(stats))
+        with tarfile.open(stats.path, 'r|gz') as tar:
+            self.assertEqual([m.name for m in tar],
+                             ['mytest-1', 'mytest-1/randread-4k.results',
+                              'mytest-1/randread-4k.results/'
+                              'randread-4k_clat.1.log'])
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_compressed_logs(self):
+        run_dir = os.path.join(self.tmp, 'mytest-1')
+        jobdirs = [os.path.join(run_dir, f"randread-{bs}.results")
+                   for bs in ('4k', '4m')]
+        for jobdir in jobdirs:
+            os.makedirs(jobdir)
+
+        with open(os.path.join(jobdirs[0], 'randread-4k_clat.1.log'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(self.log)
+
+        with open(os.path.join(jobdirs[1], 'randread-4m_clat.1.log.fz'),
+                  'wb') as fd:
+            fd.write(fio_compress(self.log, 3000))
+
+        self.assertEqual(list(logstats.find_logs(jobdirs[1])), ['clat'])
+        plain, compressed = [logstats.parse_log(
+                             logstats.find_logs(d)['clat'][0], 100, 512)
+                             for d in jobdirs]
+        for direction in (0, 1):
+            self.assertEqual(compressed[direction].count,
+                             plain[direction].count)
+            self.assertEqual(compressed[direction].percentile(99),
+                             plain[direction].percentile(99))
+
+        create_tarball(run_dir, f"{run_dir}.tgz")
+        archive = RunArchive(f"{run_dir}.tgz", ('clat',)).read()
+        self.assertEqual(
+            archive.logs[('randread-4m.results', 'clat')].merged[1].count,
+            plain[1].count)
+        with self.assertRaises(logstats.LogError):
+            logstats.parse_stream(logstats.InflateReader(
+                io.BytesIO(b'x' * 100)), 100)
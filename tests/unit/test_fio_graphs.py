@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fio_runner import graphs
+from fio_runner.graphs import (
+    create_graphs,
+    downsample,
+    find_logs,
+    GraphError,
+)
+
+
+def write_log(path, samples):
+    with open(path, 'w', encoding='utf-8') as fd:
+        for time_ms, value, direction in samples:
+            fd.write(f"{time_ms}, {value}, {direction}, 4096, 0\n")
+
+
+class TestGraphs(unittest.TestCase):
+    """ Tests for fio log graphs. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.jobdir = os.path.join(self.tmp, 'randrw-4k.results')
+        os.makedirs(self.jobdir)
+        # two fio jobs logging every 10ms for 3s
+        for index in (1, 2):
+            write_log(os.path.join(self.jobdir, f'randrw-4k_bw.{index}.log'),
+                      [(t, 1024 * index, t // 10 % 2)
+                       for t in range(0, 3000, 10)])
+            write_log(os.path.join(self.jobdir,
+                                   f'randrw-4k_clat.{index}.log'),
+                      [(t, 1000 * (t // 1000 + 1), 0)
+                       for t in range(0, 3000, 10)])
+
+        with open(os.path.join(self.jobdir, 'randrw-4k.fio'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write("[global]\n")
+
+    def test_find_logs(self):
+        logs = find_logs(self.jobdir)
+        self.assertEqual(sorted(logs), ['bw', 'clat'])
+        self.assertEqual(len(logs['bw']), 2)
+
+    @unittest.skipIf(graphs.numpy is None, "numpy not installed")
+    def test_downsample(self):
+        series = downsample(find_logs(self.jobdir)['bw'], 'bw', 1000)
+        self.assertEqual(sorted(series), ['read', 'write'])
+        read = series['read']
+        self.assertEqual(read.times.tolist(), [0.0, 1.0, 2.0])
+        # bandwidth of both jobs is summed (1 + 2 MiB/s)
+        self.assertEqual(read.means.tolist(), [3.0, 3.0, 3.0])
+        series = downsample(find_logs(self.jobdir)['clat'], 'clat', 1000)
+        self.assertEqual(series['read'].means.tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(len(downsample(find_logs(self.jobdir)['clat'],
+                                        'clat', 500)['read'].times), 6)
+
+    @unittest.skipIf(graphs.pyplot is None, "matplotlib not installed")
+    def test_create_graphs(self):
+        written = create_graphs(self.tmp, 2, formats=('png', 'svg'))
+        self.assertEqual(sorted(os.path.basename(p)
+                                for p in written[self.jobdir]),
+                         ['randrw-4k_bw.png', 'randrw-4k_bw.svg',
+                          'randrw-4k_clat.png', 'randrw-4k_clat.svg'])
+        for path in written[self.jobdir]:
+            self.assertGreater(os.path.getsize(path), 0)
+
+    def test_create_graphs_missing(self):
+        with self.assertRaises(GraphError):
+            create_graphs(os.path.join(self.tmp, 'missing'))
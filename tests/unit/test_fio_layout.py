@@ -0,0 +1,129 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from fio_runner import FioRunner, FioRunnerError, FioRunParams, TemplateSet
+from fio_runner.layout import (
+    format_timings,
+    prepare_stages,
+    run_timings,
+    stage_config,
+)
+from fio_runner.manifest import Manifest
+
+CONF_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'storage',
+                        'fio', 'conf')
+
+# Stand-in fio that records each config it runs in the results directory
+# and fails to lay out files when asked to.
+FIO_STANDIN = """#!{python}
+import json
+import os
+import sys
+
+if sys.argv[1:] == ['--version']:
+    sys.exit(print('fio-3.36'))
+
+with open(os.path.join(os.pardir, 'calls'), 'a') as fd:
+    fd.write(sys.argv[1] + '\\n')
+
+if {fail} and sys.argv[1] == 'layout.fio':
+    sys.exit('fio: layout failed')
+
+output = [a.partition('=')[2] for a in sys.argv if a.startswith('--output=')]
+with open(output[0], 'w') as fd:
+    json.dump({{'jobs': [{{'jobname': 'x', 'job_runtime': 4000}}]}}, fd)
+"""
+
+
+class TestLayout(unittest.TestCase):
+    """ Tests for laying out IO files once per run. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def runner(self, fail=False, **options):
+        fio = os.path.join(self.tmp, 'fio')
+        with open(fio, 'w', encoding='utf-8') as fd:
+            fd.write(FIO_STANDIN.format(python=sys.executable, fail=fail))
+
+        os.chmod(fio, 0o755)
+        return FioRunner(TemplateSet(CONF_DIR),
+                         FioRunParams('test', '1', base_dir=self.tmp, fio=fio,
+                                      prepare=True, **options))
+
+    def calls(self):
+        with open(os.path.join(self.tmp, 'test-1', 'calls'),
+                  encoding='utf-8') as fd:
+            return fd.read().split()
+
+    def test_stage_config(self):
+        self.assertEqual(stage_config('layout'),
+                         "[global]\n include common-global.fio\n[layout]\n"
+                         " readwrite=write\n create_only=1\n")
+        config = stage_config('precondition', 3)
+        self.assertIn(" loops=3\n", config)
+        self.assertIn(" time_based=0\n", config)
+        self.assertEqual(prepare_stages(0), ['layout'])
+        self.assertEqual(prepare_stages(2), ['layout', 'precondition'])
+
+    def test_prepare(self):
+        runner = self.runner()
+        self.assertEqual(runner.run(runner.matrix(['randread', 'randwrite'],
+                                                  ['4k'])), 0)
+        self.assertEqual(self.calls(), ['layout.fio', 'precondition.fio',
+                                        'randread-4k.fio',
+                                        'randwrite-4k.fio'])
+        with open(os.path.join(runner.results_dir, 'randread-4k.results',
+                               'common-global.fio'), encoding='utf-8') as fd:
+            self.assertIn('allow_file_create=0', fd.read())
+
+        manifest = Manifest.load(runner.results_dir)
+        prepare = manifest.run['prepare']
+        self.assertEqual(prepare['precondition_passes'], 1)
+        self.assertEqual(prepare['layout']['status'], 'passed')
+        self.assertEqual(prepare['precondition']['status'], 'passed')
+        timings = run_timings(manifest)
+        self.assertEqual(list(timings), ['layout', 'precondition',
+                                         'measured'])
+        self.assertEqual(timings['measured'], 8)
+        self.assertTrue(format_timings(timings).endswith('measured 8.0s'))
+
+    def test_layout_only(self):
+        runner = self.runner(precondition_passes=0)
+        runner.run(runner.matrix(['randread'], ['4k']))
+        self.assertEqual(self.calls(), ['layout.fio', 'randread-4k.fio'])
+
+    def test_layout_failed(self):
+        runner = self.runner(fail=True)
+        with self.assertRaises(FioRunnerError):
+            runner.run(runner.matrix(['randread'], ['4k']))
+
+        self.assertEqual(self.calls(), ['layout.fio'])
+        prepare = Manifest.load(runner.results_dir).run['prepare']
+        self.assertEqual(prepare['layout']['status'], 'failed')
+        self.assertNotIn('precondition', prepare)
+
+    def test_prepare_parallel(self):
+        runner = self.runner(parallel=2)
+        with self.assertRaises(FioRunnerError):
+            runner.run(runner.matrix(['randread'], ['4k']))
+
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, 'test-1',
+                                                     'calls')))
+
+    def test_resume(self):
+        runner = self.runner(precondition_passes=0)
+        jobs = runner.matrix(['randread'], ['4k'])
+        runner.run(jobs)
+        with open(os.path.join(runner.results_dir, 'iofiles', 'test-1.0'),
+                  'w', encoding='utf-8') as fd:
+            fd.write('data')
+
+        runner.manifest.update('randread-4k', status='running')
+        runner.run(jobs, resume=True)
+        self.assertEqual(self.calls(), ['layout.fio', 'randread-4k.fio',
+                                        'randread-4k.fio'])
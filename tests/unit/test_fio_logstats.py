@@ -0,0 +1,79 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from fio_runner import logstats
+from fio_runner.logstats import (
+    LogError,
+    parse_log,
+    parse_log_lines,
+    parse_logs,
+)
+
+
+@unittest.skipIf(logstats.numpy is None, "numpy not installed")
+class TestLogStats(unittest.TestCase):
+    """ Tests for the streaming fio log parser. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        rand = random.Random(0)
+        self.log = os.path.join(self.tmp, 'job_clat.1.log')
+        with open(self.log, 'w', encoding='utf-8') as fd:
+            for t in range(0, 5000, 10):
+                fd.write(f"{t}, {rand.randint(1000, 90000)}, {t // 10 % 2}, "
+                         f"4096, {t * 4096}, 0\n")
+
+            # last line without a newline
+            fd.write("5000, 5, 0, 4096, 0, 0")
+
+    def test_matches_line_parser(self):
+        expected = parse_log_lines(self.log, 1000)
+        # a small chunk size splits lines across reads
+        stats = parse_log(self.log, 1000, chunk_size=100)
+        self.assertEqual(sorted(stats), sorted(expected))
+        for direction, intervals in expected.items():
+            times, means, lows, highs = stats[direction].intervals()
+            self.assertEqual(times.tolist(),
+                             [i * 1.0 for i in sorted(intervals)])
+            for n, interval in enumerate(sorted(intervals)):
+                values = intervals[interval]
+                self.assertAlmostEqual(means[n], sum(values) / len(values))
+                self.assertEqual(lows[n], min(values))
+                self.assertEqual(highs[n], max(values))
+
+            self.assertEqual(stats[direction].count,
+                             sum(len(v) for v in intervals.values()))
+
+    def test_percentiles(self):
+        values = sorted(value for intervals in
+                        parse_log_lines(self.log, 1000).values()
+                        for samples in intervals.values()
+                        for value in samples)
+        stats = parse_logs([self.log], 1000)
+        merged = stats[0]
+        merged.merge(stats[1])
+        for pct in (50, 90, 99, 99.9):
+            exact = values[max(int(len(values) * pct / 100 + 0.5) - 1, 0)]
+            self.assertAlmostEqual(merged.percentile(pct), exact,
+                                   delta=exact * 0.01)
+
+        self.assertEqual(merged.percentile(100), max(values))
+        self.assertEqual(merged.min, 5)
+
+    def test_merge(self):
+        stats = parse_logs([self.log, self.log], 500)
+        single = parse_log(self.log, 500)
+        self.assertEqual(stats[1].count, 2 * single[1].count)
+        self.assertEqual(stats[1].mean, single[1].mean)
+        self.assertEqual(len(stats[1].intervals()[0]), 10)
+
+    def test_invalid(self):
+        with open(self.log, 'a', encoding='utf-8') as fd:
+            fd.write("\nnot, a, log\n")
+
+        with self.assertRaisesRegex(LogError, 'job_clat.1.log'):
+            parse_log(self.log, 1000)
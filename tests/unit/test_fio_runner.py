@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from fio_runner import (
+    FioJob,
+    FioRunner,
+    FioRunnerError,
+    FioRunParams,
+    TemplateError,
+    TemplateSet,
+)
+from fio_runner.manifest import Manifest
+from fio_runner.runner import parse_config, resume_run
+from fio_runner.templates import Template
+
+CONF_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'storage',
+                        'fio', 'conf')
+
+# Stand-in for fio that writes json output for the config it is given and
+# fails for configs with a randwrite class.
+FIO_STANDIN = """#!{python}
+import json
+import sys
+
+if sys.argv[1] == '--version':
+    print('fio-3.36')
+    sys.exit(0)
+
+if sys.argv[1].startswith('randwrite'):
+    sys.exit('fio: failed')
+
+output = [a.partition('=')[2] for a in sys.argv if a.startswith('--output=')]
+with open(output[0], 'w') as fd:
+    json.dump({{'jobs': [{{'jobname': sys.argv[1]}}]}}, fd)
+"""
+
+CUSTOM_OPTS = {'blocksize': '8k', 'iodepth': 4, 'size': '1G',
+               'fdatasync': 0, 'ioengine': 'libaio', 'direct': 1}
+
+
+class TestFioRunner(unittest.TestCase):
+    """ Tests for the fio orchestrator. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.templates = TemplateSet(CONF_DIR)
+        self.fio = os.path.join(self.tmp, 'fio')
+        with open(self.fio, 'w', encoding='utf-8') as fd:
+            fd.write(FIO_STANDIN.format(python=sys.executable))
+
+        os.chmod(self.fio, 0o755)
+
+    def runner(self, **options):
+        return FioRunner(self.templates,
+                         FioRunParams('test', '1', base_dir=self.tmp,
+                                      fio=self.fio, **options))
+
+    def test_templates(self):
+        self.assertEqual(self.templates.classes,
+                         ['randread', 'randrw', 'randwrite'])
+        self.assertEqual(self.templates.jobs, ['4k', '4m', 'etcd'])
+        self.assertEqual(self.templates.get('custom').placeholders,
+                         {'BLOCKSIZE', 'IODEPTH', 'SIZE', 'FDATASYNC',
+                          'IOENGINE', 'DIRECT'})
+
+    def test_template_render(self):
+        path = os.path.join(self.tmp, 't.fio.template')
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write("name=__TESTNAME__\nbs=__BLOCKSIZE__\n")
+
+        template = Template(path)
+        self.assertEqual(template.render({'TESTNAME': 'a', 'BLOCKSIZE': 4}),
+                         "name=a\nbs=4\n")
+        with self.assertRaisesRegex(TemplateError, 'no value for BLOCKSIZE'):
+            template.render({'TESTNAME': 'a'})
+
+    def test_matrix(self):
+        runner = self.runner()
+        self.assertEqual(len(runner.matrix()), 9)
+        self.assertEqual(runner.matrix(['randread'], ['4k', 'etcd']),
+                         [FioJob('randread', '4k'),
+                          FioJob('randread', 'etcd')])
+        with self.assertRaises(FioRunnerError):
+            runner.matrix(['seqread'])
+
+    def test_matrix_custom(self):
+        runner = self.runner(custom_opts=CUSTOM_OPTS)
+        self.assertEqual(runner.matrix(['randread']),
+                         [FioJob('randread', 'custom')])
+        runner = self.runner(custom_opts={'blocksize': '8k'})
+        with self.assertRaisesRegex(FioRunnerError, 'please provide'):
+            runner.matrix(['randread'])
+
+    def test_render(self):
+        runner = self.runner(ramp_times={'4K': 60})
+        config, common = runner.render(FioJob('randwrite', '4k'))
+        self.assertIn(" name=test\n", config)
+        self.assertIn("[4k]\n", config)
+        self.assertIn('filename_format="test-1.$filenum"', common)
+        self.assertIn("ramp_time=60\n", common)
+        _, common = runner.render(FioJob('randwrite', 'etcd'))
+        self.assertIn("ramp_time=5\n", common)
+        self.assertNotIn("directory=../iofiles/", common)
+
+    def test_render_parallel(self):
+        runner = self.runner(parallel=2)
+        _, common = runner.render(FioJob('randwrite', '4k'))
+        # the last directory option wins so each job gets its own files
+        self.assertTrue(common.endswith("directory=../iofiles/"
+                                        "randwrite-4k\n"))
+
+    def test_parse_config(self):
+        self.assertEqual(parse_config("[global]\n name=x\n include a.fio\n"
+                                      "nrfiles=240  # comment\n"),
+                         {'name': 'x', 'nrfiles': '240'})
+
+    def test_run(self):
+        runner = self.runner(parallel=2)
+        failed = runner.run(runner.matrix(['randread', 'randwrite'], ['4k']))
+        self.assertEqual(failed, 1)
+        manifest = Manifest.load(runner.results_dir)
+        self.assertEqual(manifest.run['fio_version'], 'fio-3.36')
+        job = manifest.jobs['randread-4k']
+        self.assertEqual(job['status'], 'passed')
+        self.assertEqual(job['options']['blocksize'], '4k')
+        self.assertEqual(job['options']['readwrite'], 'randread')
+        self.assertIn('--output-format=json+', job['command'])
+        with open(os.path.join(runner.results_dir, job['dir'],
+                               job['output']), encoding='utf-8') as fd:
+            self.assertEqual(json.load(fd)['jobs'][0]['jobname'],
+                             'randread-4k.fio')
+
+        self.assertEqual(manifest.jobs['randwrite-4k']['status'], 'failed')
+        self.assertEqual(os.listdir(os.path.join(runner.results_dir,
+                                                 'iofiles')), [])
+
+    def test_run_keep_iofiles(self):
+        runner = self.runner(parallel=2, keep_iofiles=True)
+        runner.run(runner.matrix(['randread', 'randwrite'], ['4k']))
+        self.assertEqual(sorted(os.listdir(os.path.join(runner.results_dir,
+                                                        'iofiles'))),
+                         ['randread-4k', 'randwrite-4k'])
+
+    def test_dry_run(self):
+        runner = self.runner(dry_run=True)
+        self.assertEqual(runner.run(runner.matrix(['randrw'], ['4m'])), 0)
+        manifest = Manifest.load(runner.results_dir)
+        self.assertEqual(manifest.jobs['randrw-4m']['status'], 'dry-run')
+        self.assertFalse(os.path.exists(os.path.join(
+                            runner.results_dir, 'randrw-4m.results',
+                            'randrw-4m.json')))
+        runner.cleanup()
+        self.assertFalse(os.path.exists(os.path.join(runner.results_dir,
+                                                     'iofiles')))
+        self.assertTrue(os.path.exists(runner.tarball()))
+
+    def test_resume(self):
+        runner = self.runner(parallel=2)
+        jobs = runner.matrix(['randread', 'randrw', 'randwrite'], ['4k'])
+        self.assertEqual(runner.run(jobs[:2]), 0)
+        # simulate a run interrupted while randrw-4k was running (its output
+        # is cut short) and before randwrite-4k started
+        with open(os.path.join(runner.results_dir, 'randrw-4k.results',
+                               'randrw-4k.json'), 'a',
+                  encoding='utf-8') as fd:
+            fd.write('\n')
+
+        manifest = Manifest.load(runner.results_dir)
+        manifest.jobs['randwrite-4k'] = {'label': 'randwrite-4k',
+                                         'fio_class': 'randwrite',
+                                         'job': '4k', 'status': 'pending'}
+        manifest.save()
+        started = {label: job.get('start')
+                   for label, job in manifest.jobs.items()}
+        self.assertEqual(len(manifest.jobs['randread-4k']['result_sha256']),
+                         64)
+
+        params, resumed_jobs = resume_run(runner.results_dir)
+        self.assertEqual(resumed_jobs, jobs)
+        self.assertEqual((params.name, params.label, params.parallel),
+                         ('test', '1', 2))
+        resumed = FioRunner(self.templates, params)
+        self.assertEqual(resumed.results_dir, runner.results_dir)
+        # randwrite always fails
+        self.assertEqual(resumed.run(resumed_jobs, resume=True), 1)
+        manifest = Manifest.load(runner.results_dir)
+        self.assertEqual(len(manifest.run['resumed']), 1)
+        self.assertEqual(manifest.jobs['randread-4k']['start'],
+                         started['randread-4k'])
+        self.assertNotEqual(manifest.jobs['randrw-4k']['start'],
+                            started['randrw-4k'])
+        self.assertEqual(manifest.jobs['randrw-4k']['status'], 'passed')
+        self.assertEqual(manifest.jobs['randwrite-4k']['status'], 'failed')
+
+        with self.assertRaisesRegex(FioRunnerError, 'unable to resume'):
+            resume_run(self.tmp)
+
+        renamed = os.path.join(self.tmp, 'other')
+        os.rename(runner.results_dir, renamed)
+        with self.assertRaisesRegex(FioRunnerError, 'called test-1'):
+            resume_run(renamed)
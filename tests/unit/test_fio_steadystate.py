@@ -0,0 +1,93 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from fio_runner import FioRunner, FioRunParams, TemplateSet
+from fio_runner.manifest import Manifest
+from fio_runner.steadystate import (
+    measurement_windows,
+    steady_state_options,
+    SteadyStateError,
+)
+
+CONF_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'storage',
+                        'fio', 'conf')
+
+# Stand-in fio reporting a job that ended early at steady state when the
+# common config enables it.
+FIO_STANDIN = """#!{python}
+import sys, json
+
+if '--version' in sys.argv:
+    print('fio-3.36')
+    sys.exit(0)
+
+with open('common-global.fio') as fd:
+    steady = 'steadystate=' in fd.read()
+
+job = {{'jobname': 'x', 'elapsed': 95 if steady else 335,
+        'job_runtime': 65000 if steady else 300000}}
+if steady:
+    job['steadystate'] = {{'ss': 'iops_slope:0.300000%', 'duration': 60,
+                          'attained': 1, 'steadystate_ramptime': 0}}
+
+output = [a.partition('=')[2] for a in sys.argv if a.startswith('--output=')]
+with open(output[0], 'w') as fd:
+    json.dump({{'jobs': [job]}}, fd)
+"""
+
+
+class TestSteadyState(unittest.TestCase):
+    """ Tests for ending fio jobs once they reach steady state. """
+
+    def test_options(self):
+        self.assertEqual(steady_state_options('bw:2%', 30, 10),
+                         "steadystate=bw:2%\nsteadystate_duration=30\n"
+                         "steadystate_ramp_time=10\n")
+        for criterion in ('iops', 'lat:1%', 'iops:x%'):
+            with self.assertRaises(SteadyStateError):
+                steady_state_options(criterion)
+
+    def test_measurement_windows(self):
+        data = {'jobs': [
+            {'elapsed': 80, 'job_runtime': 40000,
+             'steadystate': {'ss': 'iops:1%', 'duration': 30, 'attained': 1,
+                             'steadystate_ramptime': 5}},
+            {'elapsed': 90, 'job_runtime': 50000,
+             'steadystate': {'ss': 'iops:1%', 'duration': 30,
+                             'attained': 0}}]}
+        self.assertEqual(measurement_windows(data, 30),
+                         {'ramp_s': 35, 'measured_s': 50, 'elapsed_s': 90,
+                          'steady_state': {'criterion': 'iops:1%',
+                                           'window_s': 30,
+                                           'attained': False}})
+        self.assertEqual(measurement_windows({'jobs': [{}]}, 5),
+                         {'ramp_s': 5, 'measured_s': 0, 'elapsed_s': 0})
+
+    def test_run(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        fio = os.path.join(tmp, 'fio')
+        with open(fio, 'w', encoding='utf-8') as fd:
+            fd.write(FIO_STANDIN.format(python=sys.executable))
+
+        os.chmod(fio, 0o755)
+        for label, steady_state in (('1', None), ('2', 'iops_slope:0.3%')):
+            runner = FioRunner(TemplateSet(CONF_DIR),
+                               FioRunParams('test', label, base_dir=tmp,
+                                            fio=fio,
+                                            steady_state=steady_state))
+            self.assertEqual(runner.run(runner.matrix(['randread'],
+                                                      ['4k'])), 0)
+
+        windows = [Manifest.load(os.path.join(tmp, f"test-{label}")).jobs[
+                   'randread-4k']['windows'] for label in ('1', '2')]
+        self.assertEqual(windows[0], {'ramp_s': 30, 'measured_s': 300,
+                                      'elapsed_s': 335})
+        self.assertEqual(windows[1]['measured_s'], 65)
+        self.assertTrue(windows[1]['steady_state']['attained'])
+        with self.assertRaises(SteadyStateError):
+            FioRunner(TemplateSet(CONF_DIR),
+                      FioRunParams(steady_state='lat_slope:1%'))
@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from dataclasses import fields
+
+from fio_runner import logstats
+from fio_runner.summary import (
+    JobSummary,
+    percentile_from_bins,
+    save_summary,
+    summarize_result,
+    summarize_run,
+    SummaryError,
+    to_csv,
+    to_table,
+)
+
+
+def fio_job(direction, ios, bins=None, percentile=None):
+    stats = {'total_ios': ios, 'iops': ios / 10, 'bw_bytes': ios * 4096 / 10,
+             'lat_ns': {'mean': 2000.0},
+             'clat_ns': {'percentile': percentile or {}}}
+    if bins is not None:
+        stats['clat_ns']['bins'] = bins
+
+    job = {'jobname': 'x', 'usr_cpu': 1.5, 'sys_cpu': 3.0,
+           'read': {'total_ios': 0}, 'write': {'total_ios': 0},
+           'trim': {'total_ios': 0}}
+    job[direction] = stats
+    return job
+
+
+class TestSummary(unittest.TestCase):
+    """ Tests for summarising fio json results. """
+
+    def test_percentile_from_bins(self):
+        bins = {'1000': 50, '2000': 49, '9000': 1}
+        self.assertEqual(percentile_from_bins(bins, 50), 1000)
+        self.assertEqual(percentile_from_bins(bins, 99), 2000)
+        self.assertEqual(percentile_from_bins(bins, 99.99), 9000)
+        self.assertEqual(percentile_from_bins({}, 50), 0)
+
+    def test_summarize_merges_bins(self):
+        data = {'jobs': [fio_job('write', 100, {'1000': 99, '5000': 1}),
+                         fio_job('write', 100, {'1000': 90, '3000': 10})]}
+        summary = summarize_result('randwrite', '4k', data)[0]
+        self.assertEqual(summary.direction, 'write')
+        self.assertEqual(summary.iops, 20)
+        self.assertAlmostEqual(summary.bw_mib_s, 2 * 40960 / 1024 ** 2)
+        self.assertEqual(summary.lat_mean_us, 2.0)
+        self.assertEqual(summary.clat_p50_us, 1.0)
+        self.assertEqual(summary.clat_p99_us, 3.0)
+        self.assertEqual(summary.clat_p99_99_us, 5.0)
+        self.assertEqual(summary.sys_cpu, 6.0)
+
+    def test_summarize_percentiles(self):
+        data = {'jobs': [fio_job('read', 10, percentile={
+                            '50.000000': 1000, '99.000000': 4000,
+                            '99.900000': 8000, '99.990000': 9000})]}
+        summary = summarize_result('randread', '4k', data)[0]
+        self.assertEqual(summary.clat_p99_9_us, 8.0)
+
+    def test_summarize_run(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        for label, direction in (('randread-4k', 'read'),
+                                 ('randwrite-etcd', 'write')):
+            os.makedirs(os.path.join(tmp, f"{label}.results"))
+            with open(os.path.join(tmp, f"{label}.results", f"{label}.json"),
+                      'w', encoding='utf-8') as fd:
+                fd.write("fio: warning\n")
+                json.dump({'jobs': [fio_job(direction, 10, {'1000': 10})]},
+                          fd)
+
+        summaries = summarize_run(tmp)
+        self.assertEqual([(s.fio_class, s.job, s.direction)
+                          for s in summaries],
+                         [('randread', '4k', 'read'),
+                          ('randwrite', 'etcd', 'write')])
+        table = to_table(summaries).splitlines()
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table[0].split()[:4], ['class', 'job', 'dir', 'IOPS'])
+        self.assertEqual(table[2].split()[:3], ['randread', '4k', 'read'])
+        self.assertEqual(to_csv(summaries).splitlines()[0],
+                         ','.join(f.name for f in fields(JobSummary)))
+        save_summary(summaries, tmp)
+        with open(os.path.join(tmp, 'summary.json'), encoding='utf-8') as fd:
+            self.assertEqual(json.load(fd)[1]['job'], 'etcd')
+
+        with self.assertRaises(SummaryError):
+            summarize_run(os.path.join(tmp, 'missing'))
+
+    @unittest.skipIf(logstats.numpy is None, "numpy not installed")
+    def test_summarize_run_log_percentiles(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        jobdir = os.path.join(tmp, 'randread-4k.results')
+        os.makedirs(jobdir)
+        with open(os.path.join(jobdir, 'randread-4k.json'), 'w',
+                  encoding='utf-8') as fd:
+            json.dump({'jobs': [fio_job('read', 100)]}, fd)
+
+        with open(os.path.join(jobdir, 'randread-4k_clat.1.log'), 'w',
+                  encoding='utf-8') as fd:
+            for n in range(100):
+                fd.write(f"{n * 10}, {100000 if n == 99 else 2000}, 0, "
+                         "4096, 0\n")
+
+        summary = summarize_run(tmp)[0]
+        self.assertAlmostEqual(summary.clat_p50_us, 2.0, delta=0.02)
+        self.assertAlmostEqual(summary.clat_p99_99_us, 100.0, delta=1)
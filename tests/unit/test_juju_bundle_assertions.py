@@ -0,0 +1,446 @@
+import unittest
+
+from unittest import mock
+
+from ua_bundle_checker import check_bundle
+from ua_bundle_checker.assertion.commands import AssertionBase
+from ua_bundle_checker.assertion.consistency import (
+    ConsistencyAssertionBase,
+)
+from ua_bundle_checker.assertion.constraints import (
+    ConstraintAssertionBase,
+    ConstraintError,
+    parse_constraints,
+)
+from ua_bundle_checker.assertion.expr import (
+    compile_expr,
+    ExprError,
+    quote_sizes,
+)
+from ua_bundle_checker.assertion.index import BundleIndex
+from ua_bundle_checker.assertion.relations import RelationAssertionBase
+
+
+def run_check(bundle, charm, assertions):
+    """ Run a single checks section and return its non-channel results. """
+    report = check_bundle(bundle, {'section': {'charm': charm,
+                                               'assertions': assertions}})
+    results = []
+    for app_results in report.results.values():
+        for category in app_results.values():
+            results += [r.unformatted() for r in category
+                        if not r.opt.startswith('charmhub channel')]
+
+    return sorted(results)
+
+
+class TestAssertionBases(unittest.TestCase):
+    """ Tests for the assertion base classes. """
+
+    def test_bases_are_abstract(self):
+        for base in (ConstraintAssertionBase, RelationAssertionBase,
+                     ConsistencyAssertionBase):
+            with self.subTest(base=base.__name__):
+                with self.assertRaises(TypeError):
+                    base({})  # pylint: disable=abstract-class-instantiated
+
+    def test_incomplete_subclass(self):
+        class Incomplete(ConstraintAssertionBase):
+            """ Does not implement compare(). """
+
+        with self.assertRaises(TypeError):
+            Incomplete({})  # pylint: disable=abstract-class-instantiated
+
+
+class TestConstraints(unittest.TestCase):
+    """ Tests for constraint parsing and assertions. """
+
+    BUNDLE = {'applications': {
+                'nova-compute': {'charm': 'ch:nova-compute',
+                                 'channel': 'yoga/stable',
+                                 'constraints': 'mem=16G cores=8 '
+                                                'spaces=a,b arch=amd64'},
+                'ceph-osd': {'charm': 'ch:ceph-osd',
+                             'channel': 'quincy/stable',
+                             'to': ['0', '1', 'lxd:2']},
+                'mysql': {'charm': 'ch:mysql-innodb-cluster',
+                          'channel': '8.0/stable',
+                          'constraints': 'mem=16G cores=8 spaces=a,b '
+                                         'arch=amd64'}},
+              'machines': {'0': {'constraints': 'mem=32768 root-disk=1T'},
+                           '1': {'constraints': 'mem=8G'},
+                           '2': {}}}
+
+    def test_atoi(self):
+        self.assertEqual(AssertionBase.atoi("1T"), 1024 ** 4)
+        self.assertEqual(AssertionBase.atoi("4096"), "4096")
+        self.assertEqual(AssertionBase.atoi(""), "")
+
+    def test_parse_constraints(self):
+        parsed = parse_constraints("mem=4096 root-disk=100G cores=8 "
+                                   "spaces=a,b arch=amd64 "
+                                   "allocate-public-ip=true")
+        self.assertEqual(dict(parsed),
+                         {'mem': 4096 * 1024 ** 2,
+                          'root-disk': 100 * 1024 ** 3,
+                          'cores': 8,
+                          'spaces': frozenset(['a', 'b']),
+                          'arch': 'amd64',
+                          'allocate-public-ip': True})
+        with self.assertRaises(TypeError):
+            parsed['mem'] = 1
+
+    def test_parse_constraints_sizes(self):
+        for constraint, size in (("mem=16G", 16 * 1024 ** 3),
+                                 ("mem=16g", 16 * 1024 ** 3),
+                                 ("mem=512m", 512 * 1024 ** 2),
+                                 ("mem=512", 512 * 1024 ** 2),
+                                 ("root-disk=1.5t", int(1.5 * 1024 ** 4)),
+                                 ("root-disk=2P", 2 * 1024 ** 5)):
+            with self.subTest(constraint=constraint):
+                self.assertEqual(parse_constraints(constraint)[
+                                 constraint.partition('=')[0]], size)
+
+    def test_constraint_gte_lowercase(self):
+        bundle = {'applications': {'nova-compute': {
+                    'charm': 'ch:nova-compute', 'channel': 'yoga/stable',
+                    'constraints': 'mem=16g'}}}
+        results = run_check(bundle, 'nova-compute', {
+                    'mem': {'constraint_gte': {'scope': 'application',
+                                               'value': '16G'}}})
+        self.assertEqual(results, ["[PASS] constraints mem "
+                                   "(value=17179869184)"])
+
+    def test_parse_constraints_invalid(self):
+        for constraint in ["mem", "mem=lots", "mem=16k", "mem=-1G",
+                           "cores=x"]:
+            with self.assertRaises(ConstraintError):
+                parse_constraints(constraint)
+
+    def test_constraints_parsed_once(self):
+        index = BundleIndex(self.BUNDLE)
+        with mock.patch('ua_bundle_checker.assertion.index.'
+                        'parse_constraints',
+                        wraps=parse_constraints) as mock_parse:
+            first = index.app_constraints('nova-compute')
+            self.assertIs(index.app_constraints('mysql'), first)
+            self.assertIs(index.app_constraints('nova-compute'), first)
+
+        self.assertEqual(mock_parse.call_count, 1)
+
+    def test_constraint_gte(self):
+        results = run_check(self.BUNDLE, 'nova-compute', {
+                    'mem': {'constraint_gte': {'scope': 'application',
+                                               'value': '8G'}},
+                    'cores': {'constraint_gte': {'scope': 'application',
+                                                 'value': 16}},
+                    'spaces': {'constraint_gte': {'scope': 'application',
+                                                  'value': 'a'}},
+                    'root-disk': {'constraint_gte': {'scope': 'application',
+                                                     'value': '10G'}}})
+        self.assertEqual(results, [
+            "[FAIL] constraints cores (application value=8, "
+            "expected='16')",
+            "[FAIL] constraints root-disk (constraint not set)",
+            "[PASS] constraints mem (value=17179869184)",
+            "[PASS] constraints spaces (value=a,b)"])
+
+    def test_constraint_eq(self):
+        results = run_check(self.BUNDLE, 'nova-compute', {
+                    'arch': {'constraint_eq': {'scope': 'application',
+                                               'value': 'amd64'}},
+                    'spaces': {'constraint_eq': {'scope': 'application',
+                                                 'value': 'b,a'}}})
+        self.assertEqual(results, ["[PASS] constraints arch (value=amd64)",
+                                   "[PASS] constraints spaces (value=a,b)"])
+
+    def test_constraint_machines(self):
+        results = run_check(self.BUNDLE, 'ceph-osd', {
+                    'mem': {'constraint_gte': {'scope': 'application',
+                                               'value': '16G'}},
+                    'root-disk': {'constraint_gte': {'scope': 'application',
+                                                     'warn-on-fail': True,
+                                                     'value': '100G'}}})
+        self.assertEqual(results, [
+            "[FAIL] constraints mem (machine 1 value=8589934592, "
+            "expected='17179869184')",
+            "[WARN] constraints root-disk (constraint not set (machine 1))"])
+
+
+class TestRelations(unittest.TestCase):
+    """ Tests for relation assertions and the relation index. """
+
+    BUNDLE = {'applications': {
+                'nova-compute': {'charm': 'ch:nova-compute',
+                                 'channel': 'yoga/stable'},
+                'nova-compute-2': {'charm': 'ch:nova-compute',
+                                   'channel': 'yoga/stable'},
+                'ceph-mon': {'charm': 'ch:ceph-mon',
+                             'channel': 'quincy/stable'},
+                'vault': {'charm': 'ch:vault', 'channel': '1.8/stable'},
+                'keystone': {'charm': 'ch:keystone',
+                             'channel': 'yoga/stable'},
+                'glance': {'charm': 'ch:glance', 'channel': 'yoga/stable'}},
+              'relations': [['nova-compute:ceph', 'ceph-mon:client'],
+                            ['vault:certificates', 'keystone:certificates'],
+                            ['vault', 'glance'],
+                            ['nova-compute-2:juju-info', 'ceph-mon:client']]}
+
+    def test_index(self):
+        index = BundleIndex(self.BUNDLE)
+        self.assertEqual(index.related_apps('ceph-mon'),
+                         {'nova-compute', 'nova-compute-2'})
+        self.assertEqual(index.related_apps('vault', 'certificates'),
+                         {'keystone'})
+        self.assertEqual(index.related_apps('vault', None),
+                         {'keystone', 'glance'})
+        self.assertEqual(index.related_to_charms('ceph-mon',
+                                                 ('nova-compute',)),
+                         {'nova-compute', 'nova-compute-2'})
+        self.assertEqual(index.apps_using_charms(('keystone', 'glance')),
+                         {'keystone', 'glance'})
+
+    def test_legacy_relations(self):
+        index = BundleIndex({'services': {},
+                             'relations': [['a', ['b', 'c']]]})
+        self.assertEqual(index.related_apps('a'), {'b', 'c'})
+        self.assertEqual(index.related_apps('b'), {'a'})
+
+    def test_related_to_is_degree_bound(self):
+        index = BundleIndex(self.BUNDLE)
+        with mock.patch.object(index, 'app_uses_charm',
+                               wraps=index.app_uses_charm) as mock_match:
+            index.related_to_charms('keystone', ('vault',))
+
+        self.assertEqual(mock_match.call_count, 1)
+
+    def test_related_to(self):
+        results = run_check(self.BUNDLE, 'nova-compute', {
+                    'ceph': {'related_to': {'scope': 'application',
+                                            'value': 'ceph-mon',
+                                            'endpoint': 'ceph'}}})
+        self.assertEqual(results, [
+            "[FAIL] relation ceph (not related to any application using "
+            "ceph-mon on endpoint 'ceph')",
+            "[PASS] relation ceph (related to ceph-mon)"])
+
+    def test_related_to_all(self):
+        results = run_check(self.BUNDLE, 'vault', {
+                    'tls': {'related_to_all': {
+                                'scope': 'application',
+                                'value': ['keystone', 'glance']}},
+                    'tls-endpoint': {'related_to_all': {
+                                'scope': 'application',
+                                'endpoint': 'certificates',
+                                'value': ['keystone', 'glance']}}})
+        self.assertEqual(results, [
+            "[FAIL] relation tls-endpoint (not related to glance on "
+            "endpoint 'certificates')",
+            "[PASS] relation tls (related to all 2 applications)"])
+
+
+class TestPlacement(unittest.TestCase):
+    """ Tests for placement aware HA assertions and the placement index. """
+
+    BUNDLE = {'applications': {
+                'stacked': {'charm': 'ch:stacked', 'channel': 'latest/edge',
+                            'num_units': 3, 'to': ['0', 'lxd:0', 'kvm:0']},
+                'spread': {'charm': 'ch:spread', 'channel': 'x/stable',
+                           'num_units': 3, 'to': ['lxd:0', 'lxd:1', '2']},
+                'hacluster': {'charm': 'ch:hacluster', 'channel': 'x/stable',
+                              'num_units': 3,
+                              'to': ['spread/0', 'lxd:spread/1', 'spread']},
+                'newmachines': {'charm': 'ch:newmachines',
+                                'channel': 'x/stable', 'num_units': 3},
+                'zoned': {'charm': 'ch:zoned', 'channel': 'x/stable',
+                          'num_units': 3, 'to': ['0', '1', '2']}},
+              'machines': {'0': {'constraints': 'zones=az1'},
+                           '1': {'constraints': 'zones=az1'},
+                           '2': {'constraints': 'zones=az2'}}}
+
+    def test_index(self):
+        index = BundleIndex(self.BUNDLE)
+        self.assertEqual(index.unit_hosts('stacked'), ['0', '0', '0'])
+        self.assertEqual(index.unit_hosts('hacluster'),
+                         ['0', '1', ('unknown', 'spread')])
+        self.assertEqual(index.unit_hosts('newmachines'),
+                         [('new', 'newmachines', 0),
+                          ('new', 'newmachines', 1),
+                          ('new', 'newmachines', 2)])
+        self.assertEqual(index.unit_zones('zoned'), ['az1', 'az1', 'az2'])
+
+    def test_index_built_once(self):
+        index = BundleIndex(self.BUNDLE)
+        resolve = getattr(index, '_resolve_directive')
+        with mock.patch.object(index, '_resolve_directive',
+                               wraps=resolve) as mock_res:
+            for app in self.BUNDLE['applications']:
+                index.unit_hosts(app)
+                index.unit_hosts(app)
+
+        # one call per directive in the bundle
+        self.assertEqual(mock_res.call_count, 12)
+
+    def test_circular_placement(self):
+        index = BundleIndex({'applications': {
+                                'a': {'num_units': 1, 'to': ['b/0']},
+                                'b': {'num_units': 1, 'to': ['a/0']}}})
+        self.assertEqual(len(index.unit_hosts('a')), 1)
+
+    def test_assert_ha_placement(self):
+        assertions = {'ha': {'assert_ha_placement': {
+                                'scope': 'application'}}}
+        self.assertEqual(run_check(self.BUNDLE, 'stacked', assertions), [
+            "[FAIL] HA placement (>=3 machines) (units spread over 1 "
+            "distinct machines (expected='>=3'); machine 0 has units "
+            "0,1,2)"])
+        self.assertEqual(run_check(self.BUNDLE, 'spread', assertions), [
+            "[PASS] HA placement (>=3 machines) (units spread over 3 "
+            "machines)"])
+        self.assertEqual(run_check(self.BUNDLE, 'hacluster', assertions), [
+            "[FAIL] HA placement (>=3 machines) (units spread over 2 "
+            "distinct machines (expected='>=3'))"])
+        self.assertEqual(run_check(self.BUNDLE, 'newmachines', assertions),
+                         ["[PASS] HA placement (>=3 machines) (units spread "
+                          "over 3 machines)"])
+
+    def test_assert_ha_placement_stacked_on_new_machine(self):
+        bundle = {'applications': {
+                    'mysql': {'charm': 'ch:mysql', 'channel': 'x/stable',
+                              'num_units': 3},
+                    'keystone': {'charm': 'ch:keystone',
+                                 'channel': 'x/stable', 'num_units': 3,
+                                 'to': ['lxd:mysql/0', 'lxd:mysql/0',
+                                        'lxd:mysql/0']}}}
+        assertions = {'ha': {'assert_ha_placement': {
+                                'scope': 'application'}}}
+        self.assertEqual(run_check(bundle, 'keystone', assertions), [
+            "[FAIL] HA placement (>=3 machines) (units spread over 1 "
+            "distinct machines (expected='>=3'); new machine mysql/0 has "
+            "units 0,1,2)"])
+        self.assertEqual(run_check(bundle, 'mysql', assertions), [
+            "[PASS] HA placement (>=3 machines) (units spread over 3 "
+            "machines)"])
+
+    def test_assert_ha_placement_zones(self):
+        assertions = {'ha': {'assert_ha_placement': {'scope': 'application',
+                                                     'spread': 'zone',
+                                                     'warn-on-fail': True}}}
+        self.assertEqual(run_check(self.BUNDLE, 'zoned', assertions), [
+            "[WARN] HA placement (>=3 zones) (units spread over 2 distinct "
+            "zones (expected='>=3'); zone az1 has units 0,1)"])
+
+
+class TestConsistency(unittest.TestCase):
+    """ Tests for cross-application option assertions. """
+
+    BUNDLE = {'applications': {
+                'cinder-ceph': {'charm': 'ch:cinder-ceph',
+                                'options': {'ceph-osd-replication-count': 3}},
+                'glance': {'charm': 'ch:glance',
+                           'options': {'ceph-osd-replication-count': 2,
+                                       'vip': '10.0.0.1 10.0.1.1',
+                                       'region': 'RegionOne'}},
+                'nova-cloud-controller': {
+                    'charm': 'ch:nova-cloud-controller',
+                    'options': {'vip': '10.0.0.2 10.0.1.1',
+                                'region': 'RegionOne RegionThree'}},
+                'keystone': {'charm': 'ch:keystone',
+                             'options': {'vip': '10.0.0.3',
+                                         'region': 'RegionOne RegionTwo'}}}}
+
+    def test_index(self):
+        index = BundleIndex(self.BUNDLE)
+        self.assertEqual(index.option_values('vip', ['keystone']),
+                         {'keystone': '10.0.0.3'})
+        by_value, by_token = index.option_groups('vip')
+        self.assertEqual(by_value['10.0.0.3'], {'keystone'})
+        self.assertEqual(by_token['10.0.1.1'],
+                         {'glance', 'nova-cloud-controller'})
+        self.assertIs(index.option_groups('vip')[0], by_value)
+
+    def test_consistent(self):
+        assertions = {'ceph-osd-replication-count': {'consistent': {
+                        'scope': 'bundle',
+                        'value': ['cinder-ceph', 'glance']}}}
+        self.assertEqual(run_check(self.BUNDLE, 'glance', assertions), [
+            "[FAIL] ceph-osd-replication-count (value=2 differs from "
+            "cinder-ceph=3)"])
+        del assertions['ceph-osd-replication-count']['consistent']['value']
+        self.assertEqual(run_check(self.BUNDLE, 'keystone', assertions), [
+            "[FAIL] ceph-osd-replication-count (not found)"])
+
+    def test_unique(self):
+        assertions = {'vip': {'unique': {'scope': 'bundle'}}}
+        self.assertEqual(run_check(self.BUNDLE, 'keystone', assertions), [
+            "[PASS] vip (value=10.0.0.3 is unique)"])
+        self.assertEqual(run_check(self.BUNDLE, 'glance', assertions), [
+            "[FAIL] vip ('10.0.1.1' also used by nova-cloud-controller)"])
+
+    def test_subset_of(self):
+        assertions = {'region': {'subset_of': {'scope': 'bundle',
+                                               'value': 'keystone'}}}
+        self.assertEqual(run_check(self.BUNDLE, 'glance', assertions), [
+            "[PASS] region (value=RegionOne)"])
+        self.assertEqual(run_check(self.BUNDLE, 'nova-cloud-controller',
+                                   assertions), [
+            "[FAIL] region (RegionThree not set on any application using "
+            "keystone)"])
+
+
+class TestExpr(unittest.TestCase):
+    """ Tests for expression assertions. """
+
+    BUNDLE = {'applications': {
+                'ceph-mon': {'charm': 'ch:ceph-mon', 'num_units': 3,
+                             'options': {'monitor-count': 5,
+                                         'cache-size': '4G'}},
+                'ceph-osd': {'charm': 'ch:ceph-osd', 'num_units': 1,
+                             'options': {'monitor-count': '9',
+                                         'cache-size': '512M'}}}}
+
+    def test_compile_expr(self):
+        func = compile_expr('3 <= value <= 7 and units >= 3')
+        self.assertTrue(func({'value': 5, 'units': 3}))
+        self.assertFalse(func({'value': 5, 'units': 1}))
+        self.assertFalse(func({'value': 8, 'units': 3}))
+        self.assertIs(compile_expr('3 <= value <= 7 and units >= 3'), func)
+        self.assertTrue(compile_expr('value >= 1G')({'value': 2 * 1024 ** 3,
+                                                     'units': 1}))
+        self.assertTrue(compile_expr("value in ('a', 'b') or not units")(
+                        {'value': 'a', 'units': 1}))
+
+    def test_compile_expr_size_in_string(self):
+        func = compile_expr("value in ['a 4G b', 'x'] or value == \"16g\"")
+        self.assertTrue(func({'value': 'a 4G b', 'units': 1}))
+        self.assertFalse(func({'value': 'a', 'units': 1}))
+        func = compile_expr("value >= 4G and value != 'size 4G'")
+        self.assertTrue(func({'value': 5 * 1024 ** 3, 'units': 1}))
+        self.assertEqual(quote_sizes("value >= 16g or value == '2G'"),
+                         "value >= '16g' or value == '2G'")
+        self.assertEqual(quote_sizes("value in (1,\n 2G)"),
+                         "value in (1,\n '2G')")
+
+    def test_compile_expr_invalid(self):
+        for expr in ('value >=', '__import__("os")', 'value.real > 1',
+                     'foo > 1', 'value + 1 > 2'):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ExprError):
+                    compile_expr(expr)
+
+    def test_expr(self):
+        assertions = {'monitor-count': {'expr': {
+                        'value': '3 <= value <= 7 and units >= 3'}}}
+        self.assertEqual(run_check(self.BUNDLE, 'ceph-mon', assertions), [
+            "[PASS] monitor-count (value=5)"])
+        self.assertEqual(run_check(self.BUNDLE, 'ceph-osd', assertions), [
+            "[FAIL] monitor-count (value=9, units=1 does not satisfy "
+            "'3 <= value <= 7 and units >= 3')"])
+
+    def test_expr_sizes(self):
+        assertions = {'cache-size': {'expr': {'value': 'value >= 1G'}}}
+        self.assertEqual(run_check(self.BUNDLE, 'ceph-mon', assertions), [
+            "[PASS] cache-size (value=4G)"])
+        self.assertEqual(run_check(self.BUNDLE, 'ceph-osd', assertions), [
+            "[FAIL] cache-size (value=512M, units=1 does not satisfy "
+            "'value >= 1G')"])
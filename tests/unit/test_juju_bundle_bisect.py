@@ -0,0 +1,158 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from unittest import mock
+
+from ua_bundle_checker.bisect import (
+    BisectCache,
+    BundleBisector,
+    Git,
+)
+from ua_bundle_checker.checker import BundleCheckerError
+
+BUNDLE = """
+applications:
+  ceph-mon:
+    options:
+      monitor-count: {monitors}
+    num_units: {units}
+    charm: ch:ceph-mon
+    channel: quincy/stable
+"""
+
+CHECKS = {'ceph-mon': {'charm': 'ceph-mon', 'assertions': {
+            'ha': {'assert_ha': {'scope': 'application'}},
+            'monitor-count': {'eq': {'value': 3}}}}}
+
+
+class TestBisect(unittest.TestCase):
+    """ Tests for finding the revision at which a check started failing. """
+
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.repo)
+        os.makedirs(os.path.join(self.repo, 'bundles'))
+        self.bundle = os.path.join(self.repo, 'bundles', 'bundle.yaml')
+        self.git('init', '-q')
+        # units drop to 1 at revision 5 and monitors change at revision 7
+        self.revs = []
+        for i in range(10):
+            self.revs.append(self.commit(
+                BUNDLE.format(units=3 if i < 5 else 1,
+                              monitors=3 if i < 7 else 5),
+                f"revision {i}"))
+
+    def commit(self, bundle, message):
+        with open(self.bundle, 'w', encoding='utf-8') as fd:
+            fd.write(bundle)
+
+        with open(os.path.join(self.repo, 'README'), 'w',
+                  encoding='utf-8') as fd:
+            fd.write(message)
+
+        self.git('add', '-A')
+        self.git('commit', '-q', '-m', message)
+        return self.git('rev-parse', 'HEAD').strip()
+
+    def branch(self, *bundles):
+        """
+        Create a branch from the last good revision with a commit for each
+        bundle and return their revisions.
+        """
+        self.git('checkout', '-q', '-b', 'skip', self.revs[4])
+        return [self.commit(bundle, f"skip {i}")
+                for i, bundle in enumerate(bundles)]
+
+    def git(self, *args):
+        return subprocess.run(['git', '-C', self.repo, '-c', 'user.name=t',
+                               '-c', 'user.email=t@t', *args], check=True,
+                              capture_output=True, text=True).stdout
+
+    def bisector(self, cache, **target):
+        git = Git(self.bundle)
+        self.assertEqual(git.repo_path(self.bundle), 'bundles/bundle.yaml')
+        return BundleBisector(git, git.repo_path(self.bundle), CHECKS, cache,
+                              **target)
+
+    def test_bisect(self):
+        bisector = self.bisector(BisectCache(None))
+        rev, failures = bisector.bisect(f"{self.revs[0]}..{self.revs[-1]}")
+        self.assertEqual(rev, self.revs[5])
+        self.assertEqual(failures, ["ceph-mon: [FAIL] HA (>=3) (not enough "
+                                    "units (value=1, expected='>=3'))"])
+        # binary search rather than checking every revision
+        self.assertLessEqual(bisector.evaluations, 6)
+
+    def test_bisect_opt(self):
+        bisector = self.bisector(BisectCache(None), opt='monitor-count')
+        rev, _ = bisector.bisect(f"{self.revs[0]}..HEAD")
+        self.assertEqual(rev, self.revs[7])
+        bisector = self.bisector(BisectCache(None), method='eq')
+        rev, _ = bisector.bisect(f"{self.revs[0]}..HEAD")
+        self.assertEqual(rev, self.revs[7])
+
+    def test_bisect_no_failure(self):
+        bisector = self.bisector(BisectCache(None))
+        self.assertEqual(bisector.bisect(f"{self.revs[0]}..{self.revs[4]}"),
+                         (None, []))
+
+    def test_bisect_bad_range(self):
+        bisector = self.bisector(BisectCache(None))
+        with self.assertRaises(BundleCheckerError):
+            bisector.bisect(f"{self.revs[6]}..HEAD")
+
+        with self.assertRaises(BundleCheckerError):
+            bisector.bisect(self.revs[0])
+
+    def test_bisect_cached(self):
+        path = os.path.join(self.repo, 'cache', 'bisect.json')
+        cache = BisectCache(path)
+        self.bisector(cache).bisect(f"{self.revs[0]}..HEAD")
+        cache.save()
+        cache = BisectCache(path)
+        bisector = self.bisector(cache)
+        rev, _ = bisector.bisect(f"{self.revs[0]}..HEAD")
+        self.assertEqual(rev, self.revs[5])
+        self.assertEqual(bisector.evaluations, 0)
+        self.assertGreater(cache.hits, 0)
+
+    def test_bisect_cache_checker_changed(self):
+        path = os.path.join(self.repo, 'cache', 'bisect.json')
+        cache = BisectCache(path)
+        self.bisector(cache).bisect(f"{self.revs[0]}..HEAD")
+        cache.save()
+        with mock.patch('ua_bundle_checker.bisect.checker_digest',
+                        return_value='newer'):
+            bisector = self.bisector(BisectCache(path))
+            rev, _ = bisector.bisect(f"{self.revs[0]}..HEAD")
+
+        self.assertEqual(rev, self.revs[5])
+        self.assertGreater(bisector.evaluations, 0)
+
+    def test_bisect_skip(self):
+        good = BUNDLE.format(units=3, monitors=3)
+        bad = BUNDLE.format(units=1, monitors=3)
+        revs = self.branch("applications: [", "machines: {}\n", good, bad)
+        bisector = self.bisector(BisectCache(None))
+        rev, _ = bisector.bisect(f"{self.revs[4]}..HEAD")
+        self.assertEqual(rev, revs[3])
+        self.assertEqual(sorted(bisector.skipped), sorted(revs[:2]))
+        self.assertEqual(bisector.ambiguous, [])
+
+    def test_bisect_skip_ambiguous(self):
+        good = BUNDLE.format(units=3, monitors=3)
+        bad = BUNDLE.format(units=1, monitors=3)
+        revs = self.branch(good, "- not a bundle\n", bad, bad)
+        bisector = self.bisector(BisectCache(None))
+        rev, _ = bisector.bisect(f"{self.revs[4]}..HEAD")
+        self.assertEqual(rev, revs[2])
+        self.assertEqual(bisector.ambiguous, [revs[1]])
+
+    def test_bisect_unloadable_end(self):
+        revs = self.branch("applications: [")
+        bisector = self.bisector(BisectCache(None))
+        with self.assertRaisesRegex(BundleCheckerError, revs[0]):
+            bisector.bisect(f"{self.revs[4]}..HEAD")
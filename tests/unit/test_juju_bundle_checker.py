@@ -1,10 +1,37 @@
+import copy
+import os
 import re
+import tempfile
+import time
 import unittest
 
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
 from ua_bundle_checker.assertion.commands import (
     CheckResult,
     AssertionBase,
-    CHARM_REGEX_TEMPLATE
+    CHARM_REGEX_TEMPLATE,
+    charm_regex,
+)
+from ua_bundle_checker.assertion.index import BundleIndex
+from ua_bundle_checker.assertion.regex import (
+    check_pattern,
+    RegexBudgetExceeded,
+    SafeRegex,
+    UnsafeRegexError,
+)
+from ua_bundle_checker import check_bundle
+from ua_bundle_checker.analyzer import (
+    ChecksAnalyzer,
+    find_duplicate_keys,
+)
+from ua_bundle_checker.checker import (
+    BundleCheckerError,
+    ChecksManager,
+    OutputManager,
+    UABundleChecker,
+    UABundleCheckerParams,
 )
 
 id_url_samples = {
@@ -45,6 +72,20 @@ class TestJujuBundleChecker(unittest.TestCase):
         c = CheckResult(CheckResult.FAIL)
         self.assertFalse(c.passed)
 
+    def test_check_result_compact(self):
+        c = CheckResult(CheckResult.WARN, opt="foo", reason="bar")
+        self.assertFalse(hasattr(c, '__dict__'))
+        c2 = CheckResult(CheckResult.WARN, opt="foo",
+                         reason="".join(["b", "ar"]))
+        self.assertIs(c.reason, c2.reason)
+
+    def test_check_result_render(self):
+        c = CheckResult(CheckResult.FAIL, opt="foo", reason="bar")
+        self.assertEqual(c.unformatted(), "[FAIL] foo (bar)")
+        self.assertEqual(str(c), "[\033[31mFAIL\033[0m] foo (bar)")
+        # rendering for one sink must not affect another
+        self.assertEqual(str(c), c.render(formatted=True))
+
     def test_assertion_base_atoi(self):
         self.assertEqual(AssertionBase({}).atoi("100k"), 100 * 1000)
         self.assertEqual(AssertionBase({}).atoi("100K"), 100 * 1024)
@@ -62,6 +103,241 @@ class TestJujuBundleChecker(unittest.TestCase):
         self.assertEqual(AssertionBase({}).get_units(app), 1)
 
 
+class TestUABundleCheckerResults(unittest.TestCase):
+    """ Tests for UABundleChecker result handling. """
+
+    @staticmethod
+    def _checker(**kwargs):
+        return UABundleChecker(UABundleCheckerParams({}, 'foo', {}, None,
+                                                     **kwargs))
+
+    def test_results_retained(self):
+        checker = self._checker()
+        checker.add_result('app1', CheckResult(CheckResult.PASS))
+        checker.add_result('app1', CheckResult(CheckResult.FAIL))
+        self.assertEqual(checker.get_results_summary(),
+                         {'PASS': 1, 'FAIL': 1})
+        self.assertEqual(set(checker.results['app1']), set(['PASS', 'FAIL']))
+
+    def test_summary_only(self):
+        checker = self._checker(summary_only=True)
+        for _ in range(1000):
+            checker.add_result('app1', CheckResult(CheckResult.PASS))
+
+        checker.add_result('app1', CheckResult(CheckResult.SKIPPED))
+        checker.add_result('app1', CheckResult(CheckResult.WARN))
+        checker.add_result('app2', CheckResult(CheckResult.FAIL))
+        self.assertEqual(checker.get_results_summary(),
+                         {'PASS': 1000, 'SKIPPED': 1, 'WARN': 1, 'FAIL': 1})
+        self.assertEqual(list(checker.results['app1']), ['WARN'])
+        self.assertEqual(list(checker.results['app2']), ['FAIL'])
+
+    def test_summary_only_max_errors(self):
+        checker = self._checker(summary_only=True, max_errors_per_app=2)
+        for _ in range(5):
+            checker.add_result('app1', CheckResult(CheckResult.FAIL))
+
+        self.assertEqual(checker.get_results_summary(), {'FAIL': 5})
+        self.assertEqual(len(checker.results['app1']['FAIL']), 2)
+        self.assertEqual(checker.dropped, {'app1': 3})
+
+
+class TestCheckBundle(unittest.TestCase):
+    """ Tests for the check_bundle() library api. """
+
+    BUNDLE = {'applications': {
+                'mysql': {'charm': 'ch:mysql-innodb-cluster',
+                          'channel': '8.0/stable',
+                          'num_units': 1,
+                          'options': {'max-connections': 2000}}}}
+    CHECKS = {'mysql': {'charm': 'mysql-innodb-cluster',
+                        'assertions': {
+                            'ha': {'assert_ha': {'scope': 'application'}},
+                            'max-connections': {'gte': {'value': 1000}}}},
+              'vault': {'charm': 'vault'}}
+
+    def test_check_bundle(self):
+        report = check_bundle(self.BUNDLE, self.CHECKS)
+        self.assertEqual(report.summary,
+                         {'PASS': 2, 'WARN': 0, 'FAIL': 1, 'SKIPPED': 0})
+        self.assertFalse(report.passed)
+        self.assertEqual(report.unmatched, ['vault'])
+        self.assertEqual(set(report.results['mysql']), set(['PASS', 'FAIL']))
+
+    def test_check_bundle_max_errors_requires_summary_only(self):
+        with self.assertRaises(BundleCheckerError):
+            check_bundle(self.BUNDLE, self.CHECKS, max_errors_per_app=1)
+
+        report = check_bundle(self.BUNDLE, self.CHECKS, summary_only=True,
+                              max_errors_per_app=1)
+        self.assertEqual(report.summary['FAIL'], 1)
+
+    def test_check_bundle_rejects_unsafe_regex(self):
+        checks = copy.deepcopy(self.CHECKS)
+        checks['mysql']['assertions']['max-connections'] = {
+            'eq': {'regex': True, 'value': '(a+)+'}}
+        with self.assertRaises(BundleCheckerError):
+            check_bundle(self.BUNDLE, checks)
+
+        checks = {'nested': {'charm': '(x|.)*'}}
+        with self.assertRaises(BundleCheckerError):
+            check_bundle(self.BUNDLE, checks)
+
+    def test_check_bundle_rejects_malformed(self):
+        for checks in ({'mysql': 'mysql'},
+                       {'mysql': {'assertions': {}}},
+                       {'mysql': {'charm': 'mysql', 'assertions': []}},
+                       {'mysql': {'charm': 'mysql', 'assertions': {
+                            'opt': {'no_such_method': {}}}}},
+                       {'mysql': {'charm': 'mysql', 'assertions': {
+                            'opt': {'eq': 'value'}}}},
+                       {'mysql': {'charm': 'mysql', 'assertions': {
+                            'opt': {'expr': {'value': 'value >'}}}}}):
+            with self.subTest(checks=checks):
+                with self.assertRaises(BundleCheckerError):
+                    check_bundle(self.BUNDLE, checks)
+
+    def test_check_bundle_index(self):
+        index = BundleIndex(self.BUNDLE)
+        with mock.patch('ua_bundle_checker.checker.BundleIndex') as mock_index:
+            report = check_bundle(self.BUNDLE, self.CHECKS,
+                                  bundle_index=index)
+
+        mock_index.assert_not_called()
+        self.assertEqual(report.summary['FAIL'], 1)
+
+    def test_check_bundle_does_not_modify_checks(self):
+        checks = copy.deepcopy(self.CHECKS)
+        check_bundle(self.BUNDLE, checks)
+        self.assertEqual(checks, self.CHECKS)
+
+    def test_check_bundle_concurrent(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            reports = list(executor.map(
+                lambda _: check_bundle(self.BUNDLE, self.CHECKS),
+                range(32)))
+
+        for report in reports:
+            self.assertEqual(report.summary['FAIL'], 1)
+
+
+class TestOutputManager(unittest.TestCase):
+    """ Tests for OutputManager. """
+
+    def test_concurrent_runs(self):
+        with tempfile.TemporaryDirectory() as dtmp:
+            logfile = os.path.join(dtmp, 'checks.log')
+            with open(logfile, 'w', encoding='utf-8') as fd:
+                fd.write("previous run\n")
+
+            out1 = OutputManager(logfile).setup()
+            out2 = OutputManager(logfile).setup()
+            for i in range(3):
+                out1.print(f"run1 {i}")
+                out2.print(f"run2 {i}")
+
+            # nothing is visible until a run completes
+            with open(logfile, encoding='utf-8') as fd:
+                self.assertEqual(fd.read(), "previous run\n")
+
+            out1.close()
+            with open(logfile, encoding='utf-8') as fd:
+                self.assertEqual(fd.read(), "run1 0\nrun1 1\nrun1 2\n")
+
+            out2.close()
+            with open(logfile, encoding='utf-8') as fd:
+                self.assertEqual(fd.read(), "run2 0\nrun2 1\nrun2 2\n")
+
+            self.assertEqual(os.listdir(dtmp), ['checks.log'])
+
+    def test_latest_link(self):
+        with tempfile.TemporaryDirectory() as dtmp:
+            latest = os.path.join(dtmp, 'checks.latest.log')
+            for name in ['checks.1.log', 'checks.2.log']:
+                with OutputManager(os.path.join(dtmp, name),
+                                   latest_link=latest) as out:
+                    out.print(CheckResult(CheckResult.FAIL, opt=name))
+
+                self.assertEqual(os.readlink(latest), name)
+
+            with open(latest, encoding='utf-8') as fd:
+                self.assertEqual(fd.read(), "[FAIL] checks.2.log\n")
+
+
+class TestChecksAnalyzer(unittest.TestCase):
+    """ Tests for the checks analyzer. """
+
+    CHECKS = {'mysql': {'charm': 'mysql-innodb-cluster',
+                        'assertions': {
+                            'ha': {'allow_default': None,
+                                   'assert_ha': {'scope': 'application'}},
+                            'foo': {'skip_if_charm_exists': {
+                                        'value': 'mysql-innodb-cluster'},
+                                    'eq': {'value': 1}},
+                            'bar': {'eq': {'regex': True, 'value': 'abc'}},
+                            'baz': {'gte': {'value': 1, 'skip': True},
+                                    'nosuch': None}}},
+              'mysql2': {'charm': 'mysql-innodb-cluster',
+                         'assertions': {
+                            'bar': {'eq': {'regex': True,
+                                           'value': 'abc'}}}},
+              'mysql-any': {'charm': 'mysql-.*'}}
+    BUNDLE_APPS = {'mysql': {'charm': 'ch:mysql-innodb-cluster',
+                             'num_units': 3}}
+
+    def _findings(self, kind):
+        analyzer = ChecksAnalyzer(self.CHECKS, self.BUNDLE_APPS)
+        return [str(f) for f in analyzer.analyze() if f.kind == kind]
+
+    def test_overlapping_sections(self):
+        self.assertEqual(self._findings('overlap'), [
+            "[overlap] mysql: overlaps with section 'mysql2' (same charm)",
+            "[overlap] mysql: overlaps with section 'mysql-any' (charm "
+            "matcher 'mysql-.*' also matches 'mysql-innodb-cluster')",
+            "[overlap] mysql2: overlaps with section 'mysql-any' (charm "
+            "matcher 'mysql-.*' also matches 'mysql-innodb-cluster')",
+            "[overlap] mysql: application 'mysql' in sample bundle is "
+            "matched by sections ['mysql', 'mysql2', 'mysql-any']"])
+
+    def test_duplicate_assertions(self):
+        self.assertEqual(self._findings('duplicate'),
+                         ["[duplicate] mysql2: bar.eq duplicates section "
+                          "'mysql'"])
+
+    def test_unreachable_methods(self):
+        self.assertEqual(self._findings('unreachable'), [
+            "[unreachable] mysql: ha.allow_default always passes so "
+            "['assert_ha'] never run",
+            "[unreachable] mysql: foo.skip_if_charm_exists always passes "
+            "so ['eq'] never run",
+            "[unreachable] mysql: baz.gte has skip=True and never runs"])
+        self.assertEqual(self._findings('unknown'),
+                         ["[unknown] mysql: baz.nosuch is not a known "
+                          "assertion method"])
+
+    def test_regex_assertions(self):
+        findings = self._findings('regex')
+        self.assertEqual(len(findings), 2)
+        self.assertIn("literal value 'abc'", findings[0])
+
+    def test_section_costs(self):
+        checks = {k: v for k, v in self.CHECKS.items() if k != 'mysql'}
+        costs = ChecksAnalyzer(checks, self.BUNDLE_APPS).section_costs()
+        self.assertEqual(sorted((c.section, c.applications, c.assertions)
+                                for c in costs),
+                         [('mysql-any', 1, 1), ('mysql2', 1, 2)])
+
+    def test_find_duplicate_keys(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml') as ftmp:
+            ftmp.write("checks:\n"
+                       "  app:\n"
+                       "    charm: app\n"
+                       "  app:\n"
+                       "    charm: app2\n")
+            ftmp.flush()
+            self.assertEqual(find_duplicate_keys(ftmp.name), [('app', 4)])
+
+
 class TestCharmNameRegex(unittest.TestCase):
     """ Tests for the Juju bundle checker charm name regex. """
 
@@ -80,3 +356,56 @@ class TestCharmNameRegex(unittest.TestCase):
                         app_name, app_name, app_name)).match(sample)
                 msg = f"App '{app_name}' should not match with {sample}"
                 self.assertIsNone(r, msg)
+
+    def test_regex_pathological_path(self):
+        # Used to take close to a minute with the previous template.
+        sample = "/" + "1" * 1000 + "/-" + "1" * 3000 + "!"
+        start = time.monotonic()
+        self.assertIsNone(charm_regex("[a-z0-9]+").match(sample))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_regex_substring_not_matched(self):
+        self.assertIsNone(charm_regex("aodh").match("/charms/xaodh"))
+
+
+class TestSafeRegex(unittest.TestCase):
+    """ Tests for safe regex handling. """
+
+    def test_check_pattern_safe(self):
+        for pattern in ["ceph-mon", r"\S+/stable$", "[a-z0-9]+", "(ab|cd)+",
+                        "(a|b)*c", "x{2,5}"]:
+            with self.subTest(pattern=pattern):
+                check_pattern(pattern)
+
+    def test_check_pattern_unsafe(self):
+        for pattern in ["(a+)+", "(?:a*)*", r"(\w+\s?)*", "(a|aa)+",
+                        "(x|.)*", "(["]:
+            with self.assertRaises(UnsafeRegexError):
+                check_pattern(pattern)
+
+    def test_budget_exceeded(self):
+        with self.assertRaises(RegexBudgetExceeded):
+            SafeRegex("a+", budget=-1).fullmatch("aaaa")
+
+        self.assertTrue(SafeRegex("a+").fullmatch("aaaa"))
+
+    def test_checks_manager_rejects_invalid(self):
+        for method in ("eq:\n          regex: true\n          value: '(a+)+'",
+                       "expr:\n          value: 'value > open(1)'",
+                       "skip_if_charm_exists:\n          value: '(a|aa)+'",
+                       "related_to:\n          value: [vault, '(a+)+']",
+                       "consistent:\n          scope: bundle\n"
+                       "          value: '(x|.)*'"):
+            with self.subTest(method=method), \
+                    tempfile.TemporaryDirectory() as dtmp:
+                with open(os.path.join(dtmp, 'foo.yaml'), 'w',
+                          encoding='utf-8') as fd:
+                    fd.write("checks:\n"
+                             "  app:\n"
+                             "    charm: app\n"
+                             "    assertions:\n"
+                             "      opt:\n"
+                             f"        {method}\n")
+
+                with self.assertRaises(BundleCheckerError):
+                    ChecksManager('foo', dtmp).checks  # pylint: disable=W0106
@@ -0,0 +1,182 @@
+import asyncio
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+from ua_bundle_checker.checker import BundleCheckerError
+from ua_bundle_checker.collector import (
+    fleet,
+    FleetCollector,
+    get_targets,
+)
+
+# Stand-in for 'juju export-bundle' that serves canned bundles from a
+# directory. A target named slow-* sleeps, flaky-* fails on the first attempt
+# and any target without a bundle fails.
+STANDIN = """
+import os
+import shutil
+import sys
+import time
+
+path, target = sys.argv[1:3]
+name = target.partition(':')[2]
+if name.startswith('slow'):
+    time.sleep(float(os.environ.get('STANDIN_DELAY', '0.3')))
+
+if name.startswith('flaky'):
+    marker = os.path.join(path, name + '.attempted')
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        sys.exit('transient error')
+
+bundle = os.path.join(path, name + '.yaml')
+if not os.path.exists(bundle):
+    sys.exit('model not found')
+
+with open(bundle) as fd:
+    sys.stdout.write(fd.read())
+"""
+
+BUNDLE = """
+applications:
+  keystone:
+    charm: ch:keystone
+    channel: yoga/stable
+    num_units: {units}
+"""
+
+CHECKS = {'keystone': {'charm': 'keystone',
+                       'assertions': {'ha': {'assert_ha': {
+                                                'scope': 'application'}}}}}
+
+
+class TestFleetCollector(unittest.TestCase):
+    """ Tests for the concurrent fleet collector. """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        standin = os.path.join(self.tmp, 'juju.py')
+        with open(standin, 'w', encoding='utf-8') as fd:
+            fd.write(STANDIN)
+
+        for name, units in (('good', 3), ('bad', 1), ('slow1', 3),
+                            ('slow2', 3), ('slow3', 3), ('flaky', 3)):
+            with open(os.path.join(self.tmp, f'{name}.yaml'), 'w',
+                      encoding='utf-8') as fd:
+                fd.write(BUNDLE.format(units=units))
+
+        self.command = (sys.executable, standin, self.tmp, '{target}')
+
+    def collector(self, **kwargs):
+        collector = FleetCollector(CHECKS, self.command, **kwargs)
+        collector.retry_delay = 0
+        return collector
+
+    def test_collect(self):
+        seen = []
+        results = self.collector().run(['c1:good', 'c1:bad', 'c2:missing'],
+                                       seen.append)
+        self.assertEqual(results, seen)
+        results = {r.target: r for r in results}
+        self.assertTrue(results['c1:good'].passed)
+        self.assertFalse(results['c1:bad'].passed)
+        self.assertIsNone(results['c1:bad'].error)
+        self.assertIn('model not found', results['c2:missing'].error)
+        self.assertEqual(results['c2:missing'].attempts, 3)
+
+    def test_collect_concurrent(self):
+        in_flight = []
+        peak = []
+
+        async def fetch(target):
+            in_flight.append(target)
+            peak.append(len(in_flight))
+            # yield so that every fetch allowed to start does so first
+            await asyncio.sleep(0.01)
+            in_flight.remove(target)
+            return BUNDLE.format(units=3)
+
+        targets = [f"c1:m{i}" for i in range(7)]
+        for concurrency in (1, 3, 8):
+            with self.subTest(concurrency=concurrency):
+                peak.clear()
+                collector = self.collector(concurrency=concurrency)
+                with mock.patch.object(collector, 'fetch', fetch):
+                    results = collector.run(targets)
+
+                self.assertTrue(all(r.passed for r in results))
+                self.assertEqual(max(peak), min(concurrency, len(targets)))
+
+    def test_collect_completion_order(self):
+        results = self.collector().run(['c1:slow1', 'c1:good'])
+        self.assertEqual([r.target for r in results], ['c1:good', 'c1:slow1'])
+
+    def test_retries(self):
+        result = self.collector(retries=1).run(['c1:flaky'])[0]
+        self.assertTrue(result.passed)
+        self.assertEqual(result.attempts, 2)
+
+    def test_timeout(self):
+        result = self.collector(timeout=0.05, retries=0).run(['c1:slow1'])[0]
+        self.assertIn('timed out', result.error)
+        self.assertEqual(result.attempts, 1)
+
+    def test_invalid_options(self):
+        for options in ({'concurrency': 0}, {'concurrency': -1},
+                        {'timeout': 0}, {'retries': -1}):
+            with self.subTest(options=options):
+                with self.assertRaises(BundleCheckerError):
+                    FleetCollector(CHECKS, self.command, **options)
+
+    def test_get_targets(self):
+        path = os.path.join(self.tmp, 'targets')
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write("# prod\nc1:m1\n\nc2:m2  # comment\n")
+
+        self.assertEqual(get_targets(path), ['c1:m1', 'c2:m2'])
+
+    def _fleet(self, targets, per_run_log=False):
+        path = os.path.join(self.tmp, 'targets')
+        with open(path, 'w', encoding='utf-8') as fd:
+            fd.write('\n'.join(targets))
+
+        args = SimpleNamespace(type='test', checks_path=None, fleet=path,
+                               fleet_concurrency=2, fleet_timeout=10,
+                               fleet_retries=0, errors_only=False,
+                               summary_only=False, max_errors_per_app=None,
+                               output_dir=self.tmp, per_run_log=per_run_log)
+        checks_mgr = SimpleNamespace(checks=CHECKS, checks_type='test',
+                                     type='test')
+        with mock.patch('ua_bundle_checker.collector.ChecksManager',
+                        return_value=checks_mgr), \
+                mock.patch('ua_bundle_checker.collector.FleetCollector',
+                           side_effect=lambda checks, **kwargs:
+                           self.collector(**kwargs)), \
+                redirect_stdout(io.StringIO()):
+            return fleet(args)
+
+    def test_fleet_exit_code(self):
+        self.assertEqual(self._fleet(['c1:good']), 0)
+        self.assertEqual(self._fleet(['c1:good', 'c1:bad']), 1)
+        self.assertEqual(self._fleet(['c1:good', 'c2:missing']), 1)
+
+    def test_fleet_per_run_log(self):
+        self.assertEqual(self._fleet(['c1:good'], per_run_log=True), 0)
+        latest = os.path.join(self.tmp,
+                              'ua-bundle-checks.test.fleet.latest.log')
+        logname = os.readlink(latest)
+        self.assertRegex(logname, r'^ua-bundle-checks\.test\.fleet\.'
+                                  r'\d{8}-\d{6}\.\d+\.log$')
+        self.assertFalse(os.path.exists(
+                    os.path.join(self.tmp, 'ua-bundle-checks.test.fleet.log')))
+        with open(latest, encoding='utf-8') as fd:
+            self.assertIn('Target: c1:good', fd.read())
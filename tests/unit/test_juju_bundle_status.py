@@ -0,0 +1,99 @@
+import json
+import unittest
+
+from ua_bundle_checker import check_bundle
+from ua_bundle_checker.assertion.index import BundleIndex
+from ua_bundle_checker.status import (
+    get_status,
+    normalize_status,
+    overlay_status,
+)
+
+STATUS = json.dumps({
+    'model': {'name': 'openstack'},
+    'machines': {
+        '0': {'hardware': 'arch=amd64 cores=8 mem=32768M '
+                          'availability-zone=az1',
+              'constraints': 'mem=16G'},
+        '1': {'hardware': 'arch=amd64 availability-zone=az2'}},
+    'applications': {
+        'keystone': {
+            'charm': 'keystone', 'charm-origin': 'charmhub',
+            'charm-name': 'keystone', 'charm-channel': 'yoga/stable',
+            'relations': {'shared-db': ['keystone-mysql-router'],
+                          'cluster': ['keystone']},
+            'units': {'keystone/10': {'machine': '1/lxd/3'},
+                      'keystone/2': {'machine': '0/lxd/1'}}},
+        'keystone-mysql-router': {
+            'charm': 'mysql-router', 'charm-origin': 'charmhub',
+            'charm-name': 'mysql-router', 'charm-channel': '8.0/stable',
+            'subordinate-to': ['keystone'],
+            'relations': {'shared-db': [
+                {'related-application': 'keystone',
+                 'interface': 'mysql-shared', 'scope': 'container'}]}},
+        'legacy': {'charm': 'cs:legacy-12', 'units': {}}}})
+
+
+class TestStatus(unittest.TestCase):
+    """ Tests for checking a juju status snapshot. """
+
+    def test_normalize_status(self):
+        bundle = normalize_status(get_status(STATUS))
+        apps = bundle['applications']
+        self.assertEqual(apps['keystone'], {'charm': 'ch:keystone',
+                                            'channel': 'yoga/stable',
+                                            'num_units': 2,
+                                            'to': ['lxd:0', 'lxd:1']})
+        self.assertEqual(apps['keystone-mysql-router'],
+                         {'charm': 'ch:mysql-router',
+                          'channel': '8.0/stable'})
+        self.assertEqual(apps['legacy'], {'charm': 'cs:legacy-12',
+                                          'num_units': 0})
+        self.assertEqual(bundle['machines'],
+                         {'0': {'constraints': 'mem=16G zones=az1'},
+                          '1': {'constraints': 'zones=az2'}})
+
+    def test_index(self):
+        index = BundleIndex(normalize_status(get_status(STATUS)))
+        self.assertEqual(index.related_apps('keystone', 'shared-db'),
+                         {'keystone-mysql-router'})
+        self.assertEqual(index.related_apps('keystone-mysql-router'),
+                         {'keystone'})
+        self.assertEqual(index.unit_hosts('keystone'), ['0', '1'])
+        self.assertEqual(index.unit_zones('keystone'), ['az1', 'az2'])
+
+    def test_nested_containers(self):
+        status = {'applications': {'nested': {
+                    'charm': 'ch:nested',
+                    'units': {'nested/0': {'machine': '0/lxd/1/kvm/2'},
+                              'nested/1': {'machine': '0/lxd/2'},
+                              'nested/2': {'machine': '1/kvm/0/lxd/4'}}}},
+                  'machines': {'0': {}, '1': {}}}
+        bundle = normalize_status(status)
+        self.assertEqual(bundle['applications']['nested']['to'],
+                         ['kvm:0', 'lxd:0', 'lxd:1'])
+        self.assertEqual(BundleIndex(bundle).unit_hosts('nested'),
+                         ['0', '0', '1'])
+
+    def test_overlay_status(self):
+        bundle = {'applications': {
+                    'keystone': {'charm': 'ch:keystone',
+                                 'channel': 'xena/stable', 'num_units': 3,
+                                 'options': {'worker-multiplier': 0.25}},
+                    'removed': {'charm': 'ch:removed'}}}
+        overlaid = overlay_status(bundle, get_status(STATUS))
+        keystone = overlaid['applications']['keystone']
+        self.assertEqual(keystone['channel'], 'yoga/stable')
+        self.assertEqual(keystone['num_units'], 2)
+        self.assertEqual(keystone['options'], {'worker-multiplier': 0.25})
+        self.assertNotIn('removed', overlaid['applications'])
+        self.assertEqual(bundle['applications']['keystone']['num_units'], 3)
+
+    def test_check_status(self):
+        checks = {'keystone': {'charm': 'keystone', 'assertions': {
+                    'ha': {'assert_ha': {'scope': 'application'}}}}}
+        report = check_bundle(normalize_status(get_status(STATUS)), checks)
+        results = [r.unformatted()
+                   for r in report.results['keystone']['FAIL']]
+        self.assertEqual(results, ["[FAIL] HA (>=3) (not enough units "
+                                   "(value=2, expected='>=3'))"])